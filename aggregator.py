@@ -0,0 +1,200 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from analytics import articleDate, getTopN, tokenizeSentence
+from sketch import HeavyHitters
+
+"""
+Calcula las estadísticas de los artículos en una sola pasada. Recibe los artículos uno a uno, sin necesidad de tenerlos todos en memoria, y por cada uno actualiza la frecuencia de las palabras, de los ngramas de 1 a k palabras, de las palabras de cada fecha y el número de artículos de cada fecha. Los n elementos más frecuentes se obtienen con un heap, sin ordenar las distribuciones completas.
+
+Las palabras y las palabras por fecha se cuentan sobre los titulares limpiados, los ngramas sobre los titulares sin signos de puntuación, igual que en main.py.
+
+Si se indica una capacidad, los ngramas se cuentan de forma aproximada con memoria acotada (ver HeavyHitters): solo se conservan los capacity ngramas más frecuentes de cada orden y su frecuencia puede superar la real en a lo sumo epsilon veces el total de ngramas de ese orden, con probabilidad 1 - delta.
+
+Parámetros:
+maxOrder - Número máximo de palabras de los ngramas.
+capacity - Número de ngramas que se conservan por orden en el modo aproximado, None para contarlos todos de forma exacta.
+epsilon - Error máximo del modo aproximado relativo al total de ngramas.
+delta - Probabilidad de que una frecuencia supere ese error.
+"""
+class NewsAggregator:
+    __maxOrder: int
+    __articles: int
+    __words: Dict[str, int]
+    __ngrams: List[Optional[Union[Dict[str, int], HeavyHitters]]]
+    __wordsForDate: Dict[str, Dict[str, int]]
+    __articlesForDate: Dict[str, int]
+
+    def __init__(self, maxOrder: int = 3, capacity: Optional[int] = None, epsilon: float = 0.001, delta: float = 0.01) -> None:
+        if maxOrder < 1:
+            raise ValueError("El orden máximo de los ngramas debe ser al menos 1")
+
+        self.__maxOrder = maxOrder
+        self.__articles = 0
+        self.__words = dict()
+        # La posición 0 no se usa (queda en None para no reservar un contador de más), así la posición n tiene los ngramas de n palabras.
+        self.__ngrams = [None] + [dict() if capacity is None else HeavyHitters(capacity, epsilon, delta) for _ in range(maxOrder)]
+        self.__wordsForDate = dict()
+        self.__articlesForDate = dict()
+
+    @property
+    def maxOrder(self) -> int:
+        return self.__maxOrder
+
+    @property
+    def approximate(self) -> bool:
+        return isinstance(self.__ngrams[1], HeavyHitters)
+
+    def __len__(self) -> int:
+        return self.__articles
+
+    """
+    Se añade un artículo a las estadísticas.
+
+    Parámetros:
+    timestamp - Fecha de publicación del artículo.
+    headline - Titular del artículo.
+    """
+    def add(self, timestamp: str, headline: str) -> None:
+        tokens, cleaned = tokenizeSentence(headline)
+        date = articleDate(timestamp)
+        words = self.__words
+        wordsForDate = self.__wordsForDate.setdefault(date, dict())
+
+        self.__articles += 1
+        self.__articlesForDate[date] = self.__articlesForDate.get(date, 0) + 1
+
+        # Se cuentan las palabras limpias en total y en la fecha del artículo.
+        for word in cleaned:
+            words[word] = words.get(word, 0) + 1
+            wordsForDate[word] = wordsForDate.get(word, 0) + 1
+
+        # Se cuentan los ngramas de cada orden, los ngramas se juntan en una sola string separada por espacios.
+        for n in range(1, min(self.__maxOrder, len(tokens)) + 1):
+            ngrams = self.__ngrams[n]
+
+            if isinstance(ngrams, HeavyHitters):
+                ngrams.addAll(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+                continue
+
+            for i in range(len(tokens) - n + 1):
+                ngram = " ".join(tokens[i:i + n])
+                ngrams[ngram] = ngrams.get(ngram, 0) + 1
+
+    """
+    Se añaden varios artículos a las estadísticas, se pueden pasar como un generador para no cargarlos todos en memoria.
+
+    Parámetros:
+    news - Artículos, cada uno es una tupla donde el primer elemento es la fecha y el segundo el titular.
+
+    Retorna:
+    El mismo agregador, para encadenar consultas.
+    """
+    def addAll(self, news: Iterable[Tuple[str, str]]) -> "NewsAggregator":
+        for timestamp, headline in news:
+            self.add(timestamp, headline)
+
+        return self
+
+    """
+    Se suman las estadísticas de otro agregador, por ejemplo uno calculado sobre otra parte del corpus.
+
+    Parámetros:
+    other - Agregador a sumar, debe tener el mismo orden máximo y el mismo modo de conteo.
+    """
+    def merge(self, other: "NewsAggregator") -> None:
+        if other.maxOrder != self.__maxOrder or other.approximate != self.approximate:
+            raise ValueError("Solo se pueden unir agregadores con el mismo orden máximo y el mismo modo de conteo")
+
+        self.__articles += len(other)
+        sumCounts(self.__words, other.wordFrequencyDistribution())
+        sumCounts(self.__articlesForDate, other.articlesForDate())
+
+        for n in range(1, self.__maxOrder + 1):
+            if self.approximate:
+                self.__ngrams[n].merge(other.ngramCounter(n))
+            else:
+                sumCounts(self.__ngrams[n], other.ngramCounter(n))
+
+        for date, words in other.wordsForDate().items():
+            sumCounts(self.__wordsForDate.setdefault(date, dict()), words)
+
+    def wordFrequencyDistribution(self) -> Dict[str, int]:
+        return self.__words
+
+    """
+    Parámetros:
+    n - Número de palabras de los ngramas, entre 1 y el orden máximo.
+
+    Retorna:
+    El contador de los ngramas de n palabras, un diccionario en el modo exacto o un HeavyHitters en el modo aproximado.
+    """
+    def ngramCounter(self, n: int) -> Union[Dict[str, int], HeavyHitters]:
+        if not 1 <= n <= self.__maxOrder:
+            raise ValueError(f"El número de palabras de los ngramas debe estar entre 1 y {self.__maxOrder}")
+
+        return self.__ngrams[n]
+
+    """
+    Parámetros:
+    n - Número de palabras de los ngramas, entre 1 y el orden máximo.
+
+    Retorna:
+    Un diccionario donde las claves son los ngramas y los valores son la frecuencia de cada ngrama. En el modo aproximado solo incluye los ngramas candidatos, con su frecuencia estimada.
+    """
+    def ngramFrequencyDistribution(self, n: int) -> Dict[str, int]:
+        ngrams = self.ngramCounter(n)
+        return ngrams.frequencyDistribution() if isinstance(ngrams, HeavyHitters) else ngrams
+
+    def wordsForDate(self) -> Dict[str, Dict[str, int]]:
+        return self.__wordsForDate
+
+    def articlesForDate(self) -> Dict[str, int]:
+        return self.__articlesForDate
+
+    """
+    Parámetros:
+    n - Número de palabras a obtener.
+
+    Retorna:
+    Las n palabras más frecuentes con su frecuencia, de la más a la menos frecuente.
+    """
+    def topWords(self, n: int) -> Dict[str, int]:
+        return getTopN(self.__words, n)
+
+    """
+    Parámetros:
+    order - Número de palabras de los ngramas.
+    n - Número de ngramas a obtener.
+
+    Retorna:
+    Los n ngramas más frecuentes con su frecuencia, del más al menos frecuente.
+    """
+    def topNgrams(self, order: int, n: int) -> Dict[str, int]:
+        return getTopN(self.ngramFrequencyDistribution(order), n)
+
+    """
+    Parámetros:
+    n - Número de palabras a obtener por fecha.
+
+    Retorna:
+    Un diccionario donde las claves son las fechas y los valores son las n palabras más frecuentes de cada fecha.
+    """
+    def topWordsForDate(self, n: int) -> Dict[str, Dict[str, int]]:
+        return { date: getTopN(words, n) for date, words in self.__wordsForDate.items() }
+
+    """
+    Retorna:
+    Un diccionario donde las claves son las fechas y los valores son la palabra más frecuente de cada fecha. Las fechas sin palabras se omiten.
+    """
+    def mostCommonWordForDate(self) -> Dict[str, str]:
+        return { date: next(iter(words)) for date, words in self.topWordsForDate(1).items() if words }
+
+"""
+Se suman las frecuencias de una distribución a otra.
+
+Parámetros:
+target - Distribución que se modifica.
+source - Distribución a sumar.
+"""
+def sumCounts(target: Dict[str, int], source: Dict[str, int]) -> None:
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + count
@@ -1,80 +1,193 @@
-from typing import TypeVar, Dict, List, Tuple
-import nltk
+from typing import TYPE_CHECKING, TypeVar, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+import heapq
 import re
-from nltk.corpus import stopwords
-from nltk.util import ngrams
-import seaborn
-import pandas as pd
-import matplotlib.pyplot as plt
-import urllib.request as request
-import ssl
-import json
-from threading import Thread
-from PIL import Image
-from numpy import zeros
+import sys
+
+# NLTK, pandas, seaborn, matplotlib y PIL tardan en importarse, por lo que se importan dentro de las funciones que los usan. Así los procesos que solo tokenizan o generan frases no los cargan.
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from PIL import Image
 
 # Globales
-STOP_WORDS = set(stopwords.words("spanish"))
 plots = 0
-context = ssl._create_unverified_context()
+
+# Datos de NLTK que usa el proyecto y su ruta dentro de nltk_data. El tokenizador no usa punkt, solo se necesitan las stop words.
+NLTK_RESOURCES = { "stopwords": "corpora/stopwords" }
+
+# Expresiones regulares precompiladas del tokenizador. Reproducen, en el mismo orden, las reglas de nltk.word_tokenize (Treebank) que pueden separar dos caracteres alfanuméricos: signos de puntuación, comillas, paréntesis, guiones largos, comas y dos puntos que no van seguidos de un dígito, y contracciones en inglés.
+NON_WORD = re.compile(r"\W+")
+QUOTES = re.compile(r"(?i)(?<!\w)'(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)")
+PUNCTUATION = re.compile(r"[«“‘„`;@#$%&\u2012-\u2015?!]|\.{2,}|[:,](?!\d)|(?<=[^.])\.(?=[\])}>\"'»”’ ]*\s*$)")
+APOSTROPHES = re.compile(r"(?<=[^'])' ")
+BRACKETS = re.compile(r"[»”’*\[\](){}<>\"]|--|''")
+CLITICS = re.compile(r"(?<=[^' ])(?=(?:'[sSmMdD]|'ll|'LL|'re|'RE|'ve|'VE|n't|N'T)\s)")
+CONTRACTIONS = re.compile(r"(?i)\b(?:can(?=not\b)|d(?='ye\b)|gim(?=me\b)|gon(?=na\b)|got(?=ta\b)|lem(?=me\b)|more(?='n\b)|wan(?=na\s))")
+
+# Número de titulares distintos cuyo resultado se guarda en caché.
+TOKEN_CACHE_SIZE = 1 << 16
 
 # Tipo genérico.
 T = TypeVar('T')
 
 """
-Se dividen las frases de una lista en palabras, se eliminan signos de puntuación.
+Se comprueba que los datos de NLTK estén instalados localmente. Nunca se descargan durante una ejecución: si falta algún recurso se lanza LookupError indicando cómo instalarlo una sola vez. Una vez que la comprobación es exitosa no se repite.
+"""
+@lru_cache(maxsize=None)
+def checkNltkData() -> None:
+    import nltk
+
+    missing = []
+
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+
+    if missing:
+        raise LookupError(f"Faltan datos de NLTK ({', '.join(missing)}), se pueden instalar con: python -m nltk.downloader {' '.join(missing)}")
+
+"""
+Se cargan las stop words en español de NLTK la primera vez que se necesitan.
+
+Retorna:
+El conjunto de stop words.
+"""
+@lru_cache(maxsize=None)
+def stopWords() -> FrozenSet[str]:
+    checkNltkData()
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words("spanish"))
+
+"""
+Se mantiene analytics.STOP_WORDS para el código que lo usa, pero las stop words solo se cargan al accederlo.
+"""
+def __getattr__(name: str):
+    if name == "STOP_WORDS":
+        return stopWords()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+"""
+Se divide un titular en palabras con una sola pasada y se obtienen a la vez sus palabras sin signos de puntuación y sus palabras limpias (en minúscula, sin stop words ni números). Las palabras se internan para que los titulares repetidos compartan las mismas cadenas, y el resultado se guarda en caché por titular.
 
 Parámetros:
-sentences - Lista de frases a separar en palabras.
+sentence - Titular a dividir.
 
 Retorna:
-Las frases divididas en palabras.
+Una tupla donde el primer elemento son las palabras del titular y el segundo sus palabras limpias.
 """
-def tokenize(sentences: List[str]) -> List[List[str]]:
-    tokenized: List[str] = []
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tokenizeSentence(sentence: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    # Se añaden espacios en los mismos puntos en los que nltk.word_tokenize separa las palabras.
+    text = PUNCTUATION.sub(r" \g<0> ", QUOTES.sub("' ", sentence))
+    text = BRACKETS.sub(r" \g<0> ", APOSTROPHES.sub(" ' ", text))
+    text = CONTRACTIONS.sub(r"\g<0> ", CLITICS.sub(" ", f" {text} "))
+    tokens = text.split()
 
-    # Iteramos a través de las oraciones.
-    for sentence in sentences:
-        # Separamos las oraciones en palabras y eliminamos los caracteres no alfanuméricos.
-        tokens = [re.sub(r"\W+", "", token) for token in nltk.word_tokenize(sentence)]
+    # Se eliminan los caracteres no alfanuméricos, si una palabra está compuesta exclusivamente por ellos se elimina.
+    raw = tuple(sys.intern(token) for token in (NON_WORD.sub("", token) for token in tokens) if token != "")
 
-        # Si una palabra está compuesta por caracteres exclusivamente no alfanuméricos, se elimina.
-        tokenized.append([token for token in tokens if token != ""])
-    
-    return tokenized
+    # Si una palabra está en la lista de stop words, es un número o está compuesta por caracteres exclusivamente no alfanuméricos, se elimina.
+    # Se parte de las palabras ya limpias, solo se vuelve a limpiar si al pasar a minúsculas aparece algún caracter no alfanumérico.
+    lowered = (token.lower() for token in raw)
+    stop = stopWords()
+    cleaned = tuple(sys.intern(token) for token in (token if token.isalnum() else NON_WORD.sub("", token) for token in lowered) if token != "" and not token.isnumeric() and token not in stop)
+
+    return raw, cleaned
 
 """
-Se dividen las frases de una lista en palabras y se limpian, se eliminan signos de puntuación y stop words.
+Se dividen las frases de una lista en palabras con una sola pasada por frase, obteniendo tanto las palabras sin signos de puntuación como las palabras limpias.
 
 Parámetros:
-sentences - Lista de frases a limpiar.
+sentences - Frases a dividir, pueden venir de un iterador (por ejemplo Source.headlines).
 
 Retorna:
-Las frases limpiadas.
+Una tupla donde el primer elemento son las frases divididas en palabras (como tokenize) y el segundo las frases limpiadas (como tokenizeAndClean).
 """
-def tokenizeAndClean(sentences: List[str]) -> List[str]:
-    newSentences: List[List[str]] = []
+def tokenizeAll(sentences: Iterable[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    tokenized: List[List[str]] = []
+    cleaned: List[List[str]] = []
 
-    # Iteramos a través de las oraciones.
     for sentence in sentences:
-        # Separamos las oraciones en palabras y eliminamos los caracteres no alfanuméricos.
-        tokens = [re.sub(r"\W+", "", token.lower()) for token in nltk.word_tokenize(sentence)]
+        raw, clean = tokenizeSentence(sentence)
+        tokenized.append(list(raw))
+        cleaned.append(list(clean))
+
+    return tokenized, cleaned
+
+"""
+Igual que tokenizeAll, pero cada frase se divide a medida que se recorre el resultado, sin guardar las frases divididas. Sirve para entrenar la cadena de Markov o contar palabras de un corpus que no cabe en memoria, por ejemplo el de una fuente de sources.
+
+Parámetros:
+sentences - Frases a dividir.
+
+Retorna:
+Un iterador de tuplas donde el primer elemento son las palabras de la frase y el segundo sus palabras limpias.
+"""
+def tokenizeStream(sentences: Iterable[str]) -> Iterator[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    return map(tokenizeSentence, sentences)
+
+"""
+Igual que tokenizeAll, pero las frases se dividen en bloques que se procesan en paralelo en varios procesos. Conviene para corpus grandes, en los que el costo de enviar las frases a los procesos es menor que el de tokenizarlas.
+
+Parámetros:
+sentences - Lista de frases a dividir.
+workers - Número de procesos, por defecto uno por núcleo.
+chunkSize - Número de frases de cada bloque.
+
+Retorna:
+Una tupla donde el primer elemento son las frases divididas en palabras y el segundo las frases limpiadas.
+"""
+def tokenizeAllParallel(sentences: List[str], workers: Optional[int] = None, chunkSize: int = 10000) -> Tuple[List[List[str]], List[List[str]]]:
+    tokenized: List[List[str]] = []
+    cleaned: List[List[str]] = []
+    chunks = [sentences[i:i + chunkSize] for i in range(0, len(sentences), chunkSize)]
 
-        # Si una palabra está en la lista de stop words o está compuesta por caracteres exclusivamente no alfanuméricos, se elimina.
-        newSentences.append([token for token in tokens if token != "" and not token.isnumeric() and token not in STOP_WORDS])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for raw, clean in executor.map(tokenizeAll, chunks):
+            tokenized.extend(raw)
+            cleaned.extend(clean)
 
-    return newSentences
+    return tokenized, cleaned
+
+"""
+Se dividen las frases de una lista en palabras, se eliminan signos de puntuación.
+
+Parámetros:
+sentences - Lista de frases a separar en palabras.
+
+Retorna:
+Las frases divididas en palabras.
+"""
+def tokenize(sentences: Iterable[str]) -> List[List[str]]:
+    return tokenizeAll(sentences)[0]
+
+"""
+Se dividen las frases de una lista en palabras y se limpian, se eliminan signos de puntuación y stop words.
+
+Parámetros:
+sentences - Lista de frases a limpiar.
+
+Retorna:
+Las frases limpiadas.
+"""
+def tokenizeAndClean(sentences: Iterable[str]) -> List[List[str]]:
+    return tokenizeAll(sentences)[1]
 
 """
 Se obtiene la DF de una lista de palabras.
 
 Parámetros:
-words - Lista de palabras.
+words - Palabras, se recorren una sola vez.
 
 Retorna:
 Un diccionario donde las claves son las palabras y los valores son la frecuencia de cada palabra.
 """
-def wordFrequencyDistribution(words: List[str]) -> Dict[str, int]:
+def wordFrequencyDistribution(words: Iterable[str]) -> Dict[str, int]:
     freqDist: Dict[str, int] = dict()
 
     # Iteramos a través de las palabras.
@@ -87,6 +200,18 @@ def wordFrequencyDistribution(words: List[str]) -> Dict[str, int]:
 
     return freqDist
 
+"""
+Se extrae la fecha de un artículo ignorando la hora.
+
+Parámetros:
+timestamp - Fecha de publicación del artículo, por ejemplo "14:30 03 mayo 2022".
+
+Retorna:
+La fecha sin la hora.
+"""
+def articleDate(timestamp: str) -> str:
+    return timestamp.partition(" ")[2]
+
 """
 Se encuentra la palabra más frecuente en las noticias para cada día.
 
@@ -96,14 +221,14 @@ news - Lista de artículos de BBC mundo, cada uno es una Tupla donde el primer e
 Retorna:
 Un diccionario donde las claves son los días y los valores son la palabra más frecuente en cada día.
 """
-def mostCommonWordForDate(news: Tuple[str, List[str]]) -> Dict[str, str]:
+def mostCommonWordForDate(news: Iterable[Tuple[str, List[str]]]) -> Dict[str, str]:
     # Primero se genera una diccionario que tendrá las fechas como claves y la DF de palabras en esa fecha como valor.
     wordsForDates: Dict[str, Dict[str, int]] = dict()
 
     # Se itera a través de las noticias.
     for n in news:
         # Se extrae la fecha ignorando la hora.
-        date = " ".join(n[0].split(" ")[1:])
+        date = articleDate(n[0])
 
         # Por cada palabra en el titular del artículo.
         for word in n[1]:
@@ -136,13 +261,13 @@ news - Lista de artículos de BBC mundo, cada uno es una Tupla donde el primer e
 Retorna:
 Un diccionario donde las claves son los días y los valores son el número de artículo para ese día.
 """
-def articlesForDate(news: List[Tuple[str, str]]) -> Dict[str, int]:
+def articlesForDate(news: Iterable[Tuple[str, str]]) -> Dict[str, int]:
     artForDate: Dict[str, int] = dict()
 
     # Por cada noticia.
     for n in news:
         # Obtenemos fecha del artículo.
-        date = " ".join(n[0].split(" ")[1:])
+        date = articleDate(n[0])
 
         # Se añade la fecha con una cuenta de 1 si no existe o se incrementa la cuenta en caso contrario.
         if date not in artForDate:
@@ -156,19 +281,19 @@ def articlesForDate(news: List[Tuple[str, str]]) -> Dict[str, int]:
 Se encuentra la DF de ngramas en las frases suministradas.
 
 Parámetros:
-sentences - Lista de frases de las cuales extraer ngramas.
+sentences - Frases de las cuales extraer ngramas, se recorren una sola vez.
 n - Número de elementos en el ngrama.
 
 Retorna:
 Un diccionario donde las claves son los ngramas y los valores son la frecuencia de cada ngrama.
 """
-def ngramFrequencyDistribution(sentences: List[List[str]], n: int) -> Dict[Tuple[str], int]:
+def ngramFrequencyDistribution(sentences: Iterable[List[str]], n: int) -> Dict[Tuple[str], int]:
     freqDist: Dict[Tuple[str], int] = dict()
 
     # Por cada frase.
     for sentence in sentences:
-        # Se adquieren los ngramas en esa frase.
-        grams = ngrams(sentence, n)
+        # Se adquieren los ngramas en esa frase, como nltk.util.ngrams.
+        grams = zip(*(sentence[i:] for i in range(n)))
         
         # Por cada ngrama en la frase.
         for ngram in grams:
@@ -194,7 +319,27 @@ Retorna:
 Una distribución de frencuencia que solo incluyo los n elmentos más frecuentes de la DF inicial.
 """
 def getTopN(freqDist: Dict[T, int], n: int) -> Dict[T, int]:
-    return dict(sorted(freqDist.items(), key=lambda item: item[1], reverse=True)[:n])
+    # Se usa un heap de tamaño n en vez de ordenar toda la DF, los empates se resuelven igual que con sorted.
+    return dict(heapq.nlargest(n, freqDist.items(), key=lambda item: item[1]))
+
+"""
+Dibuja un gráfico de barras en unos ejes, sin usar el estado global de pyplot, por lo que se puede usar con cualquier figura (por ejemplo una Figure sin ventana).
+
+Parámetros:
+axes - Ejes en los que se dibuja.
+data - Datos a graficar.
+title - Título del gráfico.
+xLabel - Etiqueta del eje X.
+yLabel - Etiqueta del eje Y.
+"""
+def drawBarGraph(axes: "Axes", data: Dict[T, int], title: str, xLabel: str, yLabel: str) -> None:
+    import pandas as pd
+    import seaborn
+
+    fd = pd.DataFrame(data.items())
+    plot = seaborn.barplot(x=0, y=1, data=fd, ax=axes)
+    plot.set(xlabel = xLabel, ylabel=yLabel, title=title)
+    plot.tick_params(axis="x", labelrotation=20, labelsize=8)
 
 """
 Dibuja un gráfico de barras.
@@ -206,12 +351,11 @@ xLabel - Etiqueta del eje X.
 yLabel - Etiqueta del eje Y.
 """
 def barGraph(data: Dict[T, int], title: str, xLabel: str, yLabel: str) -> None:
-    fd = pd.DataFrame(data.items())
+    import matplotlib.pyplot as plt
+
     global plots
     plt.figure(figsize=(13,6))
-    plot = seaborn.barplot(x=0, y=1, data=fd)
-    plot.set(xlabel = xLabel, ylabel=yLabel, title=title)
-    plot.set_xticklabels(plot.get_xticklabels(), rotation=20, fontsize=8)
+    drawBarGraph(plt.gca(), data, title, xLabel, yLabel)
     plots += 1
     plt.figure(plots)
 
@@ -227,22 +371,23 @@ def plotFreqDist(freqDist: Dict[T, int], title: str, xLabel: str) -> None:
     barGraph(freqDist, title, xLabel, "Frecuencia")
 
 """
-Dibuja una línea temporal.
+Dibuja una línea temporal en unos ejes, sin usar el estado global de pyplot.
 
 Parámetros:
-data - Datos a dibujar. (Por ahora solo acepta el diccionario de palabrás más frecuentes para cada fecha)
+axes - Ejes en los que se dibuja.
+data - Datos a dibujar en orden cronológico. (Por ahora solo acepta el diccionario de palabrás más frecuentes para cada fecha)
 title - Título del gráfico.
 """
-def timeline(data: Dict[str, str], title: str) -> None:
+def drawTimeline(axes: "Axes", data: Dict[str, str], title: str) -> None:
+    from matplotlib.artist import setp
+    from numpy import zeros
+
     length = len(data)
 
     # Se obtienen la fecha.
-    dates = [key for key in reversed(data.keys())]
-    global plots
+    dates = list(data.keys())
 
     # Se inicializa el gráfico.
-    plt.figure(figsize=(13, 4))
-    axes = plt.gca()
     axes.set_ylim(-2, 1.75)
 
     # Se dibuja una línea horizontal para representar el eje del gráfico.
@@ -260,10 +405,10 @@ def timeline(data: Dict[str, str], title: str) -> None:
     stems = zeros(len(dates))
     stems[::2] = 0.3
     stems[1::2] = -0.3   
-    markerline, stemline, baseline = axes.stem(dates, stems, use_line_collection=True)
-    plt.setp(markerline, marker=',', color='darkmagenta')
-    plt.setp(stemline, color='darkmagenta')
-    plt.setp(axes.xaxis.get_majorticklabels(), rotation=20)
+    markerline, stemline, baseline = axes.stem(dates, stems)
+    setp(markerline, marker=',', color='darkmagenta')
+    setp(stemline, color='darkmagenta')
+    setp(axes.xaxis.get_majorticklabels(), rotation=20)
 
     # Se esconden Los ejes del gráfico.
     for spine in ["left", "top", "right", "bottom"]:
@@ -273,47 +418,48 @@ def timeline(data: Dict[str, str], title: str) -> None:
  
     axes.set_title(title, fontweight="bold", fontfamily='serif', fontsize=16, color='royalblue')
 
-    plots += 1
-    plt.figure(plots)
-
 """
-Dibuja una nube de palabras que se solicita de una API externa.
+Dibuja una línea temporal.
 
 Parámetros:
-words - Palabras que harán parte de esta nube de palabras, la frecuencia de estas afectará el tamaño de la letra.
+data - Datos a dibujar en orden cronológico. (Por ahora solo acepta el diccionario de palabrás más frecuentes para cada fecha)
+title - Título del gráfico.
 """
-def wordcloud(words: List[str]):
-    # La API se basa de una solo texto para dibujar la nube de palabras, se une la lista de palabras en una sola string separada por espacio.
-    text = " ".join(words)
+def timeline(data: Dict[str, str], title: str) -> None:
+    import matplotlib.pyplot as plt
 
-    # Para solicitar la nube de palabras a la API, se le debe enviar un objeto en formato JSON con la información de la solicitud. El texto se añade a una clave llamada 'text'.
-    payload = json.dumps({
-        "format": "png",
-        "width": 1000,
-        "height": 1000,
-        "fontScale": 15,
-        "scale": "linear",
-        "removeStopwords": True,
-        "minWordLength": 2,
-        "text": text
-    }).encode("utf-8")
+    global plots
+    plt.figure(figsize=(13, 4))
+    drawTimeline(plt.gca(), data, title)
+    plots += 1
+    plt.figure(plots)
 
-    # Usamos urllib para realizar una solicitud POST a la API externa.
-    req = request.Request("https://quickchart.io/wordcloud", method="POST")
+"""
+Dibuja una nube de palabras a partir de la distribución de frecuencia de las palabras. Por defecto se dibuja localmente; las nubes ya dibujadas con las mismas frecuencias se toman de la caché (ver word_cloud).
 
-    # Especificamos que el formato de los datos es JSON.
-    req.add_header("Content-Type", "application/json")
+Parámetros:
+freqDist - Distribución de frecuencia de las palabras, la frecuencia afecta el tamaño de la letra.
+path - Archivo donde se guarda la imagen, None para no guardarla.
+remote - Si es verdadero la nube se solicita a la API externa en un hilo de un pool limitado, sin bloquear.
 
-    # Definimos un nuevo hilo en el cual se realizará la solicitud y se obtendrá la respuesta de manera asíncrona, de esta manera evitamos bloquear el resto del código mientras se espera a la respuesta de la API.
-    def thread() -> None:
-        # Se ejecuta la solicitud, asignando el objeto JSON como datos.
-        with request.urlopen(req, data=payload, context=context) as response:
-            # Una vez se obtiene la respuesta, leemos esta como una imagen.
-            image = Image.open(response)
-            image.show()
+Retorna:
+Un Future con la imagen, que ya está listo si la nube se dibujó localmente.
+"""
+def wordcloud(freqDist: Dict[str, int], path: Optional[str] = None, remote: bool = False) -> "Future[Image.Image]":
+    from word_cloud import localWordCloud, remoteWordCloud
 
-    # Se inicia el hilo.
-    Thread(target=thread).start()
+    if remote:
+        future = remoteWordCloud(freqDist)
+    else:
+        future = Future()
+        future.set_result(localWordCloud(freqDist))
 
+    # La imagen se guarda cuando esté lista.
+    def save(done: "Future[Image.Image]") -> None:
+        if done.exception() is None:
+            done.result().save(path)
 
+    if path is not None:
+        future.add_done_callback(save)
 
+    return future
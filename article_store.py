@@ -0,0 +1,137 @@
+from typing import Iterable, List, Optional, Tuple
+import hashlib
+import sqlite3
+
+"""
+Se calcula el identificador de un artículo a partir de su titular.
+
+Parámetros:
+headline - Titular del artículo.
+
+Retorna:
+El hash del titular en hexadecimal.
+"""
+def articleHash(headline: str) -> str:
+    return hashlib.blake2b(" ".join(headline.split()).encode("utf-8"), digest_size=16).hexdigest()
+
+"""
+Almacén local de artículos en SQLite. Guarda los artículos sin repetir (por el hash de su titular) en el orden en el que aparecen en BBC Mundo, los validadores HTTP (ETag y Last-Modified) de cada página y el estado del rastreo para poder continuarlo.
+
+Los artículos se ordenan con una secuencia: los artículos nuevos que aparecen al inicio de la sección reciben secuencias menores que las existentes y los artículos antiguos que se obtienen al continuar el rastreo reciben secuencias mayores.
+
+Parámetros:
+path - Ruta de la base de datos.
+"""
+class ArticleStore:
+    __connection: sqlite3.Connection
+
+    def __init__(self, path: str = "news.db") -> None:
+        self.__connection = sqlite3.connect(path)
+        self.__connection.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (hash TEXT PRIMARY KEY, sequence INTEGER NOT NULL, timestamp TEXT NOT NULL, headline TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS articles_sequence ON articles (sequence);
+            CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, lastModified TEXT);
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+
+    def __enter__(self) -> "ArticleStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    """
+    Retorna:
+    El número de artículos guardados.
+    """
+    def count(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    """
+    Se filtran los artículos que ya están guardados.
+
+    Parámetros:
+    articles - Lista de tuplas (fecha, titular).
+
+    Retorna:
+    Los artículos que no están guardados, en el mismo orden.
+    """
+    def unseen(self, articles: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        if not articles:
+            return []
+
+        hashes = [articleHash(headline) for _, headline in articles]
+        placeholders = ",".join("?" * len(hashes))
+        seen = { row[0] for row in self.__connection.execute(f"SELECT hash FROM articles WHERE hash IN ({placeholders})", hashes) }
+
+        return [article for article, h in zip(articles, hashes) if h not in seen]
+
+    """
+    Se guardan artículos nuevos, los artículos repetidos se ignoran.
+
+    Parámetros:
+    articles - Lista de tuplas (fecha, titular) en el orden en el que aparecen en la sección.
+    front - Si es verdadero los artículos son más recientes que los guardados, de lo contrario son más antiguos.
+
+    Retorna:
+    El número de artículos añadidos.
+    """
+    def add(self, articles: List[Tuple[str, str]], front: bool = False) -> int:
+        first, last = self.__connection.execute("SELECT MIN(sequence), MAX(sequence) FROM articles").fetchone()
+        start = (first or 0) - len(articles) if front else (last if last is not None else -1) + 1
+        before = self.__connection.total_changes
+
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT OR IGNORE INTO articles (hash, sequence, timestamp, headline) VALUES (?, ?, ?, ?)",
+                ((articleHash(headline), start + i, timestamp, headline) for i, (timestamp, headline) in enumerate(articles))
+            )
+
+        return self.__connection.total_changes - before
+
+    """
+    Se obtienen los artículos más recientes.
+
+    Parámetros:
+    n - Número máximo de artículos a obtener.
+
+    Retorna:
+    Una lista de tuplas (fecha, titular), del más reciente al más antiguo.
+    """
+    def latest(self, n: int) -> List[Tuple[str, str]]:
+        return self.__connection.execute("SELECT timestamp, headline FROM articles ORDER BY sequence LIMIT ?", (n,)).fetchall()
+
+    """
+    Retorna:
+    Todos los artículos guardados, del más reciente al más antiguo, sin cargarlos todos en memoria.
+    """
+    def articles(self) -> Iterable[Tuple[str, str]]:
+        return self.__connection.execute("SELECT timestamp, headline FROM articles ORDER BY sequence")
+
+    """
+    Se obtienen los validadores HTTP de la última descarga de una página.
+
+    Parámetros:
+    url - URL de la página.
+
+    Retorna:
+    Una tupla (ETag, Last-Modified), cada uno puede ser None.
+    """
+    def validators(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        row = self.__connection.execute("SELECT etag, lastModified FROM pages WHERE url = ?", (url,)).fetchone()
+        return row if row is not None else (None, None)
+
+    def setValidators(self, url: str, etag: Optional[str], lastModified: Optional[str]) -> None:
+        with self.__connection:
+            self.__connection.execute("INSERT OR REPLACE INTO pages (url, etag, lastModified) VALUES (?, ?, ?)", (url, etag, lastModified))
+
+    def getState(self, key: str) -> Optional[str]:
+        row = self.__connection.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def setState(self, key: str, value: str) -> None:
+        with self.__connection:
+            self.__connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
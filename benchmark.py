@@ -0,0 +1,1024 @@
+from contextlib import ExitStack
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import os
+import random
+import sys
+import tempfile
+import time
+from compiled_graph import CompiledWordChainGraph
+from word_chain_graph import WordChainGraph
+
+"""
+Genera un corpus sintético de frases tokenizadas. Las palabras siguen una distribución de Zipf, por lo que unas pocas palabras (como "de" o "el") aparecen en casi todas las frases.
+
+Parámetros:
+sentences - Número de frases a generar.
+vocabulary - Número de palabras distintas.
+seed - Semilla del generador aleatorio.
+
+Retorna:
+Una lista de frases, cada una representada como una lista de palabras.
+"""
+def syntheticCorpus(sentences: int, vocabulary: int = 20000, seed: int = 0) -> List[List[str]]:
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    weights = [1 / (i + 1) for i in range(vocabulary)]
+    lengths = [rng.randint(6, 16) for _ in range(sentences)]
+    tokens = iter(rng.choices(words, weights=weights, k=sum(lengths)))
+
+    return [[next(tokens) for _ in range(length)] for length in lengths]
+
+"""
+Genera titulares sintéticos en español con signos de puntuación, números y comillas, para comparar tokenizadores.
+
+Parámetros:
+n - Número de titulares a generar.
+seed - Semilla del generador aleatorio.
+
+Retorna:
+Una lista de titulares.
+"""
+def syntheticHeadlines(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    words = ["el", "la", "de", "en", "gobierno", "presidente", "guerra", "crisis", "elecciones", "economía", "Ucrania", "Rusia", "México", "EE.UU.", "acuerdo", "protestas", "récord", "Biden's", "covid-19", "3,5%", "2.000", "US$10", "1:30"]
+    patterns = ["{}", "{},", "{}:", "¿{}?", "«{}»", "\"{}\"", "({})", "{}...", "{} -", "'{}'"]
+
+    return [" ".join(rng.choice(patterns).format(word) for word in rng.choices(words, k=rng.randint(5, 14))) for _ in range(n)]
+
+"""
+Mide cuántas frases por segundo produce una función generadora.
+
+Parámetros:
+generate - Función que recibe el número de frases a generar.
+n - Número de frases a generar.
+
+Retorna:
+El número de frases generadas por segundo.
+"""
+def sentencesPerSecond(generate, n: int) -> float:
+    start = time.perf_counter()
+    generate(n)
+    return n / (time.perf_counter() - start)
+
+"""
+Calcula el error máximo entre la distribución implícita en las tablas alias y la distribución de pesos original de cada palabra.
+
+Parámetros:
+compiled - Grafo compilado.
+
+Retorna:
+La mayor diferencia absoluta entre la probabilidad de una transición según las tablas alias y según los pesos.
+"""
+def aliasError(compiled: CompiledWordChainGraph) -> float:
+    error = 0.0
+
+    for table in compiled.levels:
+        for row in range(len(table.offsets) - 1):
+            start, stop = table.offsets[row], table.offsets[row + 1]
+            degree = stop - start
+
+            if degree == 0:
+                continue
+
+            # Cada columna aporta prob / k a su transición y el resto a su alias.
+            implied = [0.0] * degree
+            for edge in range(start, stop):
+                implied[edge - start] += table.prob[edge] / degree
+                implied[table.alias[edge] - start] += (1 - table.prob[edge]) / degree
+
+            total = sum(table.weights[start:stop])
+            error = max(error, max(abs(implied[i] - table.weights[start + i] / total) for i in range(degree)))
+
+    return error
+
+"""
+Compara la generación de frases del grafo de diccionarios contra el grafo compilado con tablas alias.
+
+Parámetros:
+sizes - Tamaños de corpus a probar.
+n - Número de frases a generar en cada prueba.
+"""
+def benchmarkGeneration(sizes: List[int], n: int = 2000) -> None:
+    print(f"{'frases':>10} {'dict (fr/s)':>14} {'compilado (fr/s)':>18} {'aceleración':>12} {'error alias':>12}")
+
+    for size in sizes:
+        corpus = syntheticCorpus(size)
+
+        graph = WordChainGraph()
+        graph.load(corpus)
+        compiled = WordChainGraph()
+        compiled.load(corpus)
+        error = aliasError(compiled.compile())
+
+        slow = sentencesPerSecond(lambda k: graph.generateSentences(k, seed=0), n)
+        fast = sentencesPerSecond(lambda k: compiled.generateSentences(k, seed=0), n)
+
+        print(f"{size:>10} {slow:>14.0f} {fast:>18.0f} {fast / slow:>11.1f}x {error:>12.1e}")
+
+"""
+Compara la generación frase por frase del grafo compilado contra la generación por lotes vectorizada.
+
+Parámetros:
+sizes - Tamaños de corpus a probar.
+n - Número de frases a generar en cada lote.
+"""
+def benchmarkBatch(sizes: List[int], n: int = 1000000) -> None:
+    print(f"{'frases':>10} {'compilado (fr/s)':>18} {'lote (fr/s)':>14} {'aceleración':>12} {'truncadas':>10}")
+
+    for size in sizes:
+        graph = WordChainGraph()
+        graph.load(syntheticCorpus(size))
+        graph.compile()
+
+        single = sentencesPerSecond(lambda k: graph.generateSentences(k, seed=0), n // 20)
+        start = time.perf_counter()
+        batch = graph.generateBatch(n, maxLength=30, seed=0)
+        batched = n / (time.perf_counter() - start)
+
+        print(f"{size:>10} {single:>18.0f} {batched:>14.0f} {batched / single:>11.1f}x {int((~batch.finished).sum()):>10}")
+
+"""
+Compara la memoria y la velocidad de generación de cadenas de distintos órdenes.
+
+Parámetros:
+size - Tamaño del corpus.
+orders - Órdenes a probar.
+n - Número de frases a generar en cada prueba.
+"""
+def benchmarkOrders(size: int, orders: List[int], n: int = 2000) -> None:
+    corpus = syntheticCorpus(size)
+    headlines = set(" ".join(sentence) + "." for sentence in corpus)
+    print(f"{'orden':>6} {'dict (MB)':>10} {'compilado (MB)':>15} {'fr/s':>10} {'copias':>8} {'error alias':>12}")
+
+    for order in orders:
+        graph = WordChainGraph(order)
+        graph.load(corpus)
+        compiled = graph.compile()
+
+        start = time.perf_counter()
+        sentences = graph.generateSentences(n, seed=0)
+        speed = n / (time.perf_counter() - start)
+        copies = sum(sentence in headlines for sentence in sentences) / n
+
+        # Memoria por orden acumulada hasta el orden actual.
+        print(f"{order:>6} {sum(graph.memoryUsage().values()) / 2**20:>10.1f} {sum(compiled.memoryUsage().values()) / 2**20:>15.1f} {speed:>10.0f} {copies:>8.1%} {aliasError(compiled):>12.1e}")
+
+"""
+Compara el tiempo de entrenar y compilar un grafo contra el tiempo de abrir el mismo grafo guardado en formato binario.
+
+Parámetros:
+size - Tamaño del corpus.
+order - Orden de la cadena.
+"""
+def benchmarkPersistence(size: int, order: int = 2) -> None:
+    corpus = syntheticCorpus(size)
+
+    start = time.perf_counter()
+    graph = WordChainGraph(order)
+    graph.load(corpus)
+    graph.compile()
+    train = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.wcg")
+        graph.save(path)
+
+        start = time.perf_counter()
+        opened = CompiledWordChainGraph.open(path)
+        opened.generateSentences(1, seed=0)
+        load = time.perf_counter() - start
+
+        print(f"entrenar y compilar: {train * 1000:.1f} ms, abrir y generar: {load * 1000:.1f} ms, archivo: {os.path.getsize(path) / 2**20:.1f} MB")
+
+"""
+Compara generar frases con restricciones (longitud, originalidad) comprobándolas durante el recorrido contra generar frases sin restricciones y filtrarlas después.
+
+Parámetros:
+size - Tamaño del corpus.
+n - Número de frases válidas a obtener.
+order - Orden de la cadena.
+minLength - Número mínimo de palabras.
+maxLength - Número máximo de palabras.
+"""
+def benchmarkConstrained(size: int, n: int = 2000, order: int = 2, minLength: int = 5, maxLength: int = 20) -> None:
+    corpus = syntheticCorpus(size)
+    graph = WordChainGraph(order)
+    graph.load(corpus)
+    compiled = graph.compile()
+    overlap = compiled.originality.n
+
+    # Para filtrar después se necesitan las frases y los n-gramas de entrenamiento como conjuntos de tuplas.
+    training = { tuple(sentence) for sentence in corpus }
+    ngrams = { tuple(sentence[i:i + overlap]) for sentence in corpus for i in range(len(sentence) - overlap + 1) }
+
+    start = time.perf_counter()
+    accepted: List[str] = []
+    candidates = 0
+
+    # Se generan lotes pequeños para no generar muchas más frases de las necesarias.
+    while len(accepted) < n:
+        for sentence in compiled.generateSentences(max(1, n // 20), seed=candidates):
+            words = sentence[:-1].split(" ")
+            candidates += 1
+
+            if minLength <= len(words) <= maxLength and tuple(words) not in training and not any(tuple(words[i:i + overlap]) in ngrams for i in range(len(words) - overlap + 1)):
+                accepted.append(sentence)
+    afterwards = time.perf_counter() - start
+
+    start = time.perf_counter()
+    constrained = compiled.generateSentences(n, seed=0, minLength=minLength, maxLength=maxLength, original=True)
+    during = time.perf_counter() - start
+
+    print(f"{n} frases de {minLength} a {maxLength} palabras sin copiar {overlap} palabras seguidas, orden {order}: filtrando después {afterwards:.2f} s ({candidates} candidatas), durante el recorrido {during:.2f} s ({len(constrained)} frases, {afterwards / during:.1f}x)")
+
+"""
+Mide la velocidad del scrapper contra un servidor local con páginas sintéticas, para distintos números de descargas concurrentes.
+
+Parámetros:
+n - Número de artículos a obtener.
+workers - Números de hilos a probar.
+latency - Tiempo que tarda el servidor en responder cada página, en segundos.
+"""
+def benchmarkScrap(n: int, workers: List[int], latency: float = 0.05) -> None:
+    from fixture_server import FixtureServer
+    from scrap_news import ScrapStats, scrap
+
+    print(f"{'hilos':>6} {'páginas/s':>10} {'artículos/s':>12} {'conexiones':>11}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in workers:
+            with FixtureServer(latency=latency) as server:
+                stats = ScrapStats()
+                scrap(n, server.url, count, os.path.join(directory, "news.csv"), stats=stats)
+                print(f"{count:>6} {stats.pagesPerSecond():>10.1f} {stats.articlesPerSecond():>12.0f} {server.connections:>11}")
+
+"""
+Mide cuántas solicitudes requiere el rastreo incremental con un almacén de artículos: un rastreo inicial, uno sin cambios en la sección y uno después de publicar artículos nuevos.
+
+Parámetros:
+n - Número de artículos a obtener.
+published - Número de artículos nuevos publicados entre rastreos.
+"""
+def benchmarkIncremental(n: int = 1000, published: int = 10) -> None:
+    from article_store import ArticleStore
+    from fixture_server import FixtureServer, SyntheticFeed
+    from scrap_news import ScrapStats, scrap
+
+    feed = SyntheticFeed()
+
+    with tempfile.TemporaryDirectory() as directory, FixtureServer(feed) as server, ArticleStore(os.path.join(directory, "news.db")) as store:
+        for name, count in (("inicial", 0), ("sin cambios", 0), (f"{published} nuevos", published)):
+            feed.publish(count)
+
+            stats = ScrapStats()
+            requests = server.requests
+            scrap(n, server.url, 4, os.path.join(directory, "news.csv"), store=store, stats=stats)
+            print(f"{name:>12}: {server.requests - requests} solicitudes, {stats.notModified} sin cambios, {stats.seconds * 1000:.0f} ms")
+
+"""
+Verifica que el rastreo siga las redirecciones de una sección movida dentro del mismo servidor y a otro servidor, obteniendo los mismos artículos que con la URL final, y que un ciclo de redirecciones termine con un error.
+
+Parámetros:
+n - Número de artículos a obtener.
+"""
+def benchmarkRedirects(n: int = 240) -> None:
+    from urllib.error import HTTPError
+    from fixture_server import FixtureServer, SyntheticFeed
+    from scrap_news import scrap
+
+    feed = SyntheticFeed()
+
+    with tempfile.TemporaryDirectory() as directory, FixtureServer(feed) as target:
+        path = os.path.join(directory, "news.csv")
+        expected = scrap(n, target.url, 4, path)
+
+        with FixtureServer(feed, redirects={ "/mundo/topics/viejo": "/mundo/topics/fixture" }) as server:
+            moved = scrap(n, server.urlFor("/mundo/topics/viejo"), 4, path)
+            print(f"Mismo servidor: iguales {moved == expected}, {server.requests} solicitudes")
+
+        with FixtureServer(feed, redirects={ "/mundo/topics/viejo": target.url }) as server:
+            moved = scrap(n, server.urlFor("/mundo/topics/viejo"), 4, path)
+            print(f"Otro servidor: iguales {moved == expected}, {server.requests} solicitudes")
+
+        with FixtureServer(feed, redirects={ "/a": "/b", "/b": "/a" }) as server:
+            try:
+                scrap(n, server.urlFor("/a"), 4, path)
+                print("Ciclo de redirecciones: no se detectó")
+            except HTTPError as error:
+                print(f"Ciclo de redirecciones: {error}")
+
+"""
+Compara los extractores de html sobre las páginas guardadas en fixtures, verificando que encuentren los mismos artículos y que sus fechas se conviertan.
+
+Parámetros:
+repeat - Número de veces que se analiza cada página.
+"""
+def benchmarkExtraction(repeat: int = 50) -> None:
+    from columnar import parseTimestamp
+    from dates import MONTH_NAMES
+    from extractors import EXTRACTORS
+    from scrap_news import parsePage
+
+    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+    pages = [open(os.path.join(directory, name), "rb").read() for name in sorted(os.listdir(directory)) if name.endswith(".html")]
+    expected = [EXTRACTORS["soup"](page) for page in pages]
+
+    print(f"{'extractor':>10} {'ms/página':>10} {'iguales':>8}")
+
+    for name, extractor in EXTRACTORS.items():
+        start = time.perf_counter()
+
+        for _ in range(repeat):
+            found = [extractor(page) for page in pages]
+
+        elapsed = (time.perf_counter() - start) / (repeat * len(pages))
+        print(f"{name:>10} {elapsed * 1000:>10.2f} {str(found == expected):>8}")
+
+    # Las fechas de las páginas (solo la hora, solo la fecha o ambas) se convierten sin depender del locale y columnar las acepta.
+    dated = [timestamp for page in pages for timestamp, _ in parsePage(page, "soup")]
+    parsed = [parseTimestamp(timestamp) for timestamp in dated]
+    print(f"Fechas convertidas: {len(dated)}, de {min(parsed)} a {max(parsed)}, meses en español: {all(timestamp.split(' ')[2] in MONTH_NAMES for timestamp in dated)}")
+
+"""
+Compara el tokenizador de una sola pasada contra la tokenización original con nltk.word_tokenize (una pasada para tokenize y otra para tokenizeAndClean), verificando que produzcan las mismas palabras.
+
+Parámetros:
+sizes - Números de titulares a probar.
+"""
+def benchmarkTokenize(sizes: List[int]) -> None:
+    import re
+    import nltk
+    from analytics import STOP_WORDS, tokenizeAll, tokenizeAllParallel, tokenizeSentence
+
+    def reference(sentences: List[str]):
+        tokenized = [[token for token in (re.sub(r"\W+", "", token) for token in nltk.word_tokenize(sentence)) if token != ""] for sentence in sentences]
+        cleaned = [[token for token in (re.sub(r"\W+", "", token.lower()) for token in nltk.word_tokenize(sentence)) if token != "" and not token.isnumeric() and token not in STOP_WORDS] for sentence in sentences]
+        return tokenized, cleaned
+
+    print(f"{'titulares':>10} {'nltk (s)':>9} {'frío (s)':>9} {'caché (s)':>10} {'paralelo (s)':>13} {'iguales':>8}")
+
+    for size in sizes:
+        # Se repiten titulares, como ocurre al tokenizar el mismo corpus varias veces.
+        headlines = syntheticHeadlines(size // 2) * 2
+        times = []
+
+        for tokenizer in (reference, tokenizeAll, tokenizeAll, tokenizeAllParallel):
+            if tokenizer is tokenizeAllParallel or len(times) == 1:
+                tokenizeSentence.cache_clear()
+
+            start = time.perf_counter()
+            result = tokenizer(headlines)
+            times.append(time.perf_counter() - start)
+
+            if tokenizer is reference:
+                expected = result
+            else:
+                equal = result == expected
+
+        print(f"{size:>10} {times[0]:>9.2f} {times[1]:>9.2f} {times[2]:>10.2f} {times[3]:>13.2f} {str(equal):>8}")
+
+"""
+Compara las estadísticas de main.py calculadas con una pasada por cada métrica contra el agregador de una sola pasada, verificando que den el mismo resultado.
+
+Parámetros:
+sizes - Números de artículos a probar.
+"""
+def benchmarkAnalytics(sizes: List[int]) -> None:
+    from aggregator import NewsAggregator
+    from analytics import articlesForDate, getTopN, mostCommonWordForDate, ngramFrequencyDistribution, tokenizeAll, wordFrequencyDistribution
+
+    print(f"{'artículos':>10} {'por métrica (s)':>16} {'una pasada (s)':>15} {'iguales':>8}")
+
+    for size in sizes:
+        rng = random.Random(size)
+        months = ["enero", "febrero", "marzo", "abril", "mayo", "junio"]
+        news = [(f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} {rng.randint(1, 28):02d} {rng.choice(months)} 2022", headline) for headline in syntheticHeadlines(size, seed=size)]
+        tokenizeAll([headline for _, headline in news])
+
+        # Estadísticas calculadas como en main.py antes del agregador.
+        start = time.perf_counter()
+        tokenized, cleaned = tokenizeAll([headline for _, headline in news])
+        words = [word for sentence in cleaned for word in sentence]
+        expected = (
+            getTopN(wordFrequencyDistribution(words), 10),
+            mostCommonWordForDate([(n[0], headline) for n, headline in zip(news, cleaned)]),
+            articlesForDate(news),
+            getTopN(ngramFrequencyDistribution(tokenized, 2), 10),
+            getTopN(ngramFrequencyDistribution(tokenized, 3), 10)
+        )
+        perMetric = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = NewsAggregator(maxOrder=3).addAll(iter(news))
+        result = (stats.topWords(10), stats.mostCommonWordForDate(), stats.articlesForDate(), stats.topNgrams(2, 10), stats.topNgrams(3, 10))
+        onePass = time.perf_counter() - start
+
+        print(f"{size:>10} {perMetric:>16.2f} {onePass:>15.2f} {str(result == expected):>8}")
+
+"""
+Estima la memoria que ocupa una distribución de frecuencia exacta, incluyendo sus claves.
+"""
+def dictBytes(freqDist: dict) -> int:
+    return sys.getsizeof(freqDist) + sum(sys.getsizeof(key) + sys.getsizeof(count) for key, count in freqDist.items())
+
+"""
+Compara el conteo aproximado de trigramas (Count-Min Sketch con las claves más frecuentes) contra el conteo exacto sobre un corpus sintético: memoria, cuántos de los 10 trigramas más frecuentes encuentra, el error de sus frecuencias frente a la cota del sketch y si el resultado de unir varios fragmentos coincide con el de contarlos juntos.
+
+Parámetros:
+size - Número de frases del corpus.
+epsilons - Errores máximos a probar.
+capacity - Número de trigramas candidatos que se conservan.
+shards - Número de fragmentos en los que se divide el corpus para probar la unión.
+"""
+def benchmarkSketch(size: int, epsilons: List[float], capacity: int = 1000, shards: int = 4) -> None:
+    from aggregator import NewsAggregator
+
+    # Se usa un vocabulario pequeño para que haya trigramas frecuentes, como en los titulares reales.
+    news = [("12:00 03 mayo 2022", " ".join(sentence)) for sentence in syntheticCorpus(size, vocabulary=2000, seed=size)]
+    exact = NewsAggregator(maxOrder=3).addAll(news)
+    trigrams = exact.ngramFrequencyDistribution(3)
+    expected = exact.topNgrams(3, 10)
+
+    print(f"{size} frases, {len(trigrams)} trigramas distintos, conteo exacto: {dictBytes(trigrams) / 2 ** 20:.1f} MiB")
+    print(f"{'epsilon':>8} {'memoria (MiB)':>14} {'top 10':>7} {'error máx':>10} {'cota':>8} {'unión top 10':>13}")
+
+    for epsilon in epsilons:
+        approximate = NewsAggregator(maxOrder=3, capacity=capacity, epsilon=epsilon).addAll(news)
+        counter = approximate.ngramCounter(3)
+        result = approximate.topNgrams(3, 10)
+        error = max(result.get(ngram, counter.sketch.estimate(ngram)) - count for ngram, count in expected.items())
+        memory = (counter.nbytes() + dictBytes(counter.frequencyDistribution())) / 2 ** 20
+
+        # Se cuenta cada fragmento por separado y se unen los resultados.
+        merged = NewsAggregator(maxOrder=3, capacity=capacity, epsilon=epsilon)
+        for shard in range(shards):
+            merged.merge(NewsAggregator(maxOrder=3, capacity=capacity, epsilon=epsilon).addAll(news[shard::shards]))
+
+        print(f"{epsilon:>8} {memory:>14.2f} {len(result.keys() & expected.keys()):>7} {error:>10} {counter.errorBound():>8.0f} {len(merged.topNgrams(3, 10).keys() & expected.keys()):>13}")
+
+"""
+Mide cómo escala el procesamiento del corpus (tokenizar, entrenar la cadena de Markov y calcular las estadísticas) con el número de procesos, y verifica que el resultado sea el mismo que con un solo proceso.
+
+Parámetros:
+size - Número de artículos del corpus.
+workers - Números de procesos a probar, por defecto de 1 al número de núcleos.
+"""
+def benchmarkPipeline(size: int, workers: Optional[List[int]] = None) -> None:
+    from analytics import tokenizeSentence
+    from pipeline import runPipeline
+
+    workers = workers if workers is not None else list(range(1, (os.cpu_count() or 1) + 1))
+    news = [("12:00 03 mayo 2022", headline) for headline in syntheticHeadlines(size, seed=size)]
+    expected = None
+
+    print(f"{os.cpu_count()} núcleos, {size} artículos")
+    print(f"{'procesos':>9} {'tiempo (s)':>11} {'aceleración':>12} {'igual':>6}")
+
+    for count in workers:
+        # Se vacía la caché del tokenizador para que el proceso principal no tenga ventaja.
+        tokenizeSentence.cache_clear()
+        start = time.perf_counter()
+        result = runPipeline(news, workers=count)
+        elapsed = time.perf_counter() - start
+        summary = (result.graph.generateSentences(50, seed=1), result.stats.topWords(10), result.stats.topNgrams(3, 10), result.stats.articlesForDate())
+
+        if expected is None:
+            expected, baseline = summary, elapsed
+
+        print(f"{count:>9} {elapsed:>11.2f} {baseline / elapsed:>11.2f}x {str(summary == expected):>6}")
+
+    print(f"Etapas contadas igual con 1 y 2 procesos: {profileCounts(news, 1) == profileCounts(news, 2)}")
+
+    # Con una lista el número de partes (y por lo tanto de uniones) depende de los procesos, solo se verifica que ambos caminos midan pipeline.map.
+    print(f"Etapa pipeline.map medida en una lista con 1 y 2 procesos: {all('pipeline.map' in profileCounts(news, workers, False) for workers in (1, 2))}")
+
+"""
+Se procesa un corpus con el perfilado activado, dentro de una etapa del proceso principal.
+
+Parámetros:
+news - Artículos del corpus.
+workers - Número de procesos.
+stream - Si es verdadero el corpus se procesa como flujo, si no como lista.
+
+Retorna:
+Un diccionario donde las claves son los nombres de las etapas y los valores su número de llamadas. Con el mismo tamaño de parte el número de partes no depende de los procesos, por lo que debe ser el mismo para cualquier número de procesos: si los procesos del pool reenviaran las etapas del proceso principal, "benchmark" tendría más de una llamada.
+"""
+def profileCounts(news: List[Tuple[str, str]], workers: int, stream: bool = True) -> Dict[str, int]:
+    from pipeline import runPipeline
+    from profiling import PROFILER, stage
+
+    PROFILER.enable()
+
+    try:
+        with stage("benchmark"):
+            runPipeline(iter(news) if stream else news, workers=workers, shardSize=max(1, len(news) // 4))
+
+        return { stats["name"]: stats["calls"] for stats in PROFILER.drain() }
+    finally:
+        PROFILER.disable()
+
+"""
+Compara las consultas por rango de fechas sobre las columnas ordenadas por fecha contra recorrer todos los artículos con las funciones de analytics y filtrar por fecha.
+
+Parámetros:
+size - Número de artículos.
+queries - Número de consultas de una semana en fechas aleatorias.
+"""
+def benchmarkColumnar(size: int, queries: int = 100) -> None:
+    import numpy as np
+    from analytics import articlesForDate, mostCommonWordForDate, tokenizeAll
+    from columnar import ArticleColumns, parseDay
+
+    rng = random.Random(size)
+    months = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+    news = [(f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} {rng.randint(1, 28):02d} {rng.choice(months)} {rng.randint(2019, 2022)}", headline) for headline in syntheticHeadlines(size, seed=size)]
+    cleaned = tokenizeAll([headline for _, headline in news])[1]
+
+    start = time.perf_counter()
+    columns = ArticleColumns.fromArticles(news)
+    build = time.perf_counter() - start
+    weeks = [np.datetime64("2019-01-01") + np.timedelta64(rng.randint(0, 4 * 365), "D") for _ in range(queries)]
+
+    # Recorriendo todos los artículos en cada consulta, como hacen articlesForDate y mostCommonWordForDate.
+    start = time.perf_counter()
+    for week in weeks:
+        inRange = [i for i, (timestamp, _) in enumerate(news) if week <= parseDay(timestamp.partition(" ")[2]) < week + 7]
+        articlesForDate([news[i] for i in inRange])
+        mostCommonWordForDate([(news[i][0], cleaned[i]) for i in inRange])
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for week in weeks:
+        columns.articlesPerPeriod("D", week, week + 7)
+        columns.mostCommonWordPerPeriod("D", week, week + 7)
+    indexed = time.perf_counter() - start
+
+    print(f"{size} artículos, {queries} consultas de una semana: construcción {build:.2f} s, recorriendo {scan:.2f} s, columnas {indexed:.3f} s ({scan / indexed:.0f}x)")
+
+"""
+Mide el tiempo de dibujar un reporte en archivos con uno y con varios procesos, y el de volver a generarlo sin cambios (todos los gráficos se toman de la caché).
+
+Parámetros:
+charts - Número de gráficos del reporte.
+"""
+def benchmarkRendering(charts: int = 10) -> None:
+    from rendering import freqDistChart, renderReport
+
+    rng = random.Random(charts)
+    report = [freqDistChart(f"grafico{i}", { f"palabra{j}": rng.randint(1, 100) for j in range(10) }, f"Gráfico {i}", "Palabras") for i in range(charts)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        times = []
+
+        for workers, folder in ((1, "secuencial"), (None, "paralelo"), (None, "paralelo")):
+            start = time.perf_counter()
+            renderReport(report, os.path.join(directory, folder), workers=workers)
+            times.append(time.perf_counter() - start)
+
+    print(f"{charts} gráficos (PNG y SVG), {os.cpu_count()} núcleos: un proceso {times[0]:.2f} s, en paralelo {times[1]:.2f} s, sin cambios {times[2]:.3f} s")
+
+"""
+Mide el tiempo de dibujar localmente una nube de palabras y el de obtenerla de la caché en memoria y en disco.
+
+Parámetros:
+words - Número de palabras distintas de la distribución de frecuencia.
+"""
+def benchmarkWordCloud(words: int = 1000) -> None:
+    from word_cloud import WordCloudCache, localWordCloud
+
+    rng = random.Random(words)
+    freqDist = { f"palabra{i}": rng.randint(1, 1000 // (i + 1) + 1) for i in range(words) }
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = WordCloudCache(directory)
+        times = []
+
+        # La primera vez se dibuja, la segunda se toma de la memoria y la tercera, con una caché nueva, del disco.
+        for current in (cache, cache, WordCloudCache(directory)):
+            start = time.perf_counter()
+            localWordCloud(freqDist, current)
+            times.append(time.perf_counter() - start)
+
+    print(f"Nube de {words} palabras: dibujada {times[0]:.2f} s, desde memoria {times[1] * 1000:.2f} ms, desde disco {times[2] * 1000:.2f} ms")
+
+"""
+Prueba de carga del servidor de generación con un modelo sintético: varios clientes concurrentes piden frases y se mide la latencia hasta la primera frase, la latencia total y el rendimiento. Antes se verifica que el servidor aplique las restricciones de longitud, palabras iniciales y originalidad, y que rechace los parámetros no válidos.
+
+Parámetros:
+size - Tamaño del corpus del modelo.
+concurrency - Números de clientes concurrentes a probar.
+requests - Solicitudes por cliente.
+n - Frases por solicitud.
+"""
+def benchmarkServer(size: int, concurrency: List[int], requests: int = 10, n: int = 200) -> None:
+    import asyncio
+    import json
+    from urllib.error import HTTPError
+    from urllib.request import urlopen
+    from generation_server import MAX_LENGTH, GenerationServer
+    from load_test import loadTest
+
+    graph = WordChainGraph(2)
+    graph.load(syntheticCorpus(size))
+    graph.compile()
+
+    async def run(path: str) -> None:
+        async with GenerationServer(path, port=0) as server:
+            url = f"http://{server.host}:{server.port}"
+
+            # Se calienta el pool para que el inicio de los procesos no cuente en la primera prueba.
+            await loadTest(url, 1, 1, n)
+
+            def fetch(query: str) -> Tuple[int, List[str]]:
+                try:
+                    with urlopen(f"{url}/generate?{query}") as response:
+                        return response.status, [json.loads(line)["sentence"] for line in response]
+                except HTTPError as error:
+                    return error.code, []
+
+            _, sentences = await asyncio.to_thread(fetch, f"n={n}&seed=1&minLength=4&maxLength=9&seedWords=w0&original=1")
+            lengths = [len(sentence.split(" ")) for sentence in sentences]
+            print(f"Restricciones: {len(sentences)} frases de {min(lengths)} a {max(lengths)} palabras, empiezan con w0: {all(sentence.startswith('w0 ') for sentence in sentences)}")
+
+            invalid = [f"maxLength={MAX_LENGTH + 1}", "minLength=5&maxLength=4", "seedWords=inexistente", "original=maybe", "minLength=x"]
+            statuses = [(await asyncio.to_thread(fetch, f"n=5&{query}"))[0] for query in invalid]
+            print(f"Parámetros no válidos rechazados con 400: {all(status == 400 for status in statuses)}")
+
+            print(f"{os.cpu_count()} núcleos, {n} frases por solicitud")
+            print(f"{'clientes':>9} {'solicitudes/s':>14} {'frases/s':>9} {'primera p50 (ms)':>17} {'primera p99 (ms)':>17} {'total p50 (ms)':>15} {'total p99 (ms)':>15}")
+
+            for clients in concurrency:
+                report = await loadTest(url, clients, requests, n)
+                print(f"{clients:>9} {report['requestsPerSecond']:>14.1f} {report['sentencesPerSecond']:>9.0f} {report['firstP50'] * 1000:>17.1f} {report['firstP99'] * 1000:>17.1f} {report['totalP50'] * 1000:>15.1f} {report['totalP99'] * 1000:>15.1f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.wcg")
+        graph.save(path)
+        asyncio.run(run(path))
+
+"""
+Mide el tiempo de importar cada módulo en un intérprete nuevo, y qué módulos pesados (NLTK, matplotlib, seaborn, pandas, PIL, bs4) quedan cargados después de importarlo.
+
+Parámetros:
+modules - Nombres de los módulos.
+repeat - Número de intérpretes por módulo, se reporta el menor tiempo.
+"""
+def benchmarkStartup(modules: List[str], repeat: int = 5) -> None:
+    import json
+    import subprocess
+
+    heavy = ("nltk", "matplotlib", "seaborn", "pandas", "PIL", "bs4")
+    directory = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'módulo':>18} {'importar (ms)':>14}  módulos pesados cargados")
+
+    for module in modules:
+        code = f"import json, sys, time\nstart = time.perf_counter()\nimport {module}\nprint(json.dumps([time.perf_counter() - start, [name for name in {heavy!r} if name in sys.modules]]))"
+        runs = [json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=directory).stdout) for _ in range(repeat)]
+
+        print(f"{module:>18} {min(run[0] for run in runs) * 1000:>14.1f}  {', '.join(runs[0][1]) or '-'}")
+
+"""
+Mide la lectura de un corpus desde archivos TSV, CSV y JSON Lines con las fuentes de sources, y compara la memoria reservada (tracemalloc) por el procesamiento y las columnas del corpus cargado en una lista (con ArticleColumns.fromArticles) contra los de la fuente leída como flujo en una sola pasada (como en main.py), verificando que el resultado sea el mismo.
+
+Parámetros:
+size - Número de artículos del corpus.
+shardSize - Número de artículos de cada parte del flujo.
+"""
+def benchmarkSources(size: int, shardSize: int = 10000) -> None:
+    import csv
+    import json
+    import tracemalloc
+    from analytics import tokenizeSentence
+    from columnar import ArticleColumns
+    from pipeline import runPipeline
+    from sources import openSource
+
+    news = harnessCorpus("synthetic", size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = { name: os.path.join(directory, name) for name in ("news.tsv", "news.csv", "news.jsonl") }
+
+        with open(paths["news.tsv"], "w", encoding="utf-8") as file:
+            file.writelines(f"{timestamp}\t{headline}\n" for timestamp, headline in news)
+
+        with open(paths["news.csv"], "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["fecha", "titular"])
+            writer.writerows(news)
+
+        with open(paths["news.jsonl"], "w", encoding="utf-8") as file:
+            file.writelines(json.dumps({ "timestamp": timestamp, "headline": headline }, ensure_ascii=False) + "\n" for timestamp, headline in news)
+
+        print(f"{size} artículos")
+        print(f"{'archivo':>11} {'MB':>6} {'artículos/s':>12} {'iguales':>8}")
+
+        for name, path in paths.items():
+            start = time.perf_counter()
+            read = list(openSource(path))
+            elapsed = time.perf_counter() - start
+            print(f"{name:>11} {os.path.getsize(path) / 2**20:>6.1f} {size / elapsed:>12.0f} {str(read == news):>8}")
+
+        # Se compara la memoria reservada por el procesamiento en un solo proceso, donde tracemalloc ve todas las reservas. Se descarta el corpus generado para que solo se cuente el que se lee del archivo.
+        del news, read
+        results = []
+        tracemalloc.start()
+
+        for corpus in ("lista", "flujo"):
+            # La caché del tokenizador tiene un tamaño fijo, se vacía para que ambas ejecuciones partan de cero.
+            tokenizeSentence.cache_clear()
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+
+            if corpus == "lista":
+                loaded = list(openSource(paths["news.tsv"]))
+                result = runPipeline(loaded, workers=1)
+                columns = ArticleColumns.fromArticles(loaded)
+                del loaded
+            else:
+                result = runPipeline(openSource(paths["news.tsv"]), workers=1, shardSize=shardSize, columns=True)
+                columns = result.columns.build()
+
+            elapsed = time.perf_counter() - start
+            results.append((result.graph.generateSentences(20, seed=1), result.stats.topWords(10), result.stats.topNgrams(3, 10), result.stats.articlesForDate(), columns.mostCommonWordPerPeriod("W"), columns.articlesPerPeriod("D")))
+            print(f"Procesamiento desde {corpus}: {elapsed:.2f} s, {tracemalloc.get_traced_memory()[1] / 2**20:.1f} MB reservados como máximo")
+            del result, columns
+
+        tracemalloc.stop()
+        print(f"Mismo resultado: {results[0] == results[1]}")
+
+# Tamaños de corpus del arnés de etapas.
+HARNESS_SIZES = [1000, 10000, 100000, 1000000]
+
+# Tamaño máximo del corpus de las etapas que serían demasiado lentas con el corpus completo: el rastreo descarga una página por cada 24 artículos.
+HARNESS_LIMITS = { "scrap": 10000 }
+
+# Número de frases que se generan en la etapa generate.
+HARNESS_SENTENCES = 10000
+
+"""
+Genera el corpus de un tamaño para el arnés de etapas, con fechas aleatorias en un semestre.
+
+Parámetros:
+kind - "synthetic" para titulares de syntheticHeadlines (con puntuación, números y comillas) o "fixture" para los artículos de la sección sintética del servidor de pruebas.
+size - Número de artículos.
+
+Retorna:
+Una lista de tuplas (fecha, titular).
+"""
+def harnessCorpus(kind: str, size: int) -> List[Tuple[str, str]]:
+    from fixture_server import SyntheticFeed
+
+    rng = random.Random(size)
+    months = ["enero", "febrero", "marzo", "abril", "mayo", "junio"]
+
+    if kind == "synthetic":
+        headlines = syntheticHeadlines(size, seed=size)
+    elif kind == "fixture":
+        feed = SyntheticFeed(total=size)
+        headlines = [feed.article(number)[1] for number in range(size)]
+    else:
+        raise ValueError(f"Corpus desconocido: {kind}")
+
+    return [(f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} {rng.randint(1, 28):02d} {rng.choice(months)} 2022", headline) for headline in headlines]
+
+"""
+Genera el html de una página de la sección que sirve un corpus en el servidor de pruebas, solo con la hora de cada artículo como en la primera página de BBC Mundo.
+
+Parámetros:
+news - Corpus.
+perPage - Número de artículos por página.
+page - Número de página, desde 1.
+"""
+def corpusPage(news: List[Tuple[str, str]], perPage: int, page: int) -> bytes:
+    from fixture_server import renderPage
+
+    first = (page - 1) * perPage
+    return renderPage([(timestamp[:5], headline) for timestamp, headline in news[first:first + perPage]], first)
+
+"""
+Se preparan los datos de una etapa del arnés. Cada función recibe el corpus, su tamaño y un ExitStack donde se registran los recursos que se liberan después de medir, y retorna la función que se mide. Lo que se carga una sola vez por proceso (las stop words, matplotlib) se carga antes, para medir solo el trabajo proporcional al corpus.
+"""
+def setupScrap(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from fixture_server import FixtureServer
+    from scrap_news import scrap
+
+    server = stack.enter_context(FixtureServer(partial(corpusPage, news, 24)))
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    return partial(scrap, size, server.url, 4, os.path.join(directory, "news.csv"))
+
+def setupTokenize(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import tokenize
+    warmUpTokenizer()
+    return partial(tokenize, [headline for _, headline in news])
+
+def setupTokenizeAndClean(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import tokenizeAndClean
+    warmUpTokenizer()
+    return partial(tokenizeAndClean, [headline for _, headline in news])
+
+"""
+Se cargan las stop words y las expresiones regulares del tokenizador sin dejar titulares del corpus en su caché.
+"""
+def warmUpTokenizer() -> None:
+    from analytics import tokenizeSentence
+
+    tokenizeSentence("Calentamiento del tokenizador")
+    tokenizeSentence.cache_clear()
+
+def setupLoad(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import tokenizeAll
+    return partial(WordChainGraph().load, tokenizeAll([headline for _, headline in news])[0])
+
+def setupGenerate(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import tokenizeAll
+
+    graph = WordChainGraph()
+    graph.load(tokenizeAll([headline for _, headline in news])[0])
+    graph.compile()
+    return partial(graph.generateSentences, HARNESS_SENTENCES, 1)
+
+def setupWordFrequency(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import tokenizeAll, wordFrequencyDistribution
+    return partial(wordFrequencyDistribution, [word for sentence in tokenizeAll([headline for _, headline in news])[1] for word in sentence])
+
+def setupNgramFrequency(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import ngramFrequencyDistribution, tokenizeAll
+    return partial(ngramFrequencyDistribution, tokenizeAll([headline for _, headline in news])[0], 3)
+
+def setupArticlesForDate(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import articlesForDate
+    return partial(articlesForDate, news)
+
+def setupMostCommonWord(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import mostCommonWordForDate, tokenizeAll
+
+    cleaned = tokenizeAll([headline for _, headline in news])[1]
+    return partial(mostCommonWordForDate, [(timestamp, words) for (timestamp, _), words in zip(news, cleaned)])
+
+def setupRender(news: List[Tuple[str, str]], size: int, stack: ExitStack) -> Callable[[], Any]:
+    from analytics import articlesForDate, getTopN, mostCommonWordForDate, ngramFrequencyDistribution, tokenizeAll, wordFrequencyDistribution
+    from rendering import Chart, freqDistChart, renderReport
+
+    # Los mismos gráficos que main.py, calculados con las funciones de analytics.
+    tokenized, cleaned = tokenizeAll([headline for _, headline in news])
+    charts = [
+        freqDistChart("palabras", getTopN(wordFrequencyDistribution([word for sentence in cleaned for word in sentence]), 10), "Distribución de frecuencia de palabras", "Palabras"),
+        freqDistChart("bigramas", getTopN(ngramFrequencyDistribution(tokenized, 2), 10), "Distribución de frecuencia de bigramas", "Bigramas"),
+        freqDistChart("trigramas", getTopN(ngramFrequencyDistribution(tokenized, 3), 10), "Distribución de frecuencia de trigramas", "Trigramas"),
+        Chart("palabra_por_fecha", "timeline", mostCommonWordForDate([(timestamp, words) for (timestamp, _), words in zip(news, cleaned)]), title="Palabra más frecuente por fecha"),
+        Chart("articulos_por_fecha", "bar", articlesForDate(news), title="Número de artículos por fecha", xLabel="Fecha", yLabel="Número de artículos")
+    ]
+
+    # Se dibuja un gráfico para cargar matplotlib y sus fuentes, y se usa una carpeta nueva para que ningún gráfico se tome de la caché.
+    renderReport(charts[:1], stack.enter_context(tempfile.TemporaryDirectory()), workers=1)
+    return partial(renderReport, charts, stack.enter_context(tempfile.TemporaryDirectory()), workers=1)
+
+# Etapas del arnés, en el orden en el que se ejecutan en main.py.
+HARNESS_STAGES = {
+    "scrap": setupScrap,
+    "tokenize": setupTokenize,
+    "tokenizeAndClean": setupTokenizeAndClean,
+    "load": setupLoad,
+    "generate": setupGenerate,
+    "wordFrequency": setupWordFrequency,
+    "ngramFrequency": setupNgramFrequency,
+    "articlesForDate": setupArticlesForDate,
+    "mostCommonWord": setupMostCommonWord,
+    "render": setupRender
+}
+
+"""
+Se mide una etapa en el proceso actual: se prepara el corpus y los datos de la etapa y se mide solo la etapa con un Profiler.
+
+Parámetros:
+name - Nombre de la etapa, ver HARNESS_STAGES.
+kind - Tipo de corpus, ver harnessCorpus.
+size - Número de artículos del corpus.
+trace - Si es verdadero también se mide la memoria reservada con tracemalloc.
+
+Retorna:
+Las estadísticas de la etapa, como las retorna StageStats.toDict.
+"""
+def measureStage(name: str, kind: str, size: int, trace: bool = False) -> Dict[str, Any]:
+    from profiling import Profiler
+
+    news = harnessCorpus(kind, size)
+
+    with ExitStack() as stack:
+        run = HARNESS_STAGES[name](news, size, stack)
+        profiler = Profiler(True, trace)
+
+        with profiler.stage(name):
+            run()
+
+    return profiler.report()[0]
+
+"""
+Arnés de etapas: mide cada etapa sobre corpus sintéticos y del servidor de pruebas de tamaño creciente y guarda los resultados en JSON para compararlos entre ejecuciones. Cada medición se hace en un proceso nuevo, para que el pico de memoria residente sea el de una sola etapa y ninguna caché (por ejemplo la del tokenizador) quede de una medición anterior. Con trace se repite cada medición en otro proceso con tracemalloc, de forma que su costo no afecte los tiempos.
+
+Parámetros:
+sizes - Números de artículos de los corpus.
+corpora - Tipos de corpus, ver harnessCorpus.
+stages - Nombres de las etapas, por defecto todas.
+trace - Si es verdadero también se mide la memoria reservada.
+output - Ruta del archivo JSON, None para no guardarlo.
+
+Retorna:
+Los resultados: un diccionario con la descripción del entorno ("meta") y la lista de mediciones ("results").
+"""
+def runHarness(sizes: List[int] = HARNESS_SIZES, corpora: Sequence[str] = ("synthetic", "fixture"), stages: Optional[Sequence[str]] = None, trace: bool = False, output: Optional[str] = "harness.json") -> Dict[str, Any]:
+    import json
+    import multiprocessing
+    import platform
+    import subprocess
+    from concurrent.futures import ProcessPoolExecutor
+    from profiling import formatMegabytes
+
+    # Se guarda la versión del código para saber qué se comparó.
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    report = { "meta": { "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(), "revision": revision, "time": time.strftime("%Y-%m-%dT%H:%M:%S") }, "results": [] }
+    context = multiprocessing.get_context("spawn")
+
+    print(f"{'etapa':>17} {'corpus':>10} {'artículos':>10} {'tiempo (s)':>11} {'pico RSS (MB)':>14} {'+RSS (MB)':>10} {'reservado (MB)':>15}")
+
+    for size in sizes:
+        for kind in corpora:
+            for name in stages or HARNESS_STAGES:
+                if size > HARNESS_LIMITS.get(name, size):
+                    continue
+
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(measureStage, name, kind, size).result()
+
+                if trace:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        result["allocatedPeak"] = executor.submit(measureStage, name, kind, size, True).result()["allocatedPeak"]
+
+                result.update(corpus=kind, size=size)
+                report["results"].append(result)
+                print(f"{name:>17} {kind:>10} {size:>10} {result['seconds']:>11.3f} {formatMegabytes(result['peakRss']):>14} {formatMegabytes(result['rssGrowth']):>10} {formatMegabytes(result['allocatedPeak']):>15}")
+
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    return report
+
+"""
+Se comparan los resultados de dos ejecuciones del arnés, medición por medición: la razón entre el valor actual y el anterior (menor a 1 es una mejora).
+
+Parámetros:
+previous - Resultados anteriores, como los retorna runHarness.
+current - Resultados actuales.
+"""
+def compareResults(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    before = { (result["name"], result["corpus"], result["size"]): result for result in previous["results"] }
+
+    print(f"Comparando con {previous['meta'].get('revision')} del {previous['meta']['time']}")
+    print(f"{'etapa':>17} {'corpus':>10} {'artículos':>10} {'tiempo':>8} {'pico RSS':>9} {'+RSS':>8} {'reservado':>10}")
+
+    for result in current["results"]:
+        old = before.get((result["name"], result["corpus"], result["size"]))
+
+        if old is None:
+            continue
+
+        ratios = [f"{result[key] / old[key]:.2f}x" if result[key] is not None and old[key] else "-" for key in ("seconds", "peakRss", "rssGrowth", "allocatedPeak")]
+        print(f"{result['name']:>17} {result['corpus']:>10} {result['size']:>10} {ratios[0]:>8} {ratios[1]:>9} {ratios[2]:>8} {ratios[3]:>10}")
+
+if __name__ == "__main__" and sys.argv[1:2] == ["harness"]:
+    # Uso: python benchmark.py harness [tamaños...] [--trace] [--output=harness.json] [--compare=anterior.json]
+    import json
+
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[2:] if arg.startswith("--"))
+    report = runHarness([int(arg) for arg in sys.argv[2:] if not arg.startswith("--")] or HARNESS_SIZES, trace="trace" in options, output=options.get("output") or "harness.json")
+
+    if options.get("compare"):
+        with open(options["compare"], encoding="utf-8") as file:
+            compareResults(json.load(file), report)
+elif __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    benchmarkStartup(["compiled_graph", "generation_server", "analytics", "pipeline", "scrap_news", "main"])
+    benchmarkGeneration(sizes)
+    benchmarkBatch(sizes)
+    benchmarkOrders(sizes[-1], [1, 2, 3, 4])
+    benchmarkPersistence(sizes[-1])
+    benchmarkConstrained(sizes[-1])
+    benchmarkScrap(2400, [1, 4, 16])
+    benchmarkIncremental()
+    benchmarkRedirects()
+    benchmarkTokenize([10000, 100000])
+    benchmarkAnalytics(sizes)
+    benchmarkSketch(sizes[-1], [0.001, 0.0001])
+    benchmarkPipeline(sizes[-1])
+    benchmarkColumnar(sizes[-1])
+    benchmarkRendering()
+    benchmarkWordCloud()
+    benchmarkServer(sizes[-1], [1, 8, 32])
+    benchmarkSources(sizes[-1])
+    benchmarkExtraction()
@@ -0,0 +1,318 @@
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from analytics import tokenizeSentence
+from dates import MONTHS
+
+# Periodos por los que se pueden agrupar los artículos: día, semana (de lunes a domingo) y mes.
+PERIODS = ("D", "W", "M")
+
+# Tipo de los límites de los rangos de fechas.
+DateLike = Union[str, np.datetime64]
+
+"""
+Se convierte la parte de la fecha (sin la hora) de una fecha de publicación a un número de día. Las fechas se repiten mucho, por lo que se guardan en caché.
+
+Parámetros:
+day - Fecha con formato "%d %B %Y", por ejemplo "03 mayo 2022".
+
+Retorna:
+La fecha como datetime64 con resolución de días.
+"""
+@lru_cache(maxsize=4096)
+def parseDay(day: str) -> np.datetime64:
+    number, month, year = day.split(" ")
+    return np.datetime64(f"{int(year):04d}-{MONTHS[month.lower()]:02d}-{int(number):02d}", "D")
+
+"""
+Se convierte una fecha de publicación con formato "%H:%M %d %B %Y" a datetime64 sin depender del locale.
+
+Parámetros:
+timestamp - Fecha de publicación, por ejemplo "14:30 03 mayo 2022".
+
+Retorna:
+La fecha como datetime64 con resolución de minutos.
+"""
+def parseTimestamp(timestamp: str) -> np.datetime64:
+    return np.datetime64(timestampMinutes(timestamp), "m")
+
+"""
+Igual que parseTimestamp, pero sin crear escalares de numpy.
+
+Retorna:
+La fecha en minutos desde 1970.
+"""
+def timestampMinutes(timestamp: str) -> int:
+    time, day = timestamp.split(" ", 1)
+    hours, minutes = time.split(":")
+
+    return dayMinutes(day) + int(hours) * 60 + int(minutes)
+
+@lru_cache(maxsize=4096)
+def dayMinutes(day: str) -> int:
+    return int(parseDay(day).astype(np.int64)) * 1440
+
+"""
+Se agrupan fechas por periodo.
+
+Parámetros:
+dates - Fechas como datetime64.
+period - "D" para días, "W" para semanas de lunes a domingo o "M" para meses.
+
+Retorna:
+Un arreglo con el primer día del periodo de cada fecha, como datetime64 con resolución de días.
+"""
+def periodStart(dates: np.ndarray, period: str) -> np.ndarray:
+    if period not in PERIODS:
+        raise ValueError(f"El periodo debe ser uno de {PERIODS}")
+
+    if period == "M":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+
+    days = dates.astype("datetime64[D]").astype(np.int64)
+
+    # El día 0 (1 de enero de 1970) fue jueves, se desplazan los días para que las semanas empiecen el lunes.
+    if period == "W":
+        days = (days + 3) // 7 * 7 - 3
+
+    return days.astype("datetime64[D]")
+
+"""
+Construye las columnas de los artículos a medida que se recorren, en arreglos compactos: la fecha de cada artículo en minutos, el número de palabras limpias de cada artículo y sus identificadores, sin guardar los titulares. Los constructores de partes contiguas de un corpus se pueden unir (por ejemplo desde los procesos de runPipeline) y el resultado es el mismo que el de recorrer el corpus completo.
+
+Parámetros:
+minutes - Fecha de cada artículo, en minutos desde 1970, en el orden en el que se añadieron.
+lengths - Número de palabras limpias de cada artículo.
+tokens - Identificadores de las palabras limpias de todos los artículos, uno tras otro.
+vocabulary - Palabras, en el orden en el que aparecieron por primera vez.
+"""
+class ColumnBuilder:
+    __minutes: array
+    __lengths: array
+    __tokens: array
+    __vocabulary: List[str]
+    __ids: Dict[str, int]
+
+    def __init__(self) -> None:
+        self.__minutes = array("q")
+        self.__lengths = array("i")
+        self.__tokens = array("i")
+        self.__vocabulary = []
+        self.__ids = dict()
+
+    def __len__(self) -> int:
+        return len(self.__minutes)
+
+    """
+    Se añade un artículo. Sus palabras limpias se toman de la caché del tokenizador si el titular ya se tokenizó.
+
+    Parámetros:
+    timestamp - Fecha de publicación, por ejemplo "14:30 03 mayo 2022".
+    headline - Titular.
+    """
+    def add(self, timestamp: str, headline: str) -> None:
+        _, cleaned = tokenizeSentence(headline)
+        self.__minutes.append(timestampMinutes(timestamp))
+        self.__lengths.append(len(cleaned))
+
+        # Se asigna un identificador a cada palabra nueva.
+        for word in cleaned:
+            if word not in self.__ids:
+                self.__ids[word] = len(self.__vocabulary)
+                self.__vocabulary.append(word)
+
+            self.__tokens.append(self.__ids[word])
+
+    """
+    Se añaden varios artículos.
+
+    Retorna:
+    El mismo constructor.
+    """
+    def addAll(self, news: Iterable[Tuple[str, str]]) -> "ColumnBuilder":
+        for timestamp, headline in news:
+            self.add(timestamp, headline)
+
+        return self
+
+    """
+    Se añaden los artículos de otro constructor después de los de este, traduciendo los identificadores de sus palabras al vocabulario de este. Las palabras nuevas se añaden en el orden en el que aparecen en el otro, por lo que el vocabulario es el mismo que si se hubieran añadido los artículos uno a uno.
+
+    Parámetros:
+    other - Constructor de la parte siguiente del corpus.
+    """
+    def merge(self, other: "ColumnBuilder") -> None:
+        mapping = np.empty(len(other.__vocabulary), dtype=np.int32)
+
+        for i, word in enumerate(other.__vocabulary):
+            if word not in self.__ids:
+                self.__ids[word] = len(self.__vocabulary)
+                self.__vocabulary.append(word)
+
+            mapping[i] = self.__ids[word]
+
+        self.__minutes.extend(other.__minutes)
+        self.__lengths.extend(other.__lengths)
+        self.__tokens.frombytes(mapping[np.frombuffer(other.__tokens, dtype=np.int32)].tobytes())
+
+    """
+    Se construyen las columnas ordenadas por fecha. Los artículos con la misma fecha conservan su orden relativo.
+
+    Parámetros:
+    headlines - Titular de cada artículo en el orden en el que se añadieron, o None para construir las columnas sin titulares.
+
+    Retorna:
+    Las columnas de los artículos.
+    """
+    def build(self, headlines: Optional[Sequence[str]] = None) -> "ArticleColumns":
+        dateArray = np.frombuffer(self.__minutes, dtype=np.int64).astype("datetime64[m]")
+        lengthArray = np.frombuffer(self.__lengths, dtype=np.int32).astype(np.int64)
+        tokenArray = np.frombuffer(self.__tokens, dtype=np.int32)
+        offsets = np.zeros(len(lengthArray) + 1, dtype=np.int64)
+        np.cumsum(lengthArray, out=offsets[1:])
+
+        # Se ordenan los artículos por fecha, reordenando también las palabras de cada uno.
+        order = np.argsort(dateArray, kind="stable")
+        sortedLengths = lengthArray[order]
+        sortedOffsets = np.zeros(len(lengthArray) + 1, dtype=np.int64)
+        np.cumsum(sortedLengths, out=sortedOffsets[1:])
+        positions = np.repeat(offsets[:-1][order] - sortedOffsets[:-1], sortedLengths) + np.arange(sortedOffsets[-1])
+
+        return ArticleColumns(dateArray[order], [headlines[i] for i in order] if headlines is not None else None, sortedOffsets, tokenArray[positions], list(self.__vocabulary))
+
+"""
+Artículos guardados por columnas y ordenados por fecha: las fechas como un arreglo datetime64, los titulares y las palabras limpias de cada titular como identificadores enteros en formato CSR (todas las palabras en un solo arreglo y la posición de inicio de cada artículo en otro).
+
+Como las fechas están ordenadas, el rango de artículos entre dos fechas se encuentra con una búsqueda binaria y las consultas por periodo se calculan con operaciones vectorizadas de numpy sobre ese rango, sin recorrer los artículos uno a uno.
+
+Parámetros:
+dates - Fecha de publicación de cada artículo, ordenadas.
+headlines - Titular de cada artículo, None si las columnas se construyeron sin titulares (ver ColumnBuilder).
+offsets - Posición de las palabras de cada artículo en tokens, tiene un elemento más que el número de artículos.
+tokens - Identificadores de las palabras limpias de todos los artículos.
+vocabulary - Palabras, cada una se identifica con su posición.
+"""
+class ArticleColumns:
+    dates: np.ndarray
+    headlines: Optional[List[str]]
+    offsets: np.ndarray
+    tokens: np.ndarray
+    vocabulary: List[str]
+
+    def __init__(self, dates: np.ndarray, headlines: Optional[List[str]], offsets: np.ndarray, tokens: np.ndarray, vocabulary: List[str]) -> None:
+        self.dates = dates
+        self.headlines = headlines
+        self.offsets = offsets
+        self.tokens = tokens
+        self.vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    """
+    Se construyen las columnas a partir de artículos en cualquier orden, por ejemplo las noticias de scrap o ArticleStore.articles(). Los artículos con la misma fecha conservan su orden relativo.
+
+    Parámetros:
+    news - Artículos, cada uno es una tupla donde el primer elemento es la fecha y el segundo el titular.
+    keepHeadlines - Si es falso no se guardan los titulares, solo las fechas y las palabras, por lo que la memoria no incluye las cadenas de los titulares.
+
+    Retorna:
+    Las columnas de los artículos.
+    """
+    @staticmethod
+    def fromArticles(news: Iterable[Tuple[str, str]], keepHeadlines: bool = True) -> "ArticleColumns":
+        builder = ColumnBuilder()
+        headlines: Optional[List[str]] = [] if keepHeadlines else None
+
+        for timestamp, headline in news:
+            builder.add(timestamp, headline)
+
+            if headlines is not None:
+                headlines.append(headline)
+
+        return builder.build(headlines)
+
+    """
+    Se encuentran los artículos publicados en un rango de fechas con dos búsquedas binarias.
+
+    Parámetros:
+    start - Fecha inicial incluida, None para empezar desde el primer artículo.
+    end - Fecha final excluida, None para terminar en el último artículo.
+
+    Retorna:
+    Una tupla (inicio, fin) con las posiciones de los artículos del rango.
+    """
+    def dateRange(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> Tuple[int, int]:
+        first = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, "m"), side="left"))
+        last = len(self) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, "m"), side="left"))
+
+        return first, max(first, last)
+
+    """
+    Se cuenta el número de artículos de cada periodo en un rango de fechas.
+
+    Parámetros:
+    period - "D" para días, "W" para semanas o "M" para meses.
+    start - Fecha inicial incluida.
+    end - Fecha final excluida.
+
+    Retorna:
+    Un diccionario donde las claves son los periodos (su primer día con formato ISO, por lo que se ordenan cronológicamente) y los valores son el número de artículos, en orden cronológico.
+    """
+    def articlesPerPeriod(self, period: str = "D", start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> Dict[str, int]:
+        first, last = self.dateRange(start, end)
+        periods, counts = np.unique(periodStart(self.dates[first:last], period), return_counts=True)
+
+        return { str(key): int(count) for key, count in zip(periods, counts) }
+
+    """
+    Se encuentran las n palabras más frecuentes de cada periodo en un rango de fechas. Se agrupan todas las palabras del rango por (periodo, palabra) con una sola llamada a numpy.unique y los grupos se ordenan por periodo y frecuencia; los empates se resuelven a favor de la palabra que apareció primero en el corpus.
+
+    Parámetros:
+    n - Número de palabras por periodo.
+    period - "D" para días, "W" para semanas o "M" para meses.
+    start - Fecha inicial incluida.
+    end - Fecha final excluida.
+
+    Retorna:
+    Un diccionario donde las claves son los periodos, en orden cronológico, y los valores son las n palabras más frecuentes del periodo con su frecuencia.
+    """
+    def topWordsPerPeriod(self, n: int, period: str = "D", start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> Dict[str, Dict[str, int]]:
+        first, last = self.dateRange(start, end)
+        starts = periodStart(self.dates[first:last], period)
+        periods, rowPeriod = np.unique(starts, return_inverse=True)
+
+        # Se asigna a cada palabra del rango el periodo de su artículo.
+        tokens = self.tokens[self.offsets[first]:self.offsets[last]].astype(np.int64)
+        tokenPeriod = np.repeat(rowPeriod.astype(np.int64), np.diff(self.offsets[first:last + 1]))
+
+        # Se cuenta cada par (periodo, palabra) codificado como un solo entero.
+        size = max(1, len(self.vocabulary))
+        keys, counts = np.unique(tokenPeriod * size + tokens, return_counts=True)
+        groups, words = keys // size, keys % size
+
+        # Se ordena por periodo, luego por frecuencia descendente y luego por identificador de la palabra, y se toman las n primeras de cada periodo.
+        order = np.lexsort((words, -counts, groups))
+        groups, words, counts = groups[order], words[order], counts[order]
+        groupStart = np.searchsorted(groups, np.arange(len(periods)), side="left")
+        rank = np.arange(len(groups)) - groupStart[groups]
+        keep = rank < n
+
+        top: Dict[str, Dict[str, int]] = { str(key): dict() for key in periods }
+        for group, word, count in zip(groups[keep], words[keep], counts[keep]):
+            top[str(periods[group])][self.vocabulary[word]] = int(count)
+
+        return top
+
+    """
+    Parámetros:
+    period - "D" para días, "W" para semanas o "M" para meses.
+    start - Fecha inicial incluida.
+    end - Fecha final excluida.
+
+    Retorna:
+    Un diccionario donde las claves son los periodos, en orden cronológico, y los valores son la palabra más frecuente de cada periodo. Los periodos sin palabras se omiten.
+    """
+    def mostCommonWordPerPeriod(self, period: str = "D", start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> Dict[str, str]:
+        return { key: next(iter(words)) for key, words in self.topWordsPerPeriod(1, period, start, end).items() if words }
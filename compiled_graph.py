@@ -0,0 +1,779 @@
+from array import array
+from bisect import bisect_left
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import mmap
+import random
+import struct
+import sys
+import numpy as np
+
+# Número de bits que ocupa cada identificador de palabra dentro de las claves empaquetadas de contextos.
+SHIFT = 32
+MASK = (1 << SHIFT) - 1
+
+# Encabezado del formato binario: firma, versión, marca de orden de bytes, orden de la cadena, tamaño del vocabulario y 4 bytes reservados para que el encabezado ocupe 32 bytes y los datos de todas las secciones queden alineados a 8 bytes.
+MAGIC = b"WCGRAPH\0"
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=8sIIIQ4x")
+
+# Tipo de cada arreglo de una TransitionTable, en el orden en el que se guardan.
+TABLE_ARRAYS = (("keys", "q"), ("offsets", "q"), ("targets", "i"), ("weights", "d"), ("prob", "d"), ("alias", "i"))
+
+# Base y módulo (2^63) del hash polinomial de secuencias de palabras. Los hashes caben en un entero con signo de 64 bits.
+HASH_BASE = 0x100000001B3
+HASH_MASK = (1 << 63) - 1
+
+# Número máximo de veces por frase que se vuelve a escoger una transición cuando se escoge la palabra de fin antes de la longitud mínima.
+MAX_REDRAWS = 10
+
+"""
+Escribe un arreglo en un archivo precedido por su número de bytes y rellenado hasta un múltiplo de 8 bytes, para que todos los arreglos queden alineados.
+
+Parámetros:
+file - Archivo binario.
+values - Arreglo a escribir (array, memoryview o bytes).
+"""
+def writeSection(file: BinaryIO, values) -> None:
+    data = memoryview(values).cast("B")
+    file.write(struct.pack("=Q", len(data)))
+    file.write(data)
+    file.write(b"\0" * (-len(data) % 8))
+
+"""
+Lee un arreglo escrito con writeSection sin copiarlo.
+
+Parámetros:
+buffer - Vista del archivo completo.
+position - Posición en la que inicia la sección.
+typecode - Tipo de los elementos del arreglo.
+
+Retorna:
+Una tupla con una vista tipada del arreglo y la posición en la que inicia la siguiente sección.
+
+Si los datos de la sección no inician en un múltiplo de 8 bytes se lanza ValueError.
+"""
+def readSection(buffer: memoryview, position: int, typecode: str) -> Tuple[memoryview, int]:
+    size = struct.unpack_from("=Q", buffer, position)[0]
+    position += 8
+
+    if position % 8 != 0:
+        raise ValueError(f"La sección en la posición {position} no está alineada a 8 bytes")
+
+    values = buffer[position:position + size].cast(typecode)
+
+    return values, position + size + (-size % 8)
+
+"""
+Vocabulario guardado como una tabla de cadenas: un único bloque de bytes UTF-8 y la posición en la que inicia cada palabra. Las palabras se decodifican solo cuando se accede a ellas.
+
+Parámetros:
+offsets - Posición en la que inicia cada palabra dentro del bloque, la palabra i ocupa [offsets[i], offsets[i + 1]).
+blob - Bloque de bytes con todas las palabras.
+"""
+class StringTable:
+    offsets: Sequence[int]
+    blob: memoryview
+
+    def __init__(self, offsets: Sequence[int], blob: memoryview) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+"""
+Construye una tabla alias (método de Vose) a partir de una lista de pesos, de esta manera se puede muestrear una transición en tiempo constante.
+
+Parámetros:
+weights - Pesos de cada transición.
+
+Retorna:
+Una tupla donde el primer elemento son las probabilidades de aceptación de cada columna y el segundo el índice alias de cada columna.
+"""
+def buildAliasTable(weights: List[float]) -> Tuple[List[float], List[int]]:
+    k = len(weights)
+    total = sum(weights)
+
+    # Se escalan los pesos para que su promedio sea 1.
+    scaled = [weight * k / total for weight in weights]
+    prob = [1.0] * k
+    alias = list(range(k))
+
+    # Se separan las columnas con menos y más probabilidad que el promedio.
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+    # Cada columna pequeña se completa con la probabilidad sobrante de una columna grande.
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+
+    # Las columnas restantes tienen probabilidad 1 salvo por errores de redondeo.
+    for i in large + small:
+        prob[i] = 1.0
+
+    return prob, alias
+
+"""
+Tabla de transiciones de un orden de la cadena de Markov en formato CSR, cada fila es un contexto y tiene su tabla alias.
+
+Para el orden 1 las filas son los identificadores de las palabras. Para órdenes mayores los contextos forman un trie de sufijos: el contexto (w[t - j], ..., w[t - 1]) es hijo del contexto (w[t - j + 1], ..., w[t - 1]) del orden anterior, y su clave es filaPadre * tamañoVocabulario + w[t - j]. Las claves están ordenadas, la fila de un contexto es su posición en las claves.
+
+Parámetros:
+keys - Claves ordenadas de los contextos, vacío para el orden 1.
+offsets - Posición en la que inician las transiciones de cada fila, la fila i tiene las transiciones [offsets[i], offsets[i + 1]).
+targets - Palabra destino de cada transición.
+weights - Peso de cada transición.
+prob - Probabilidad de aceptación de cada columna de la tabla alias.
+alias - Transición alternativa (índice absoluto) de cada columna de la tabla alias.
+"""
+class TransitionTable:
+    keys: Sequence[int]
+    offsets: Sequence[int]
+    targets: Sequence[int]
+    weights: Sequence[float]
+    prob: Sequence[float]
+    alias: Sequence[int]
+
+    def __init__(self, keys: Sequence[int], offsets: Sequence[int], targets: Sequence[int], weights: Sequence[float], prob: Sequence[float], alias: Sequence[int]) -> None:
+        self.keys = keys
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.prob = prob
+        self.alias = alias
+
+    """
+    Construye una tabla a partir de las transiciones de cada fila.
+
+    Parámetros:
+    rows - Transiciones de cada fila, de la forma [(palabra destino, peso)].
+    keys - Claves de los contextos de cada fila, ya ordenadas.
+
+    Retorna:
+    La tabla de transiciones.
+    """
+    @staticmethod
+    def fromRows(rows: List[List[Tuple[int, float]]], keys: Optional[array] = None) -> "TransitionTable":
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("d")
+        prob = array("d")
+        alias = array("i")
+
+        # Por cada fila se añaden sus transiciones y su tabla alias a los arreglos planos.
+        for chains in rows:
+            startOffset = len(targets)
+
+            if chains:
+                p, a = buildAliasTable([chain[1] for chain in chains])
+                targets.extend(chain[0] for chain in chains)
+                weights.extend(chain[1] for chain in chains)
+                prob.extend(p)
+                alias.extend(startOffset + i for i in a)
+
+            offsets.append(len(targets))
+
+        return TransitionTable(keys if keys is not None else array("q"), offsets, targets, weights, prob, alias)
+
+    """
+    Busca la fila de un contexto mediante búsqueda binaria sobre las claves.
+
+    Parámetros:
+    key - Clave del contexto.
+
+    Retorna:
+    La fila del contexto, o -1 si el contexto no existe.
+    """
+    def find(self, key: int) -> int:
+        row = bisect_left(self.keys, key)
+        return row if row < len(self.keys) and self.keys[row] == key else -1
+
+    """
+    Retorna:
+    El número de bytes que ocupan los arreglos de la tabla.
+    """
+    def nbytes(self) -> int:
+        return sum(len(values) * values.itemsize for values in (self.keys, self.offsets, self.targets, self.weights, self.prob, self.alias))
+
+"""
+Se calcula el hash de una palabra. A diferencia de hash, no depende de la semilla aleatoria del proceso, por lo que el mismo corpus produce siempre el mismo modelo guardado.
+
+Parámetros:
+word - Palabra.
+
+Retorna:
+Un entero de 63 bits.
+"""
+def wordHash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little") & HASH_MASK
+
+"""
+Se calculan los hashes polinomiales de una frase: el de cada n-grama (con un hash rodante, en O(1) por palabra) y el de la frase completa.
+
+Parámetros:
+hashes - Hash de cada palabra de la frase.
+n - Tamaño de los n-gramas.
+
+Retorna:
+Una tupla donde el primer elemento son los hashes de los n-gramas y el segundo el hash de la frase.
+"""
+def sentenceHashes(hashes: Sequence[int], n: int) -> Tuple[List[int], int]:
+    power = pow(HASH_BASE, n, HASH_MASK + 1)
+    ngrams: List[int] = []
+    window = total = 0
+
+    for i, value in enumerate(hashes):
+        window = (window * HASH_BASE + value) & HASH_MASK
+        total = (total * HASH_BASE + value) & HASH_MASK
+
+        # Se quita del hash la palabra que sale de la ventana.
+        if i >= n:
+            window = (window - hashes[i - n] * power) & HASH_MASK
+
+        if i >= n - 1:
+            ngrams.append(window)
+
+    return ngrams, total
+
+"""
+Índice de originalidad de un grafo: los hashes ordenados de todos los n-gramas y de todas las frases de entrenamiento. Al generar con original=True, una frase candidata se descarta en cuanto sus últimas n palabras forman un n-grama de alguna frase de entrenamiento (es decir, copia más de n - 1 palabras seguidas de un titular), sin terminar de construirla, y al llegar a la palabra de fin se descarta si es idéntica a una frase de entrenamiento.
+
+Una colisión de hashes solo puede descartar una frase original, nunca aceptar una copia. Como la mayoría de las ventanas de una frase candidata no son n-gramas de entrenamiento, antes de la búsqueda binaria se consulta un mapa de bits indexado por los bits bajos del hash (un bit por cada posible valor), que descarta casi todas las ventanas sin buscar en el arreglo.
+
+Parámetros:
+n - Tamaño de los n-gramas indexados.
+wordHashes - Hash de cada palabra del vocabulario, según su identificador.
+ngrams - Hashes ordenados de los n-gramas de las frases de entrenamiento.
+sentences - Hashes ordenados de las frases de entrenamiento.
+"""
+class OriginalityIndex:
+    n: int
+    wordHashes: Sequence[int]
+    ngrams: Sequence[int]
+    sentences: Sequence[int]
+    __bitmap: Optional[Tuple[bytes, int]]
+
+    def __init__(self, n: int, wordHashes: Sequence[int], ngrams: Sequence[int], sentences: Sequence[int]) -> None:
+        self.n = n
+        self.wordHashes = wordHashes
+        self.ngrams = ngrams
+        self.sentences = sentences
+        self.__bitmap = None
+
+    """
+    Construye el índice a partir de las frases de entrenamiento. Los hashes de todos los n-gramas y de todas las frases se calculan con operaciones vectorizadas de NumPy sobre los identificadores de las palabras; la aritmética de 64 bits sin signo desborda módulo 2^64, que es compatible con el módulo 2^63 de los hashes.
+
+    Parámetros:
+    n - Tamaño de los n-gramas.
+    words - Vocabulario.
+    tokens - Identificadores de las palabras de todas las frases, una frase tras otra.
+    lengths - Número de palabras de cada frase, sin frases vacías.
+
+    Retorna:
+    El índice.
+    """
+    @staticmethod
+    def fromSentences(n: int, words: Sequence[str], tokens: Sequence[int], lengths: Sequence[int]) -> "OriginalityIndex":
+        wordHashes = np.array([wordHash(word) for word in words], dtype=np.uint64)
+        hashes = wordHashes[np.asarray(tokens, dtype=np.int64)]
+        lengthArray = np.asarray(lengths, dtype=np.int64)
+        ends = np.cumsum(lengthArray)
+        positions = np.arange(len(hashes))
+        sentence = np.repeat(np.arange(len(lengthArray)), lengthArray)
+
+        # Hash de cada n-grama que no cruza el final de su frase, con el mismo polinomio que el hash rodante.
+        first = np.flatnonzero(positions + n <= ends[sentence])
+        ngrams = np.zeros(len(first), dtype=np.uint64)
+
+        for k in range(n):
+            ngrams = ngrams * np.uint64(HASH_BASE) + hashes[first + k]
+
+        # Hash de cada frase: cada palabra se multiplica por la potencia de la base según su distancia al final de la frase.
+        powers = np.ones(int(lengthArray.max(initial=0)) + 1, dtype=np.uint64)
+        np.cumprod(np.full(len(powers) - 1, HASH_BASE, dtype=np.uint64), out=powers[1:])
+        terms = hashes * powers[ends[sentence] - 1 - positions]
+        sentences = np.add.reduceat(terms, ends - lengthArray) if len(terms) else np.zeros(0, dtype=np.uint64)
+
+        # Se eliminan las repeticiones y se ordenan los hashes para buscarlos con búsqueda binaria.
+        mask = np.uint64(HASH_MASK)
+        return OriginalityIndex(n, array("q", (wordHashes & mask).tobytes()), array("q", np.unique(ngrams & mask).tobytes()), array("q", np.unique(sentences & mask).tobytes()))
+
+    """
+    Mapa de bits de los n-gramas, con al menos 8 bits por n-grama para que la mayoría de los hashes que no están en el índice caigan en un bit apagado. Se construye la primera vez que se usa, no se guarda en el archivo del modelo.
+
+    Retorna:
+    Una tupla donde el primer elemento son los bytes del mapa y el segundo la máscara de los bits bajos del hash que lo indexan. Un hash puede estar en el índice solo si su bit está encendido.
+    """
+    def ngramBitmap(self) -> Tuple[bytes, int]:
+        if self.__bitmap is None:
+            size = 1 << max(3, (8 * len(self.ngrams)).bit_length())
+            values = np.frombuffer(self.ngrams, dtype=np.int64) & (size - 1)
+            bits = np.zeros(size // 8, dtype=np.uint8)
+            np.bitwise_or.at(bits, values >> 3, (1 << (values & 7)).astype(np.uint8))
+            self.__bitmap = (bits.tobytes(), size - 1)
+
+        return self.__bitmap
+
+    """
+    Retorna:
+    Verdadero si el hash es de un n-grama de las frases de entrenamiento.
+    """
+    def hasNgram(self, value: int) -> bool:
+        i = bisect_left(self.ngrams, value)
+        return i < len(self.ngrams) and self.ngrams[i] == value
+
+    """
+    Retorna:
+    Verdadero si el hash es de una frase de entrenamiento.
+    """
+    def hasSentence(self, value: int) -> bool:
+        i = bisect_left(self.sentences, value)
+        return i < len(self.sentences) and self.sentences[i] == value
+
+    """
+    Retorna:
+    El número de bytes que ocupan los arreglos del índice.
+    """
+    def nbytes(self) -> int:
+        return sum(len(values) * values.itemsize for values in (self.wordHashes, self.ngrams, self.sentences))
+
+"""
+Lote de frases generadas en paralelo. Las frases se guardan como identificadores de palabras y solo se convierten a texto cuando se solicitan.
+
+Parámetros:
+words - Vocabulario del grafo que generó el lote.
+ids - Matriz de tamaño (n, maxLength) con los identificadores de las palabras de cada frase, las posiciones sin palabra tienen -1.
+lengths - Número de palabras de cada frase.
+finished - Indica si cada frase llegó a la palabra de fin, las frases que no lo hicieron fueron truncadas en maxLength palabras.
+"""
+class SentenceBatch:
+    words: Sequence[str]
+    ids: np.ndarray
+    lengths: np.ndarray
+    finished: np.ndarray
+
+    def __init__(self, words: Sequence[str], ids: np.ndarray, lengths: np.ndarray, finished: np.ndarray) -> None:
+        self.words = words
+        self.ids = ids
+        self.lengths = lengths
+        self.finished = finished
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    """
+    Convierte la frase i a texto, con el mismo formato que generateSentences.
+    """
+    def __getitem__(self, i: int) -> str:
+        return " ".join([self.words[word] for word in self.ids[i, :self.lengths[i]].tolist()]) + "."
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    """
+    Convierte el lote a texto.
+
+    Parámetros:
+    onlyFinished - Si es verdadero se omiten las frases truncadas.
+
+    Retorna:
+    Una lista con las frases del lote.
+    """
+    def toStrings(self, onlyFinished: bool = False) -> List[str]:
+        return [self[i] for i in range(len(self)) if not onlyFinished or self.finished[i]]
+
+"""
+Versión compilada e inmutable de un WordChainGraph. Las palabras se reemplazan por identificadores enteros y las transiciones de cada orden se guardan en una TransitionTable, cada contexto tiene su tabla alias para muestrear en O(1) sin crear listas en cada paso.
+
+Al generar se usa el contexto más largo que se haya visto durante el entrenamiento, retrocediendo a órdenes menores cuando un contexto no existe.
+
+Parámetros:
+words - Vocabulario, la posición de cada palabra es su identificador. Las posiciones 0 y 1 son las palabras de inicio y fin.
+levels - Tablas de transiciones, la posición j contiene las transiciones del orden j + 1.
+originality - Índice de las frases de entrenamiento para generar frases originales, None si el grafo no lo tiene.
+"""
+class CompiledWordChainGraph:
+    # Identificadores de las palabras de inicio y fin.
+    START_ID = 0
+    END_ID = 1
+
+    words: Sequence[str]
+    levels: List[TransitionTable]
+    originality: Optional[OriginalityIndex]
+    __ids: Optional[Dict[str, int]]
+    __buffer: Optional[mmap.mmap]
+
+    def __init__(self, words: Sequence[str], levels: List[TransitionTable], originality: Optional[OriginalityIndex] = None) -> None:
+        self.words = words
+        self.levels = levels
+        self.originality = originality
+        self.__ids = None
+        self.__buffer = None
+
+    """
+    Diccionario de la forma [palabra -> identificador]. Se construye la primera vez que se usa, para que abrir un modelo no requiera decodificar todo el vocabulario.
+    """
+    @property
+    def ids(self) -> Dict[str, int]:
+        if self.__ids is None:
+            self.__ids = { word: i for i, word in enumerate(self.words) }
+
+        return self.__ids
+
+    """
+    Guarda el grafo en un archivo binario plano: encabezado, tabla de cadenas del vocabulario, los arreglos de la tabla de transiciones de cada orden, incluyendo las tablas alias, y el índice de originalidad (su tamaño de n-gramas, 0 si no hay índice, seguido de sus arreglos).
+
+    Parámetros:
+    path - Ruta del archivo.
+    """
+    def save(self, path: str) -> None:
+        # Se codifica el vocabulario como un único bloque de bytes.
+        encoded = [word.encode("utf-8") for word in self.words]
+        offsets = array("q", [0])
+
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(self.levels), len(self.words)))
+            writeSection(file, offsets)
+            writeSection(file, b"".join(encoded))
+
+            for table in self.levels:
+                for name, _ in TABLE_ARRAYS:
+                    writeSection(file, getattr(table, name))
+
+            writeSection(file, array("q", [self.originality.n if self.originality is not None else 0]))
+
+            if self.originality is not None:
+                for values in (self.originality.wordHashes, self.originality.ngrams, self.originality.sentences):
+                    writeSection(file, values)
+
+    """
+    Abre un grafo guardado con save mapeando el archivo en memoria. Los arreglos no se copian, por lo que abrir el modelo es casi instantáneo y varios procesos que abran el mismo archivo comparten sus páginas.
+
+    Parámetros:
+    path - Ruta del archivo.
+
+    Retorna:
+    El grafo compilado.
+    """
+    @staticmethod
+    def open(path: str) -> "CompiledWordChainGraph":
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(buffer)
+        magic, version, byteOrderMark, order, _ = HEADER.unpack_from(view, 0)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} no es un modelo de WordChainGraph compatible")
+
+        if byteOrderMark != BYTE_ORDER_MARK:
+            raise ValueError(f"{path} fue guardado en una arquitectura con un orden de bytes distinto")
+
+        # Se leen las secciones en el mismo orden en el que se escribieron, todas alineadas porque el mapa inicia en el límite de una página.
+        position = HEADER.size
+        offsets, position = readSection(view, position, "q")
+        blob, position = readSection(view, position, "B")
+        levels: List[TransitionTable] = []
+
+        for _ in range(order):
+            arrays = []
+
+            for _, typecode in TABLE_ARRAYS:
+                values, position = readSection(view, position, typecode)
+                arrays.append(values)
+
+            levels.append(TransitionTable(*arrays))
+
+        originality: Optional[OriginalityIndex] = None
+
+        n, position = readSection(view, position, "q")
+
+        if n[0] > 0:
+            wordHashes, position = readSection(view, position, "q")
+            ngrams, position = readSection(view, position, "q")
+            sentences, position = readSection(view, position, "q")
+            originality = OriginalityIndex(n[0], wordHashes, ngrams, sentences)
+
+        graph = CompiledWordChainGraph(StringTable(offsets, blob), levels, originality)
+        graph.__buffer = buffer
+
+        return graph
+
+    """
+    Compila un grafo representado como diccionario anidado y, opcionalmente, sus contextos de órdenes mayores.
+
+    Parámetros:
+    words - Vocabulario, las palabras de inicio y fin deben estar en las posiciones 0 y 1.
+    graph - Diccionario de la forma [palabra -> [palabra -> peso]] con las transiciones de orden 1.
+    contexts - Transiciones de los órdenes 2 en adelante, None si el grafo es de orden 1. Cada una es un diccionario cuya clave empaqueta el contexto y la palabra destino como (contexto << SHIFT) | destino, donde el contexto tiene la palabra más reciente en los bits menos significativos.
+    originality - Índice de originalidad de las frases de entrenamiento.
+
+    Retorna:
+    El grafo compilado.
+    """
+    @staticmethod
+    def fromGraph(words: List[str], graph: Dict[str, Dict[str, float]], contexts: Optional[List[Dict[int, float]]] = None, originality: Optional[OriginalityIndex] = None) -> "CompiledWordChainGraph":
+        contexts = contexts if contexts is not None else []
+        ids = { word: i for i, word in enumerate(words) }
+
+        # Orden 1: cada palabra es una fila.
+        levels = [TransitionTable.fromRows([[(ids[chain], weight) for chain, weight in graph.get(word, {}).items()] for word in words])]
+        previous: Optional[Dict[int, int]] = None
+
+        for order, edges in enumerate(contexts, start=2):
+            # Se agrupan las transiciones por contexto.
+            groups: Dict[int, List[Tuple[int, float]]] = dict()
+
+            for key, weight in edges.items():
+                groups.setdefault(key >> SHIFT, []).append((key & MASK, weight))
+
+            # Se calcula la clave de cada contexto en el trie de sufijos a partir de la fila de su contexto padre.
+            nodes: List[Tuple[int, int, List[Tuple[int, float]]]] = []
+            parentBits = SHIFT * (order - 1)
+
+            for context, chains in groups.items():
+                parent = context & ((1 << parentBits) - 1)
+                parentRow = parent if previous is None else previous.get(parent)
+
+                if parentRow is not None:
+                    nodes.append((parentRow * len(words) + (context >> parentBits), context, chains))
+
+            nodes.sort(key=lambda node: node[0])
+            previous = { node[1]: row for row, node in enumerate(nodes) }
+            levels.append(TransitionTable.fromRows([node[2] for node in nodes], array("q", [node[0] for node in nodes])))
+
+        return CompiledWordChainGraph(words, levels, originality)
+
+    """
+    Retorna:
+    Un diccionario con el número de bytes que ocupa la tabla de cada orden.
+    """
+    def memoryUsage(self) -> Dict[int, int]:
+        return { order: table.nbytes() for order, table in enumerate(self.levels, start=1) }
+
+    """
+    Se generan n frases aleatorias recorriendo el grafo compilado. Las restricciones se comprueban durante el recorrido: una frase candidata se descarta en cuanto supera maxLength palabras o, con original=True, en cuanto copia un n-grama de una frase de entrenamiento, sin terminar de construirla. Si se escoge la palabra de fin antes de minLength palabras se vuelve a escoger otra transición del mismo contexto.
+
+    Parámetros:
+    n - Número de frases a generar.
+    seed - Semilla del generador aleatorio, si no se especifica se usa el generador global del módulo random.
+    minLength - Número mínimo de palabras por frase.
+    maxLength - Número máximo de palabras por frase, None para no limitar. Evita frases infinitas cuando el grafo tiene ciclos.
+    seedWords - Palabras con las que empiezan todas las frases, la generación continúa a partir de ellas.
+    original - Si es verdadero se descartan las frases que copian un titular de entrenamiento, requiere el índice de originalidad.
+    maxAttempts - Número máximo de frases candidatas por cada frase pedida. Si las restricciones son difíciles de cumplir se pueden obtener menos de n frases.
+
+    Retorna:
+    Una lista de frases generadas de manera aleatoria.
+    """
+    def generateSentences(self, n: int = 10, seed: Optional[int] = None, minLength: int = 0, maxLength: Optional[int] = None, seedWords: Sequence[str] = (), original: bool = False, maxAttempts: int = 100) -> List[str]:
+        # Se copian los atributos a variables locales para evitar búsquedas de atributos en cada transición.
+        draw = (random if seed is None else random.Random(seed)).random
+        words, levels = self.words, self.levels
+        arrays = [(table.offsets, table.targets, table.prob, table.alias) for table in levels]
+        vocabularySize = len(words)
+        start, end = CompiledWordChainGraph.START_ID, CompiledWordChainGraph.END_ID
+        limit = maxLength if maxLength is not None else sys.maxsize
+        index = self.originality if original else None
+        sentences: List[str] = []
+
+        if original and index is None:
+            raise ValueError("El grafo no tiene índice de originalidad")
+
+        # Se traducen las palabras iniciales a identificadores.
+        try:
+            prefix = [self.ids[word] for word in seedWords]
+        except KeyError as error:
+            raise ValueError(f"La palabra {error.args[0]!r} no está en el vocabulario") from None
+
+        # Se calculan una sola vez los hashes de las palabras iniciales, si ya copian un n-grama ninguna frase puede ser original.
+        if index is not None:
+            hashes, size = index.wordHashes, index.n
+            bitmap, bitmapMask = index.ngramBitmap()
+            power = pow(HASH_BASE, size, HASH_MASK + 1)
+            prefixNgrams, prefixTotal = sentenceHashes([hashes[i] for i in prefix], size)
+
+            if any(index.hasNgram(value) for value in prefixNgrams):
+                return sentences
+
+        attempts = n * maxAttempts
+
+        while len(sentences) < n and attempts > 0:
+            attempts -= 1
+            ids = list(prefix)
+            current = ids[-1] if ids else start
+            valid = True
+            redraws = 0
+
+            if index is not None:
+                window, total = (prefixNgrams[-1] if prefixNgrams else prefixTotal), prefixTotal
+
+            while valid:
+                # Se busca el contexto más largo conocido, empezando por la palabra actual y añadiendo palabras anteriores.
+                level, row = 0, current
+
+                for j in range(1, len(levels)):
+                    position = len(ids) - 1 - j
+                    found = levels[j].find(row * vocabularySize + (ids[position] if position >= 0 else start))
+
+                    if found < 0:
+                        break
+
+                    level, row = j, found
+
+                # Se escoge una columna de la tabla alias y se decide entre la transición de la columna o su alias.
+                offsets, targets, prob, alias = arrays[level]
+                first = offsets[row]
+                u = draw() * (offsets[row + 1] - first)
+                column = int(u)
+                edge = first + column
+
+                if u - column >= prob[edge]:
+                    edge = alias[edge]
+
+                current = targets[edge]
+
+                if current == end:
+                    # Si la frase aún es muy corta para terminar se vuelve a escoger una transición desde el mismo contexto.
+                    if len(ids) < minLength and redraws < MAX_REDRAWS:
+                        redraws += 1
+                        current = ids[-1] if ids else start
+                        continue
+
+                    # Al terminar se descartan las frases muy cortas y las idénticas a una frase de entrenamiento.
+                    valid = len(ids) >= minLength and (index is None or not index.hasSentence(total))
+                    break
+
+                # Las frases que superan la longitud máxima se descartan sin terminarlas.
+                if len(ids) >= limit:
+                    valid = False
+                    break
+
+                ids.append(current)
+
+                # Se actualizan los hashes rodantes y se descarta la frase en cuanto sus últimas palabras copian un n-grama de entrenamiento.
+                if index is not None:
+                    value = hashes[current]
+                    window = (window * HASH_BASE + value) & HASH_MASK
+                    total = (total * HASH_BASE + value) & HASH_MASK
+
+                    if len(ids) > size:
+                        window = (window - hashes[ids[-1 - size]] * power) & HASH_MASK
+
+                    if len(ids) >= size:
+                        bit = window & bitmapMask
+                        valid = not (bitmap[bit >> 3] >> (bit & 7) & 1 and index.hasNgram(window))
+
+            # Las palabras solo se convierten a texto una vez se termina la frase.
+            if valid:
+                sentences.append(" ".join([words[i] for i in ids]) + ".")
+
+        return sentences
+
+    """
+    Se generan n frases en paralelo. Todas las cadenas avanzan al mismo tiempo usando operaciones vectorizadas de NumPy sobre los arreglos CSR, y cada cadena se retira cuando llega a la palabra de fin.
+
+    Parámetros:
+    n - Número de frases a generar.
+    maxLength - Número máximo de palabras por frase, las frases más largas se truncan.
+    seed - Semilla del generador aleatorio.
+
+    Retorna:
+    Un lote con los identificadores de las palabras de cada frase.
+    """
+    def generateBatch(self, n: int, maxLength: int = 30, seed: Optional[int] = None) -> SentenceBatch:
+        rng = np.random.default_rng(seed)
+        vocabularySize = len(self.words)
+
+        # Se crean vistas de NumPy sobre los arreglos planos, sin copiarlos.
+        tables = [(
+            np.frombuffer(table.keys, dtype=np.int64),
+            np.frombuffer(table.offsets, dtype=np.int64),
+            np.frombuffer(table.targets, dtype=np.int32),
+            np.frombuffer(table.prob, dtype=np.float64),
+            np.frombuffer(table.alias, dtype=np.int32)
+        ) for table in self.levels]
+
+        ids = np.full((n, maxLength), -1, dtype=np.int32)
+        finished = np.zeros(n, dtype=bool)
+
+        # Cadenas que aún no han llegado a la palabra de fin y la palabra actual de cada una.
+        active = np.arange(n)
+        current = np.full(n, CompiledWordChainGraph.START_ID, dtype=np.int64)
+
+        for step in range(maxLength + 1):
+            # Se busca el contexto más largo conocido de cada cadena mediante búsqueda binaria en las claves de cada orden.
+            level = np.zeros(len(active), dtype=np.int64)
+            row = current.copy()
+            matched = np.ones(len(active), dtype=bool)
+
+            for j in range(1, len(tables)):
+                keys = tables[j][0]
+
+                if len(keys) == 0:
+                    break
+
+                older = ids[active, step - 1 - j] if step - 1 - j >= 0 else CompiledWordChainGraph.START_ID
+                key = row * vocabularySize + older
+                found = np.minimum(np.searchsorted(keys, key), len(keys) - 1)
+                matched &= keys[found] == key
+                row = np.where(matched, found, row)
+                level[matched] = j
+
+            # Se realiza una transición con la tabla alias del contexto de cada cadena activa.
+            current = np.empty(len(active), dtype=np.int64)
+
+            for j, (_, offsets, targets, prob, alias) in enumerate(tables):
+                chains = np.flatnonzero(level == j)
+
+                if len(chains) == 0:
+                    continue
+
+                first = offsets[row[chains]]
+                u = rng.random(len(chains)) * (offsets[row[chains] + 1] - first)
+                column = u.astype(np.int64)
+                edge = first + column
+                useAlias = u - column >= prob[edge]
+                edge[useAlias] = alias[edge[useAlias]]
+                current[chains] = targets[edge]
+
+            # Las cadenas que llegaron a la palabra de fin se retiran.
+            ended = current == CompiledWordChainGraph.END_ID
+            finished[active[ended]] = True
+
+            if step == maxLength:
+                break
+
+            active = active[~ended]
+            current = current[~ended]
+
+            if len(active) == 0:
+                break
+
+            ids[active, step] = current
+
+        lengths = (ids >= 0).sum(axis=1, dtype=np.int32)
+
+        return SentenceBatch(self.words, ids, lengths, finished)
@@ -0,0 +1,38 @@
+from datetime import date
+
+# Nombre de cada mes según su número, como aparecen en las fechas de BBC Mundo. La posición 0 no se usa.
+MONTH_NAMES = ["", "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+# Número de cada mes según su nombre, también se acepta la variante "setiembre".
+MONTHS = { **{ name: number for number, name in enumerate(MONTH_NAMES) if name }, "setiembre": 9 }
+
+"""
+Se convierte una fecha con formato "%d %B %Y" y el nombre del mes en español a date sin depender del locale.
+
+Parámetros:
+day - Fecha, por ejemplo "3 mayo 2022".
+
+Retorna:
+La fecha.
+
+Si la fecha no tiene ese formato o el mes no se reconoce se lanza ValueError.
+"""
+def parseDate(day: str) -> date:
+    number, month, year = day.split(" ")
+
+    if month.lower() not in MONTHS:
+        raise ValueError(f"No se reconoce el mes de la fecha {day!r}")
+
+    return date(int(year), MONTHS[month.lower()], int(number))
+
+"""
+Se escribe una fecha con formato "%d %B %Y" y el nombre del mes en español sin depender del locale.
+
+Parámetros:
+day - Fecha.
+
+Retorna:
+La fecha, por ejemplo "03 mayo 2022".
+"""
+def formatDate(day: date) -> str:
+    return f"{day.day:02d} {MONTH_NAMES[day.month]} {day.year}"
@@ -0,0 +1,181 @@
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+import re
+
+# Clase de los elementos que contienen la fecha de publicación y prefijo del id de los titulares.
+TIMESTAMP_CLASS = "qa-post-auto-meta"
+HEADLINE_ID = re.compile("title_")
+
+# Etiquetas que agrupan la fecha y el titular de un mismo artículo.
+CONTAINER_TAGS = ("li", "article")
+
+# Etiquetas que no tienen etiqueta de cierre.
+VOID_TAGS = { "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr" }
+
+# Tipo de las funciones que extraen los artículos de una página.
+Extractor = Callable[[bytes], List[Tuple[str, str]]]
+
+"""
+Empareja las fechas con los titulares. Cada titular se empareja con la fecha del mismo artículo (el mismo elemento li o article), así un artículo sin fecha no desalinea al resto. Los elementos que no están dentro de un artículo se emparejan en orden.
+
+Parámetros:
+found - Lista de tuplas (artículo, tipo, texto) en el orden en el que aparecen en la página, donde artículo identifica al contenedor (None si no tiene) y tipo es "timestamp" o "headline".
+
+Retorna:
+Una lista de tuplas (fecha, titular).
+"""
+def pairArticles(found: List[Tuple[Optional[int], str, str]]) -> List[Tuple[str, str]]:
+    articles: Dict[int, Dict[str, str]] = dict()
+    loose: Dict[str, List[str]] = { "timestamp": [], "headline": [] }
+
+    for container, kind, text in found:
+        if container is None:
+            loose[kind].append(text)
+        else:
+            # Si un artículo tiene varios elementos del mismo tipo se usa el primero.
+            articles.setdefault(container, dict()).setdefault(kind, text)
+
+    pairs = [(article["timestamp"], article["headline"]) for article in articles.values() if "timestamp" in article and "headline" in article]
+
+    return pairs + list(zip(loose["timestamp"], loose["headline"]))
+
+"""
+Analizador de html que no construye un árbol, solo lleva la pila de etiquetas abiertas y guarda el texto de los elementos con fechas y titulares.
+"""
+class ArticleParser(HTMLParser):
+    found: List[Tuple[Optional[int], str, str]]
+    __stack: List[str]
+    __containers: List[Tuple[int, int]]
+    __capturing: Optional[Tuple[int, str]]
+    __text: List[str]
+    __count: int
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.found = []
+        self.__stack = []
+        self.__containers = []
+        self.__capturing = None
+        self.__text = []
+        self.__count = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in VOID_TAGS:
+            return
+
+        self.__stack.append(tag)
+
+        # Cada contenedor de artículo recibe un identificador.
+        if tag in CONTAINER_TAGS:
+            self.__count += 1
+            self.__containers.append((len(self.__stack), self.__count))
+
+        if self.__capturing is not None:
+            return
+
+        # Se empieza a capturar el texto de los elementos con la fecha o el titular.
+        for name, value in attrs:
+            if name == "class" and value is not None and TIMESTAMP_CLASS in value.split():
+                self.__capturing = (len(self.__stack), "timestamp")
+            elif name == "id" and value is not None and HEADLINE_ID.search(value):
+                self.__capturing = (len(self.__stack), "headline")
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        pass
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in self.__stack:
+            return
+
+        # Se cierran las etiquetas hasta la etiqueta correspondiente, por si alguna no tenía etiqueta de cierre.
+        while self.__stack:
+            depth = len(self.__stack)
+
+            if self.__capturing is not None and self.__capturing[0] == depth:
+                container = self.__containers[-1][1] if self.__containers else None
+                self.found.append((container, self.__capturing[1], "".join(self.__text)))
+                self.__capturing = None
+                self.__text = []
+
+            if self.__containers and self.__containers[-1][0] == depth:
+                self.__containers.pop()
+
+            if self.__stack.pop() == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if self.__capturing is not None:
+            self.__text.append(data)
+
+"""
+Extrae las fechas y los titulares de una página recorriéndola como un flujo de etiquetas, sin construir el árbol del documento.
+
+Parámetros:
+html - Contenido de la página.
+
+Retorna:
+Una lista de tuplas (fecha, titular) con el texto tal como aparece en la página.
+"""
+def streamingExtractor(html: bytes) -> List[Tuple[str, str]]:
+    parser = ArticleParser()
+    parser.feed(html.decode("utf-8", errors="replace"))
+    parser.close()
+
+    return pairArticles(parser.found)
+
+"""
+Extrae las fechas y los titulares de una página construyendo el árbol completo con BeautifulSoup. Es más lento pero tolera mejor el html mal formado.
+
+Parámetros:
+html - Contenido de la página.
+
+Retorna:
+Una lista de tuplas (fecha, titular) con el texto tal como aparece en la página.
+"""
+def soupExtractor(html: bytes) -> List[Tuple[str, str]]:
+    # BeautifulSoup solo se importa si se usa este extractor.
+    from bs4 import BeautifulSoup
+
+    # Iniciamos la instancia de bs4 para analizar el html obtenido.
+    soup = BeautifulSoup(html, "html.parser")
+    found: List[Tuple[Optional[int], str, str]] = []
+
+    # Obtenemos todos los titulares y las fechas de publicación, junto con el artículo al que pertenecen.
+    for element in soup.find_all(lambda tag: TIMESTAMP_CLASS in tag.get("class", []) or HEADLINE_ID.search(tag.get("id", "")) is not None):
+        container = element.find_parent(CONTAINER_TAGS)
+        kind = "timestamp" if TIMESTAMP_CLASS in element.get("class", []) else "headline"
+        found.append((None if container is None else id(container), kind, element.get_text()))
+
+    return pairArticles(found)
+
+# Extractores disponibles.
+EXTRACTORS: Dict[str, Extractor] = {
+    "stream": streamingExtractor,
+    "soup": soupExtractor
+}
+
+"""
+Extrae las fechas y los titulares de una página. Si el extractor escogido falla o no encuentra artículos en una página que sí los tiene, se usa BeautifulSoup.
+
+Parámetros:
+html - Contenido de la página.
+extractor - Nombre del extractor a usar.
+
+Retorna:
+Una lista de tuplas (fecha, titular) con el texto tal como aparece en la página.
+"""
+def extract(html: bytes, extractor: str = "stream") -> List[Tuple[str, str]]:
+    extractArticles = EXTRACTORS[extractor]
+
+    if extractArticles is soupExtractor:
+        return soupExtractor(html)
+
+    try:
+        articles = extractArticles(html)
+    except Exception:
+        return soupExtractor(html)
+
+    if not articles and TIMESTAMP_CLASS.encode() in html:
+        return soupExtractor(html)
+
+    return articles
@@ -0,0 +1,176 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import html
+import random
+import re
+import threading
+import time
+
+"""
+Genera el html de una página de una sección de BBC Mundo con la misma estructura que usa scrap para encontrar las fechas y los titulares.
+
+Parámetros:
+articles - Lista de tuplas (hora de publicación, titular).
+offset - Número del primer artículo de la página, se usa para los identificadores de los titulares.
+
+Retorna:
+El html de la página.
+"""
+def renderPage(articles: List[Tuple[str, str]], offset: int = 0) -> bytes:
+    items = "".join(
+        f'<li class="bbc-v8cf3q"><div class="promo-text"><h2 class="bbc-qqcsu8"><a href="/mundo/noticias-{offset + i}" class="bbc-1fxtbkn" id="title_{offset + i}">{html.escape(headline)}</a></h2>'
+        f'<p class="promo-paragraph">Resumen del artículo {offset + i}.</p>'
+        f'<time class="promo-timestamp bbc-16jlylf qa-post-auto-meta" datetime="2022-05-03">{timestamp}</time></div></li>'
+        for i, (timestamp, headline) in enumerate(articles)
+    )
+
+    return f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Internacional - BBC News Mundo</title></head><body><header><nav><a href="/mundo">BBC Mundo</a></nav></header><main><ul class="bbc-k6wdzo">{items}</ul></main><footer>BBC</footer></body></html>'.encode("utf-8")
+
+"""
+Sección sintética de noticias con titulares aleatorios en español. Los artículos se numeran del más antiguo al más reciente y la página 1 muestra los más recientes, igual que en BBC Mundo, por lo que al publicar artículos nuevos los demás se desplazan hacia páginas posteriores.
+
+Parámetros:
+perPage - Número de artículos por página.
+total - Número de artículos publicados.
+seed - Semilla del generador aleatorio.
+"""
+class SyntheticFeed:
+    WORDS = ["el", "la", "de", "en", "gobierno", "presidente", "guerra", "crisis", "elecciones", "economía", "Ucrania", "Rusia", "México", "Colombia", "acuerdo", "protestas", "nuevo", "récord", "cómo", "por", "qué", "los", "las", "un", "mundo"]
+
+    perPage: int
+    total: int
+    seed: int
+
+    def __init__(self, perPage: int = 24, total: int = 24000, seed: int = 0) -> None:
+        self.perPage = perPage
+        self.total = total
+        self.seed = seed
+
+    """
+    Publica nuevos artículos al inicio de la sección.
+
+    Parámetros:
+    count - Número de artículos a publicar.
+    """
+    def publish(self, count: int) -> None:
+        self.total += count
+
+    """
+    Genera un artículo a partir de su número, siempre el mismo para el mismo número.
+    """
+    def article(self, number: int) -> Tuple[str, str]:
+        rng = random.Random(self.seed * 1000003 + number)
+        headline = " ".join(rng.choices(SyntheticFeed.WORDS, k=rng.randint(5, 14))).capitalize()
+
+        return f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}", f"{headline} ({number})"
+
+    """
+    Genera el html de una página, las páginas posteriores a la última no tienen artículos.
+    """
+    def __call__(self, page: int) -> bytes:
+        newest = self.total - 1 - (page - 1) * self.perPage
+        numbers = range(newest, max(newest - self.perPage, -1), -1)
+
+        return renderPage([self.article(number) for number in numbers], (page - 1) * self.perPage)
+
+"""
+Servidor HTTP local que reemplaza a BBC Mundo para probar y medir el scrapper sin acceso a internet. Responde a las rutas que terminan en /page/<n>, mantiene las conexiones abiertas (HTTP/1.1) y responde 304 a las solicitudes condicionales de páginas que no cambiaron.
+
+Parámetros:
+pages - Función que recibe el número de página y retorna su html.
+latency - Tiempo que tarda el servidor en responder cada página, en segundos.
+failureRate - Probabilidad de responder con un error 503, para probar los reintentos.
+redirects - Rutas movidas, para probar las redirecciones: a las solicitudes cuya ruta empieza con una clave se les responde 301 con la ruta cambiando ese prefijo por el valor, que puede ser otra ruta o una URL de otro servidor.
+"""
+class FixtureServer:
+    pages: Callable[[int], bytes]
+    latency: float
+    failureRate: float
+    redirects: Dict[str, str]
+    requests: int
+    connections: int
+    __server: Optional[ThreadingHTTPServer]
+
+    def __init__(self, pages: Optional[Callable[[int], bytes]] = None, latency: float = 0.0, failureRate: float = 0.0, redirects: Optional[Dict[str, str]] = None) -> None:
+        self.pages = pages if pages is not None else SyntheticFeed()
+        self.latency = latency
+        self.failureRate = failureRate
+        self.redirects = redirects if redirects is not None else dict()
+        self.requests = 0
+        self.connections = 0
+        self.__server = None
+
+    """
+    Retorna:
+    La URL base que se le debe pasar a scrap.
+    """
+    @property
+    def url(self) -> str:
+        return self.urlFor("/mundo/topics/fixture")
+
+    """
+    Retorna:
+    La URL de una ruta del servidor.
+    """
+    def urlFor(self, path: str) -> str:
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self) -> "FixtureServer":
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                fixture.connections += 1
+
+            def do_GET(self) -> None:
+                fixture.requests += 1
+                match = re.search(r"/page/(\d+)$", self.path)
+                time.sleep(fixture.latency)
+
+                for prefix, target in fixture.redirects.items():
+                    if self.path.startswith(prefix):
+                        self.send_response(301)
+                        self.send_header("Location", target + self.path[len(prefix):])
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+
+                if match is None or random.random() < fixture.failureRate:
+                    self.send_response(404 if match is None else 503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body = fixture.pages(int(match.group(1)))
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.__server.daemon_threads = True
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
@@ -0,0 +1,295 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import asyncio
+import json
+import logging
+import random
+import sys
+from compiled_graph import CompiledWordChainGraph
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de frases por solicitud.
+MAX_SENTENCES = 100000
+
+# Número máximo de palabras por frase. Se pasa siempre al generador, así un grafo con ciclos no puede dejar un proceso del pool generando una frase infinita.
+MAX_LENGTH = 50
+
+# Número de frases que genera un proceso en cada tarea, cada bloque se envía al cliente en cuanto está listo.
+CHUNK_SIZE = 64
+
+# Número de bloques de una misma solicitud que se generan antes de que el cliente reciba los anteriores.
+WINDOW = 2
+
+# Grafo de cada proceso del pool, se abre una sola vez al iniciar el proceso.
+workerGraph: Optional[CompiledWordChainGraph] = None
+
+"""
+Se abre el modelo en un proceso del pool. Como el modelo se mapea en memoria, todos los procesos comparten las mismas páginas del archivo.
+
+Parámetros:
+path - Ruta del modelo guardado con WordChainGraph.save.
+"""
+def initWorker(path: str) -> None:
+    global workerGraph
+    workerGraph = CompiledWordChainGraph.open(path)
+
+"""
+Se genera un bloque de frases en un proceso del pool.
+
+Parámetros:
+n - Número de frases.
+seed - Semilla del bloque.
+minLength - Número mínimo de palabras por frase.
+maxLength - Número máximo de palabras por frase.
+seedWords - Palabras con las que empiezan todas las frases.
+original - Si es verdadero se descartan las frases que copian un titular de entrenamiento.
+
+Retorna:
+Las frases generadas, pueden ser menos de n si las restricciones son difíciles de cumplir.
+"""
+def generateChunk(n: int, seed: int, minLength: int = 0, maxLength: int = MAX_LENGTH, seedWords: Tuple[str, ...] = (), original: bool = False) -> List[str]:
+    return workerGraph.generateSentences(n, seed, minLength, maxLength, seedWords, original)
+
+"""
+Se interpreta un parámetro booleano de la solicitud.
+
+Parámetros:
+value - Valor del parámetro: 1, true, yes, 0, false o no, sin importar mayúsculas.
+
+Retorna:
+El valor booleano.
+
+Si el valor no es ninguno de los anteriores se lanza ValueError.
+"""
+def parseFlag(value: str) -> bool:
+    value = value.lower()
+
+    if value not in ("1", "true", "yes", "0", "false", "no"):
+        raise ValueError(f"Valor booleano no válido: {value!r}")
+
+    return value in ("1", "true", "yes")
+
+"""
+Servidor HTTP de generación de titulares. Abre un modelo compilado una vez por proceso y responde a GET /generate?n=<frases>&seed=<semilla> con las frases en formato JSON Lines ({"sentence": ...} por línea). Las frases se generan por bloques en un pool de procesos y cada bloque se envía en cuanto está listo (con Transfer-Encoding: chunked), por lo que el cliente recibe las primeras frases sin esperar a que se generen todas.
+
+Si falla la generación de un bloque en el pool se registra el error y, si aún no se envió ninguna frase, se responde con 500; si no, se envía una última línea {"error": ...} y se termina la respuesta por bloques correctamente, así el cliente no queda esperando una respuesta truncada.
+
+Cada solicitud tiene como máximo WINDOW bloques en generación, y no se pide un bloque nuevo hasta que el anterior se haya enviado (drain), así un cliente lento frena su propia generación en vez de acumular frases en memoria. Con la misma semilla y los mismos parámetros la respuesta es siempre la misma.
+
+Además de n y seed, la solicitud acepta las restricciones de CompiledWordChainGraph.generateSentences: minLength y maxLength (palabras por frase, maxLength es como máximo MAX_LENGTH, que se usa si no se indica), seedWords (palabras iniciales separadas por espacios, deben estar en el vocabulario) y original (1 o 0, requiere el índice de originalidad). Los parámetros no válidos se responden con 400.
+
+Parámetros:
+path - Ruta del modelo guardado con WordChainGraph.save.
+host - Dirección en la que escucha el servidor.
+port - Puerto, 0 para escoger uno libre.
+workers - Número de procesos del pool, por defecto uno por núcleo.
+"""
+class GenerationServer:
+    path: str
+    host: str
+    port: int
+    workers: Optional[int]
+    __executor: Optional[ProcessPoolExecutor]
+    __graph: Optional[CompiledWordChainGraph]
+    __server: Optional[asyncio.AbstractServer]
+    __connections: Dict[asyncio.Task, asyncio.StreamWriter]
+
+    def __init__(self, path: str, host: str = "127.0.0.1", port: int = 8000, workers: Optional[int] = None) -> None:
+        self.path = path
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.__executor = None
+        self.__graph = None
+        self.__server = None
+        self.__connections = dict()
+
+    """
+    Se inicia el pool de procesos y se empieza a aceptar conexiones.
+    """
+    async def start(self) -> None:
+        # Se abre el modelo también en este proceso para fallar antes de aceptar conexiones si el archivo no es válido, y para validar las palabras iniciales de las solicitudes.
+        self.__graph = CompiledWordChainGraph.open(self.path)
+        self.__executor = ProcessPoolExecutor(max_workers=self.workers, initializer=initWorker, initargs=(self.path,))
+        self.__server = await asyncio.start_server(self.__handle, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def serveForever(self) -> None:
+        await self.__server.serve_forever()
+
+    """
+    Se dejan de aceptar conexiones, se cierran las abiertas esperando a que terminen sus manejadores y se detiene el pool.
+    """
+    async def close(self) -> None:
+        self.__server.close()
+
+        for writer in list(self.__connections.values()):
+            writer.close()
+
+        await asyncio.gather(*self.__connections, return_exceptions=True)
+        await self.__server.wait_closed()
+        self.__executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self) -> "GenerationServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    """
+    Se atienden las solicitudes de una conexión, que se mantiene abierta entre solicitudes (HTTP/1.1).
+    """
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self.__connections[task] = writer
+
+        try:
+            while True:
+                request = await readRequest(reader)
+
+                if request is None:
+                    break
+
+                method, target, headers = request
+                await self.__respond(method, target, writer)
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.__connections[task]
+            writer.close()
+
+    async def __respond(self, method: str, target: str, writer: asyncio.StreamWriter) -> None:
+        url = urlsplit(target)
+
+        if method != "GET" or url.path not in ("/generate", "/health"):
+            await sendError(writer, 404, "Not Found")
+            return
+
+        if url.path == "/health":
+            await sendResponse(writer, 200, "OK", b'{"status": "ok"}\n', "application/json")
+            return
+
+        # Se validan los parámetros de la solicitud.
+        query = parse_qs(url.query)
+
+        try:
+            n = int(query.get("n", ["10"])[0])
+            seed = int(query["seed"][0]) if "seed" in query else random.getrandbits(32)
+            minLength = int(query.get("minLength", ["0"])[0])
+            maxLength = int(query.get("maxLength", [str(MAX_LENGTH)])[0])
+            seedWords = tuple(query.get("seedWords", [""])[0].split())
+            original = parseFlag(query.get("original", ["0"])[0])
+        except ValueError:
+            await sendError(writer, 400, "Bad Request")
+            return
+
+        valid = 0 < n <= MAX_SENTENCES and 0 <= minLength <= maxLength <= MAX_LENGTH and len(seedWords) <= maxLength
+        valid = valid and all(word in self.__graph.ids for word in seedWords) and not (original and self.__graph.originality is None)
+
+        if not valid:
+            await sendError(writer, 400, "Bad Request")
+            return
+
+        # Se divide la solicitud en bloques, cada uno con una semilla derivada de la semilla de la solicitud.
+        loop = asyncio.get_running_loop()
+        sizes = [min(CHUNK_SIZE, n - i) for i in range(0, n, CHUNK_SIZE)]
+        pending: List[asyncio.Future] = []
+        submitted = sent = 0
+
+        while submitted < len(sizes) or pending:
+            # Se mantienen como máximo WINDOW bloques en generación.
+            while submitted < len(sizes) and len(pending) < WINDOW:
+                pending.append(loop.run_in_executor(self.__executor, generateChunk, sizes[submitted], seed * 1000003 + submitted, minLength, maxLength, seedWords, original))
+                submitted += 1
+
+            try:
+                sentences = await pending.pop(0)
+            except Exception:
+                logger.exception("Falló la generación de un bloque de %s", target)
+
+                for future in pending:
+                    future.cancel()
+
+                if sent == 0:
+                    await sendError(writer, 500, "Internal Server Error")
+                else:
+                    data = json.dumps({ "error": "Internal Server Error" }).encode("utf-8") + b"\n"
+                    writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(data), data))
+                    await writer.drain()
+
+                return
+
+            # Los encabezados se envían con el primer bloque, así si este falla todavía se puede responder con 500.
+            if sent == 0:
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\nTransfer-Encoding: chunked\r\n\r\n")
+
+            data = "".join(json.dumps({ "sentence": sentence }, ensure_ascii=False) + "\n" for sentence in sentences).encode("utf-8")
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            sent += 1
+
+            # Se espera a que el cliente reciba el bloque antes de pedir el siguiente.
+            await writer.drain()
+
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+"""
+Se lee una solicitud HTTP.
+
+Parámetros:
+reader - Flujo de la conexión.
+
+Retorna:
+Una tupla (método, ruta, encabezados), o None si el cliente cerró la conexión.
+"""
+async def readRequest(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    line = await reader.readline()
+
+    if not line:
+        return None
+
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers: Dict[str, str] = dict()
+
+    # Los encabezados terminan con una línea vacía.
+    while True:
+        line = await reader.readline()
+
+        if line in (b"\r\n", b"\n", b""):
+            break
+
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    return method, target, headers
+
+async def sendResponse(writer: asyncio.StreamWriter, status: int, reason: str, body: bytes, contentType: str) -> None:
+    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {contentType}\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+
+async def sendError(writer: asyncio.StreamWriter, status: int, reason: str) -> None:
+    await sendResponse(writer, status, reason, json.dumps({ "error": reason }).encode("utf-8") + b"\n", "application/json")
+
+"""
+Se inicia el servidor con un modelo guardado.
+
+Parámetros:
+path - Ruta del modelo.
+host - Dirección en la que escucha el servidor.
+port - Puerto.
+workers - Número de procesos del pool.
+"""
+async def serve(path: str, host: str = "127.0.0.1", port: int = 8000, workers: Optional[int] = None) -> None:
+    async with GenerationServer(path, host, port, workers) as server:
+        print(f"Sirviendo {path} en http://{server.host}:{server.port}/generate?n=10&seed=1")
+        await server.serveForever()
+
+if __name__ == "__main__":
+    # Uso: python generation_server.py [modelo] [puerto]
+    asyncio.run(serve(sys.argv[1] if len(sys.argv) > 1 else "model.wcg", port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000))
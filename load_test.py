@@ -0,0 +1,134 @@
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import json
+import sys
+import time
+
+"""
+Se calcula un percentil de una lista de valores.
+
+Parámetros:
+values - Valores ordenados.
+percent - Percentil, entre 0 y 100.
+
+Retorna:
+El valor del percentil (el más cercano por arriba).
+"""
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+
+    return values[min(len(values) - 1, max(0, -(-len(values) * percent // 100) - 1))]
+
+"""
+Se envía una solicitud de generación por una conexión abierta y se leen las frases a medida que llegan.
+
+Parámetros:
+reader - Flujo de lectura de la conexión.
+writer - Flujo de escritura de la conexión.
+host - Nombre del servidor para el encabezado Host.
+path - Ruta de la solicitud, con sus parámetros.
+
+Retorna:
+Una tupla (segundos hasta la primera frase, segundos hasta la última, número de frases).
+"""
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str) -> Tuple[float, float, int]:
+    start = time.perf_counter()
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise ConnectionError(f"Respuesta inesperada: {status.decode('latin-1').strip()}")
+
+    # Se ignoran los encabezados, el servidor siempre responde por bloques.
+    while await reader.readline() not in (b"\r\n", b""):
+        pass
+
+    first = None
+    sentences = 0
+
+    # Se lee cada bloque: su tamaño en hexadecimal, los datos y un salto de línea.
+    while True:
+        size = int(await reader.readline(), 16)
+
+        if size == 0:
+            await reader.readline()
+            break
+
+        data = await reader.readexactly(size + 2)
+        sentences += data.count(b"\n") - 1
+
+        if first is None:
+            first = time.perf_counter() - start
+
+    return first or 0.0, time.perf_counter() - start, sentences
+
+"""
+Un cliente que envía solicitudes una tras otra por la misma conexión.
+"""
+async def client(url: str, requests: int, n: int, seed: int, results: List[Tuple[float, float, int]]) -> None:
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+
+    try:
+        for i in range(requests):
+            results.append(await request(reader, writer, parts.netloc, f"/generate?n={n}&seed={seed + i}"))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+"""
+Prueba de carga del servidor de generación: varios clientes concurrentes envían solicitudes y se mide la latencia hasta la primera frase y hasta la respuesta completa, y el número de frases y solicitudes por segundo.
+
+Parámetros:
+url - URL base del servidor, por ejemplo http://127.0.0.1:8000.
+concurrency - Número de clientes concurrentes, cada uno con su conexión.
+requests - Número de solicitudes por cliente.
+n - Número de frases por solicitud.
+
+Retorna:
+Un diccionario con las métricas de la prueba.
+"""
+async def loadTest(url: str, concurrency: int = 16, requests: int = 20, n: int = 100) -> Dict[str, float]:
+    results: List[Tuple[float, float, int]] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, requests, n, 1000 * i, results) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    firsts = sorted(result[0] for result in results)
+    totals = sorted(result[1] for result in results)
+    sentences = sum(result[2] for result in results)
+
+    return {
+        "requests": len(results),
+        "sentences": sentences,
+        "seconds": elapsed,
+        "requestsPerSecond": len(results) / elapsed,
+        "sentencesPerSecond": sentences / elapsed,
+        "firstP50": percentile(firsts, 50),
+        "firstP99": percentile(firsts, 99),
+        "totalP50": percentile(totals, 50),
+        "totalP99": percentile(totals, 99)
+    }
+
+"""
+Se imprime el resultado de una prueba de carga.
+"""
+def printReport(report: Dict[str, float]) -> None:
+    print(f"{report['requests']} solicitudes, {report['sentences']} frases en {report['seconds']:.2f} s")
+    print(f"{report['requestsPerSecond']:.1f} solicitudes/s, {report['sentencesPerSecond']:.0f} frases/s")
+    print(f"Primera frase: p50 {report['firstP50'] * 1000:.1f} ms, p99 {report['firstP99'] * 1000:.1f} ms")
+    print(f"Respuesta completa: p50 {report['totalP50'] * 1000:.1f} ms, p99 {report['totalP99'] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    # Uso: python load_test.py [url] [clientes] [solicitudes por cliente] [frases por solicitud] [--json]
+    arguments = [argument for argument in sys.argv[1:] if argument != "--json"]
+    url = arguments[0] if len(arguments) > 0 else "http://127.0.0.1:8000"
+    report = asyncio.run(loadTest(url, *(int(argument) for argument in arguments[1:4])))
+
+    if "--json" in sys.argv:
+        print(json.dumps(report))
+    else:
+        printReport(report)
@@ -1,47 +1,93 @@
-import nltk
-nltk.download("punkt")
-nltk.download("stopwords")
-from word_chain_graph import WordChainGraph
 from scrap_news import scrap
-from analytics import articlesForDate, barGraph, getTopN, ngramFrequencyDistribution, plotFreqDist, timeline, wordFrequencyDistribution, mostCommonWordForDate, tokenizeAndClean, tokenize, wordcloud
-import matplotlib.pyplot as plt
+from article_store import ArticleStore
+from pipeline import runPipeline
+from rendering import Chart, freqDistChart, renderReport
+from analytics import barGraph, checkNltkData, plotFreqDist, timeline, wordcloud
+from profiling import PROFILER, stage
+from sources import SCRAPE_LIMIT, MultiSource, openSource
+import os
+import sys
 
 if __name__ == "__main__":
-    # Se obtienen n noticias de BBC Mundo
-    news = scrap(30)
-    headlines = [n[1] for n in news]
+    # Se comprueba que estén los datos de NLTK antes de descargar noticias. Nunca se descargan durante la ejecución, se instalan una sola vez con: python -m nltk.downloader stopwords
+    checkNltkData()
 
-    # Se limpian los titulares de las noticias para evitar stop words y puntuación
-    cleaned = tokenizeAndClean(headlines)
-    tokenized = tokenize(headlines)
+    # Con --profile se mide el tiempo y la memoria de cada etapa, también en los procesos del pool; con --trace además la memoria reservada, lo que hace más lenta la ejecución.
+    if "--profile" in sys.argv:
+        PROFILER.enable(trace="--trace" in sys.argv)
 
-    # Creamos un grafo de cadenas de Markov y le pasamos los títulos de las noticias limpiados
-    graph = WordChainGraph()
-    graph.load(tokenized)
+    # Con --source=<archivo o URL> (se puede repetir) se usan archivos CSV, TSV o JSON Lines y secciones de BBC Mundo como corpus. Se recorren como un flujo una sola vez, sin cargarlos completos en memoria; de cada sección se obtienen como máximo --limit=<n> artículos (por defecto SCRAPE_LIMIT).
+    limits = [int(argument.partition("=")[2]) for argument in sys.argv[1:] if argument.startswith("--limit=")]
+    sources = [openSource(argument.partition("=")[2], limits[-1] if limits else SCRAPE_LIMIT) for argument in sys.argv[1:] if argument.startswith("--source=")]
 
-    # Se extraen todas las palabras en los titulares de las noticias.
-    words = [word for sentence in cleaned for word in sentence]
+    if sources:
+        news = MultiSource(sources)
+    else:
+        # Se obtienen n noticias de BBC Mundo, solo se descargan las páginas con noticias que no estén en el almacén local.
+        with stage("scrap"), ArticleStore("news.db") as store:
+            news = scrap(30, store=store)
 
-    # Dibujamos la nube de palabras con las palabras extraídas de las noticias.
-    wordcloud(words)
+    # Se dividen las noticias en partes que se procesan en paralelo: en cada parte se dividen los titulares en palabras, se limpian para evitar stop words y puntuación, se entrena un grafo de cadenas de Markov, se calculan las estadísticas y se guardan sus fechas y palabras por columnas para las consultas por día. Los resultados de las partes se suman al final.
+    with stage("pipeline"):
+        result = runPipeline(news, columns=True)
 
-    # Haciendo uso del grafo de cadenas de Markov, generamos n titulares de fake news, los cuales son escritos a un archivo llamado 'fakenews.csv'.
-    with open("fakenews.csv", "w", encoding="utf-8") as file:
-        for sentence in graph.generateSentences(30):
+    graph = result.graph
+    stats = result.stats
+
+    # Se ordenan las columnas por fecha.
+    with stage("columns"):
+        columns = result.columns.build()
+
+    # Se compila el grafo para que cada transición se realice en tiempo constante y se guarda para que otros procesos lo puedan abrir sin volver a entrenarlo.
+    with stage("compile"):
+        graph.compile()
+        graph.save("model.wcg")
+
+    # Dibujamos localmente la nube de palabras con la frecuencia de las palabras de las noticias, si no cambió desde la última ejecución se toma de la caché.
+    os.makedirs("report", exist_ok=True)
+
+    with stage("wordcloud"):
+        cloud = wordcloud(stats.wordFrequencyDistribution(), "report/wordcloud.png")
+
+    # Haciendo uso del grafo de cadenas de Markov, generamos n titulares de fake news de 4 a 25 palabras que no copian ningún titular real, los cuales son escritos a un archivo llamado 'fakenews.csv'.
+    with stage("generate"), open("fakenews.csv", "w", encoding="utf-8") as file:
+        for sentence in graph.generateSentences(30, minLength=4, maxLength=25, original=True):
             file.write(sentence + "\n")
 
     # Calculamos estadísticas relevantes
-    wfd = getTopN(wordFrequencyDistribution(words), 10) # 10 palabras mas comunes
-    mcw = mostCommonWordForDate([(n[0], headline) for n, headline in zip(news, cleaned)]) # palabra más común por día.
-    afd = articlesForDate(news) # Número de artículos por día.
-    bigramfd = getTopN(ngramFrequencyDistribution(tokenized, 2), 10) # 10 bigramas mas comunes
-    trigramfd = getTopN(ngramFrequencyDistribution(tokenized, 3), 10) # 10 trigramas mas comunes
-
-    # Dibujamos gráficos
-    plotFreqDist(wfd, "Distribución de frecuencia de palabras", "Palabras")
-    plotFreqDist(bigramfd, "Distribución de frecuencia de bigramas", "Bigramas")
-    plotFreqDist(trigramfd, "Distribución de frecuencia de trigramas", "Trigramas")
-    timeline(mcw, "Palabra más frecuente por fecha")
-    barGraph(afd, "Número de artículos por fecha", "Fecha", "Número de artículos")
-
-    plt.show()
+    with stage("stats"):
+        wfd = stats.topWords(10) # 10 palabras mas comunes
+        mcw = columns.mostCommonWordPerPeriod("D") # palabra más común por día, en orden cronológico.
+        afd = columns.articlesPerPeriod("D") # Número de artículos por día, en orden cronológico.
+        bigramfd = stats.topNgrams(2, 10) # 10 bigramas mas comunes
+        trigramfd = stats.topNgrams(3, 10) # 10 trigramas mas comunes
+
+    # Dibujamos gráficos en archivos PNG y SVG en la carpeta 'report', en paralelo y sin ventanas. Los gráficos que no cambiaron desde la última ejecución no se vuelven a dibujar.
+    charts = [
+        freqDistChart("palabras", wfd, "Distribución de frecuencia de palabras", "Palabras"),
+        freqDistChart("bigramas", bigramfd, "Distribución de frecuencia de bigramas", "Bigramas"),
+        freqDistChart("trigramas", trigramfd, "Distribución de frecuencia de trigramas", "Trigramas"),
+        Chart("palabra_por_fecha", "timeline", mcw, title="Palabra más frecuente por fecha"),
+        Chart("articulos_por_fecha", "bar", afd, title="Número de artículos por fecha", xLabel="Fecha", yLabel="Número de artículos")
+    ]
+
+    with stage("charts"):
+        renderReport(charts, "report")
+
+    # Se muestran las estadísticas de cada etapa y se guardan en 'report/profile.json' para compararlas entre ejecuciones.
+    if PROFILER.enabled:
+        PROFILER.printReport()
+        PROFILER.save("report/profile.json")
+
+    # Con --show los gráficos también se muestran en ventanas.
+    if "--show" in sys.argv:
+        import matplotlib.pyplot as plt
+
+        plotFreqDist(wfd, "Distribución de frecuencia de palabras", "Palabras")
+        plotFreqDist(bigramfd, "Distribución de frecuencia de bigramas", "Bigramas")
+        plotFreqDist(trigramfd, "Distribución de frecuencia de trigramas", "Trigramas")
+        timeline(mcw, "Palabra más frecuente por fecha")
+        barGraph(afd, "Número de artículos por fecha", "Fecha", "Número de artículos")
+        cloud.result().show()
+
+        plt.show()
@@ -0,0 +1,210 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import multiprocessing
+import os
+from aggregator import NewsAggregator
+from analytics import tokenizeAll
+from columnar import ColumnBuilder
+from profiling import PROFILER, stage
+from word_chain_graph import WordChainGraph
+
+# Número mínimo de artículos por parte, con menos el costo de enviar las partes a los procesos supera al de procesarlas.
+MIN_SHARD_SIZE = 1000
+
+# Número de artículos de cada parte cuando el corpus es un flujo (por ejemplo una fuente de sources), del que no se conoce el tamaño.
+STREAM_SHARD_SIZE = 10000
+
+"""
+Resultado de procesar el corpus o una parte de él: la cadena de Markov entrenada con los titulares, las estadísticas de los artículos y, opcionalmente, sus columnas por fecha.
+
+Parámetros:
+graph - Cadena de Markov.
+stats - Estadísticas de los artículos.
+columns - Constructor de las columnas de los artículos (sin titulares), None si no se pidieron.
+profile - Estadísticas del perfilador del proceso del pool que procesó la parte, None si el perfilado está desactivado o la parte se procesó en el proceso principal.
+"""
+class PipelineResult:
+    graph: WordChainGraph
+    stats: NewsAggregator
+    columns: Optional[ColumnBuilder]
+    profile: Optional[List[Dict[str, Any]]]
+
+    def __init__(self, graph: WordChainGraph, stats: NewsAggregator, columns: Optional[ColumnBuilder] = None, profile: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.graph = graph
+        self.stats = stats
+        self.columns = columns
+        self.profile = profile
+
+    """
+    Se suma el resultado de otra parte del corpus. Si las partes se suman en el orden en el que aparecen en el corpus, el vocabulario y las distribuciones quedan en el mismo orden que si se hubiera procesado el corpus completo, por lo que los empates y las frases generadas con una semilla también coinciden.
+
+    Parámetros:
+    other - Resultado de la parte siguiente del corpus.
+    """
+    def merge(self, other: "PipelineResult") -> None:
+        self.graph.merge(other.graph)
+        self.stats.merge(other.stats)
+
+        if self.columns is not None and other.columns is not None:
+            self.columns.merge(other.columns)
+
+"""
+Se procesa una parte del corpus: se tokenizan los titulares una sola vez, se entrena una cadena de Markov con ellos, se calculan sus estadísticas y, si se piden, sus columnas. Se ejecuta en los procesos del pool, por lo que es una función del módulo y su resultado se puede serializar.
+
+Parámetros:
+shard - Artículos de la parte, cada uno es una tupla donde el primer elemento es la fecha y el segundo el titular.
+order - Orden de la cadena de Markov.
+maxOrder - Número máximo de palabras de los ngramas.
+columns - Si es verdadero también se construyen las columnas de la parte.
+
+Retorna:
+El resultado parcial de la parte.
+"""
+def processShard(shard: List[Tuple[str, str]], order: int = 1, maxOrder: int = 3, columns: bool = False) -> PipelineResult:
+    with stage("pipeline.tokenize"):
+        tokenized, _ = tokenizeAll([headline for _, headline in shard])
+
+    with stage("pipeline.train"):
+        graph = WordChainGraph(order)
+        graph.update(tokenized)
+
+    # El agregador vuelve a pedir los tokens de cada titular, que ya están en la caché del tokenizador.
+    with stage("pipeline.stats"):
+        stats = NewsAggregator(maxOrder).addAll(shard)
+
+    builder = None
+
+    if columns:
+        with stage("pipeline.columns"):
+            builder = ColumnBuilder().addAll(shard)
+
+    # En un proceso del pool las estadísticas del perfilador se envían junto con el resultado.
+    profile = PROFILER.drain() if PROFILER.enabled and multiprocessing.parent_process() is not None else None
+
+    return PipelineResult(graph, stats, builder, profile)
+
+"""
+Se divide el corpus en partes contiguas de igual tamaño.
+
+Parámetros:
+news - Artículos del corpus.
+shards - Número de partes.
+
+Retorna:
+Las partes, en el orden del corpus y sin partes vacías.
+"""
+def splitShards(news: List[Tuple[str, str]], shards: int) -> List[List[Tuple[str, str]]]:
+    size = max(1, -(-len(news) // shards))
+    return [news[i:i + size] for i in range(0, len(news), size)]
+
+"""
+Se lee un flujo de artículos por partes contiguas, sin leer la parte siguiente hasta que se pide.
+
+Parámetros:
+news - Flujo de artículos.
+size - Número de artículos de cada parte.
+
+Retorna:
+Un iterador de las partes, en el orden del flujo y sin partes vacías.
+"""
+def streamShards(news: Iterable[Tuple[str, str]], size: int) -> Iterator[List[Tuple[str, str]]]:
+    news = iter(news)
+
+    while True:
+        shard = list(islice(news, size))
+
+        if not shard:
+            return
+
+        yield shard
+
+"""
+Se suma el resultado de una parte al de las partes anteriores, junto con las estadísticas del perfilador del proceso que la procesó.
+
+Parámetros:
+result - Resultado de las partes anteriores, None si es la primera parte.
+partial - Resultado de la parte.
+
+Retorna:
+El resultado acumulado.
+"""
+def reduceResult(result: Optional[PipelineResult], partial: PipelineResult) -> PipelineResult:
+    if partial.profile is not None:
+        PROFILER.merge(partial.profile)
+
+    with stage("pipeline.merge"):
+        if result is None:
+            return partial
+
+        result.merge(partial)
+        return result
+
+"""
+Procesa el corpus con map-reduce: el corpus se divide en partes, cada parte se tokeniza, se usa para entrenar una cadena de Markov y se cuenta en un proceso distinto (map), y los resultados parciales se suman en el proceso principal en el orden del corpus (reduce). El resultado es el mismo que el de procesar todo el corpus en un solo proceso.
+
+Si el corpus es una secuencia (por ejemplo la lista que retorna scrap) se divide en partes de igual tamaño. Si es cualquier otro iterable (por ejemplo una fuente de sources) se lee por partes de shardSize artículos a medida que los procesos quedan libres, con como máximo dos partes por proceso en espera, por lo que el corpus nunca se carga completo en memoria. El resultado es el mismo en ambos casos.
+
+Parámetros:
+news - Artículos del corpus, cada uno es una tupla donde el primer elemento es la fecha y el segundo el titular.
+workers - Número de procesos, por defecto uno por núcleo. Con 1, o si el corpus no alcanza para más de una parte, el corpus se procesa en el proceso principal.
+shards - Número de partes de una secuencia, por defecto cuatro por proceso para repartir mejor la carga. Cada parte tiene al menos MIN_SHARD_SIZE artículos.
+order - Orden de la cadena de Markov.
+maxOrder - Número máximo de palabras de los ngramas.
+shardSize - Número de artículos de cada parte de un flujo.
+columns - Si es verdadero también se construyen las columnas de los artículos por fecha (ver columnar.ColumnBuilder) en la misma pasada, sin guardar los titulares.
+
+Retorna:
+La cadena de Markov y las estadísticas del corpus completo.
+
+Con el perfilado activado (ver profiling) se miden las etapas de cada parte, incluso en los procesos del pool: sus tiempos se suman, por lo que con varios procesos pueden superar el tiempo de pipeline.map.
+"""
+def runPipeline(news: Iterable[Tuple[str, str]], workers: Optional[int] = None, shards: Optional[int] = None, order: int = 1, maxOrder: int = 3, shardSize: int = STREAM_SHARD_SIZE, columns: bool = False) -> PipelineResult:
+    workers = workers if workers is not None else os.cpu_count() or 1
+
+    if not isinstance(news, Sequence):
+        return runStream(news, workers, order, maxOrder, shardSize, columns)
+
+    shards = min(shards if shards is not None else workers * 4, len(news) // MIN_SHARD_SIZE)
+
+    if workers == 1 or shards <= 1:
+        with stage("pipeline.map"):
+            return processShard(news, order, maxOrder, columns)
+
+    parts = splitShards(news, shards)
+    result: Optional[PipelineResult] = None
+
+    with stage("pipeline.map"), ProcessPoolExecutor(max_workers=workers) as executor:
+        # map entrega los resultados en el orden de las partes, cada uno se suma al de las partes anteriores en cuanto llega.
+        for partial in executor.map(processShard, parts, [order] * len(parts), [maxOrder] * len(parts), [columns] * len(parts)):
+            result = reduceResult(result, partial)
+
+    return result
+
+"""
+Procesa un flujo de artículos por partes, como runPipeline.
+"""
+def runStream(news: Iterable[Tuple[str, str]], workers: int, order: int, maxOrder: int, shardSize: int, columns: bool) -> PipelineResult:
+    result: Optional[PipelineResult] = None
+
+    if workers == 1:
+        with stage("pipeline.map"):
+            for shard in streamShards(news, shardSize):
+                result = reduceResult(result, processShard(shard, order, maxOrder, columns))
+    else:
+        with stage("pipeline.map"), ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: Deque[Future] = deque()
+
+            # Se envía una parte nueva solo cuando hay menos de dos partes por proceso en espera, y los resultados se suman en el orden del flujo.
+            for shard in streamShards(news, shardSize):
+                pending.append(executor.submit(processShard, shard, order, maxOrder, columns))
+
+                if len(pending) >= 2 * workers:
+                    result = reduceResult(result, pending.popleft().result())
+
+            while pending:
+                result = reduceResult(result, pending.popleft().result())
+
+    # Un flujo vacío da un resultado vacío, igual que una lista vacía.
+    return result if result is not None else processShard([], order, maxOrder, columns)
@@ -0,0 +1,277 @@
+from typing import Any, Dict, List, Optional
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # El módulo resource no existe en Windows, ahí no se reporta la memoria residente.
+    resource = None
+
+# Variable de entorno que activa el perfilado: "1" mide el tiempo y la memoria residente de cada etapa, "trace" también mide la memoria reservada con tracemalloc. Los procesos del pool heredan el entorno, por lo que también perfilan sus etapas.
+PROFILE_ENV = "FAKENEWS_PROFILE"
+
+"""
+Retorna:
+El pico de memoria residente del proceso en bytes, o None si el sistema no lo reporta.
+"""
+def peakRss() -> Optional[int]:
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reporta kilobytes y macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+"""
+Retorna:
+Un número de bytes en megabytes con un decimal, o "-" si no se midió.
+"""
+def formatMegabytes(value: Optional[int]) -> str:
+    return f"{value / 2**20:.1f}" if value is not None else "-"
+
+"""
+Estadísticas acumuladas de una etapa.
+
+Parámetros:
+name - Nombre de la etapa.
+calls - Número de veces que se ejecutó.
+seconds - Tiempo total de las ejecuciones.
+peakRss - Pico de memoria residente del proceso al terminar la etapa, en bytes.
+rssGrowth - Lo que la etapa subió el pico de memoria residente del proceso, en bytes.
+allocatedPeak - Máximo de memoria reservada por la etapa por encima de la que había al iniciarla, en bytes, medida con tracemalloc. None si no se midió.
+"""
+class StageStats:
+    name: str
+    calls: int
+    seconds: float
+    peakRss: Optional[int]
+    rssGrowth: Optional[int]
+    allocatedPeak: Optional[int]
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.peakRss = None
+        self.rssGrowth = None
+        self.allocatedPeak = None
+
+    """
+    Se suman las estadísticas de otra ejecución de la misma etapa, por ejemplo de otro proceso.
+
+    Parámetros:
+    other - Estadísticas como las retorna toDict.
+    """
+    def add(self, other: Dict[str, Any]) -> None:
+        self.calls += other["calls"]
+        self.seconds += other["seconds"]
+
+        # Los picos no se suman, se conserva el mayor.
+        for name in ("peakRss", "rssGrowth", "allocatedPeak"):
+            if other[name] is not None:
+                setattr(self, name, max(getattr(self, name) or 0, other[name]))
+
+    def toDict(self) -> Dict[str, Any]:
+        return { "name": self.name, "calls": self.calls, "seconds": self.seconds, "peakRss": self.peakRss, "rssGrowth": self.rssGrowth, "allocatedPeak": self.allocatedPeak }
+
+"""
+Etapa abierta de un Profiler, se usa con with.
+"""
+class Stage:
+    __profiler: "Profiler"
+    __name: str
+    __start: float
+    __rss: Optional[int]
+    __traced: int
+    peak: int
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.__profiler = profiler
+        self.__name = name
+        self.peak = 0
+
+    def __enter__(self) -> "Stage":
+        self.__profiler.push(self)
+        self.__rss = peakRss()
+        self.__traced = tracemalloc.get_traced_memory()[0] if self.__profiler.trace else 0
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        seconds = time.perf_counter() - self.__start
+        rss = peakRss()
+        allocated = None
+
+        if self.__profiler.trace:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            allocated = self.peak - self.__traced
+
+        self.__profiler.pop(self)
+        self.__profiler.record(self.__name, { "calls": 1, "seconds": seconds, "peakRss": rss, "rssGrowth": rss - self.__rss if rss is not None else None, "allocatedPeak": allocated })
+
+"""
+Etapa que no mide nada, se usa cuando el perfilado está desactivado para que el costo de instrumentar el código sea despreciable.
+"""
+class NullStage:
+    def __enter__(self) -> "NullStage":
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+NULL_STAGE = NullStage()
+
+"""
+Perfilador por etapas: mide el tiempo, el pico de memoria residente y, opcionalmente, la memoria reservada (tracemalloc) de cada bloque de código marcado con stage. Las etapas se pueden anidar; tracemalloc solo tiene un pico global, por lo que al abrir una etapa se guarda el pico de la etapa que la contiene antes de reiniciarlo.
+
+Parámetros:
+enabled - Si es falso, stage no mide nada.
+trace - Si es verdadero se mide la memoria reservada con tracemalloc, lo que hace más lento el código medido.
+stages - Estadísticas de cada etapa, en el orden en el que se ejecutaron por primera vez.
+"""
+class Profiler:
+    enabled: bool
+    trace: bool
+    stages: Dict[str, StageStats]
+    __open: List[Stage]
+
+    def __init__(self, enabled: bool = False, trace: bool = False) -> None:
+        self.enabled = enabled
+        self.trace = enabled and trace
+        self.stages = dict()
+        self.__open = []
+
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    """
+    Se activa el perfilado, también para los procesos que este proceso inicie después (mediante la variable de entorno).
+
+    Parámetros:
+    trace - Si es verdadero también se mide la memoria reservada.
+    """
+    def enable(self, trace: bool = False) -> None:
+        self.enabled = True
+        self.trace = trace
+        os.environ[PROFILE_ENV] = "trace" if trace else "1"
+
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    """
+    Se descartan las estadísticas acumuladas y las etapas abiertas, sin cambiar si el perfilado está activado.
+    """
+    def reset(self) -> None:
+        self.stages.clear()
+        self.__open.clear()
+
+    def disable(self) -> None:
+        self.enabled = False
+        os.environ.pop(PROFILE_ENV, None)
+
+        if self.trace:
+            tracemalloc.stop()
+            self.trace = False
+
+    """
+    Se marca un bloque de código como una etapa.
+
+    Parámetros:
+    name - Nombre de la etapa, las ejecuciones con el mismo nombre se acumulan.
+
+    Retorna:
+    Un contexto para usar con with.
+    """
+    def stage(self, name: str):
+        return Stage(self, name) if self.enabled else NULL_STAGE
+
+    def push(self, stage: Stage) -> None:
+        if self.trace:
+            # Se guarda el pico de la etapa que contiene a la nueva y se reinicia para medir la nueva por separado.
+            if self.__open:
+                self.__open[-1].peak = max(self.__open[-1].peak, tracemalloc.get_traced_memory()[1])
+
+            tracemalloc.reset_peak()
+
+        self.__open.append(stage)
+
+    def pop(self, stage: Stage) -> None:
+        self.__open.pop()
+
+        # El pico de la etapa interna también es parte del pico de la que la contiene.
+        if self.__open:
+            self.__open[-1].peak = max(self.__open[-1].peak, stage.peak)
+
+    """
+    Se suman las estadísticas de una etapa.
+
+    Parámetros:
+    name - Nombre de la etapa.
+    stats - Estadísticas como las retorna StageStats.toDict.
+    """
+    def record(self, name: str, stats: Dict[str, Any]) -> None:
+        if name not in self.stages:
+            self.stages[name] = StageStats(name)
+
+        self.stages[name].add(stats)
+
+    """
+    Se retiran las estadísticas acumuladas, por ejemplo para enviarlas desde un proceso del pool al proceso principal.
+
+    Retorna:
+    Las estadísticas de cada etapa.
+    """
+    def drain(self) -> List[Dict[str, Any]]:
+        report = self.report()
+        self.stages.clear()
+        return report
+
+    """
+    Se suman las estadísticas retiradas de otro perfilador con drain.
+    """
+    def merge(self, report: List[Dict[str, Any]]) -> None:
+        for stats in report:
+            self.record(stats["name"], stats)
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [stats.toDict() for stats in self.stages.values()]
+
+    def printReport(self) -> None:
+        print(f"{'etapa':<22} {'llamadas':>9} {'tiempo (s)':>11} {'pico RSS (MB)':>14} {'+RSS (MB)':>10} {'reservado (MB)':>15}")
+
+        for stats in self.stages.values():
+            print(f"{stats.name:<22} {stats.calls:>9} {stats.seconds:>11.3f} {formatMegabytes(stats.peakRss):>14} {formatMegabytes(stats.rssGrowth):>10} {formatMegabytes(stats.allocatedPeak):>15}")
+
+    """
+    Se guardan las estadísticas en un archivo JSON.
+
+    Parámetros:
+    path - Ruta del archivo.
+    """
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=2)
+
+# Perfilador del proceso, desactivado salvo que se active con la variable de entorno o con enable.
+PROFILER = Profiler(os.environ.get(PROFILE_ENV, "") != "", os.environ.get(PROFILE_ENV) == "trace")
+
+# Un proceso creado con fork hereda una copia de las estadísticas del proceso principal. Se descartan en el hijo, de lo contrario drain las enviaría de vuelta y el proceso principal las contaría otra vez.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=PROFILER.reset)
+
+"""
+Se marca un bloque de código como una etapa del perfilador del proceso. Si el perfilado está desactivado no mide nada.
+
+Parámetros:
+name - Nombre de la etapa.
+
+Retorna:
+Un contexto para usar con with.
+"""
+def stage(name: str):
+    return PROFILER.stage(name)
@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import json
+import os
+
+# Versión del dibujo de los gráficos, se incluye en el hash para que cambiar el dibujo invalide la caché.
+RENDER_VERSION = 1
+
+# Nombre del archivo donde se guarda el hash de cada gráfico ya dibujado.
+CACHE_FILE = "charts.json"
+
+# Tamaño de cada tipo de gráfico, en pulgadas.
+FIGURE_SIZES = { "bar": (13, 6), "timeline": (13, 4) }
+
+"""
+Descripción de un gráfico de un reporte, con todo lo necesario para dibujarlo en otro proceso.
+
+Parámetros:
+name - Nombre del gráfico, se usa como nombre de los archivos.
+kind - Tipo de gráfico: "bar" o "timeline".
+data - Datos a graficar.
+options - Argumentos de la función que dibuja el gráfico además de los datos (títulos y etiquetas).
+"""
+class Chart:
+    name: str
+    kind: str
+    data: Dict[Any, Any]
+    options: Dict[str, str]
+
+    def __init__(self, name: str, kind: str, data: Dict[Any, Any], **options: str) -> None:
+        if kind not in FIGURE_SIZES:
+            raise ValueError(f"El tipo de gráfico debe ser uno de {tuple(FIGURE_SIZES)}")
+
+        self.name = name
+        self.kind = kind
+        self.data = data
+        self.options = options
+
+    """
+    Se calcula un hash del contenido del gráfico: tipo, datos en orden, opciones y formatos. Si el hash no cambia el gráfico no se vuelve a dibujar.
+
+    Parámetros:
+    formats - Formatos de los archivos.
+
+    Retorna:
+    El hash en hexadecimal.
+    """
+    def contentHash(self, formats: Sequence[str]) -> str:
+        content = json.dumps([RENDER_VERSION, self.kind, [[str(key), value] for key, value in self.data.items()], self.options, list(formats)], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+"""
+Gráfico de barras de una distribución de frecuencia, como plotFreqDist.
+"""
+def freqDistChart(name: str, freqDist: Dict[Any, int], title: str, xLabel: str) -> Chart:
+    return Chart(name, "bar", freqDist, title=title, xLabel=xLabel, yLabel="Frecuencia")
+
+"""
+Se dibuja un gráfico en una Figure con el backend Agg, sin ventanas ni estado global de pyplot, y se guarda en cada formato. Se ejecuta en los procesos del pool.
+
+Parámetros:
+chart - Gráfico a dibujar.
+directory - Carpeta donde se guardan los archivos.
+formats - Formatos de los archivos, por ejemplo "png" o "svg".
+
+Retorna:
+Las rutas de los archivos guardados.
+"""
+def renderChart(chart: Chart, directory: str, formats: Sequence[str]) -> List[str]:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from analytics import drawBarGraph, drawTimeline
+
+    figure = Figure(figsize=FIGURE_SIZES[chart.kind])
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    if chart.kind == "bar":
+        drawBarGraph(axes, chart.data, chart.options["title"], chart.options["xLabel"], chart.options["yLabel"])
+    else:
+        drawTimeline(axes, chart.data, chart.options["title"])
+
+    paths = [os.path.join(directory, f"{chart.name}.{extension}") for extension in formats]
+
+    for path in paths:
+        figure.savefig(path)
+
+    return paths
+
+"""
+Se dibujan todos los gráficos de un reporte en archivos. Los gráficos cuyo contenido no cambió desde el último reporte en la misma carpeta se omiten, y los demás se dibujan en paralelo en varios procesos.
+
+Parámetros:
+charts - Gráficos del reporte, con nombres distintos.
+directory - Carpeta donde se guardan los archivos, se crea si no existe.
+formats - Formatos de los archivos.
+workers - Número de procesos, por defecto uno por núcleo. Con 1 los gráficos se dibujan en el proceso principal.
+
+Retorna:
+Un diccionario donde las claves son los nombres de los gráficos y los valores las rutas de sus archivos.
+"""
+def renderReport(charts: List[Chart], directory: str = "report", formats: Sequence[str] = ("png", "svg"), workers: Optional[int] = None) -> Dict[str, List[str]]:
+    os.makedirs(directory, exist_ok=True)
+    cachePath = os.path.join(directory, CACHE_FILE)
+
+    # Se lee el hash de los gráficos del reporte anterior.
+    try:
+        with open(cachePath, encoding="utf-8") as file:
+            cache: Dict[str, str] = json.load(file)
+    except (OSError, ValueError):
+        cache = dict()
+
+    hashes = { chart.name: chart.contentHash(formats) for chart in charts }
+    paths = { chart.name: [os.path.join(directory, f"{chart.name}.{extension}") for extension in formats] for chart in charts }
+
+    # Solo se dibujan los gráficos que cambiaron o a los que les falta algún archivo.
+    pending = [chart for chart in charts if cache.get(chart.name) != hashes[chart.name] or not all(os.path.exists(path) for path in paths[chart.name])]
+    workers = min(workers if workers is not None else os.cpu_count() or 1, len(pending))
+
+    if workers <= 1:
+        for chart in pending:
+            renderChart(chart, directory, formats)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(renderChart, pending, [directory] * len(pending), [formats] * len(pending)))
+
+    # Se guarda el hash de los gráficos dibujados, conservando el de los gráficos de otros reportes.
+    cache.update(hashes)
+
+    with open(cachePath, "w", encoding="utf-8") as file:
+        json.dump(cache, file, ensure_ascii=False, indent=2)
+
+    return paths
@@ -1,60 +1,387 @@
-import locale
-import re
-from typing import List, Tuple
-from bs4 import BeautifulSoup
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from article_store import ArticleStore
+from dates import formatDate, parseDate
+from extractors import extract
 from datetime import date, datetime, timezone, timedelta
+import http.client
 import pytz
+import queue
+import ssl
+import threading
+import time
 import urllib.request as request
 
 # Constantes globales
-locale.setlocale(locale.LC_ALL, "es")
 NEWS_URL = "https://www.bbc.com/mundo/topics/c2lej05epw5t"
-today = date.today().strftime('%d %B %Y')
+USER_AGENT = "Mozilla/5.0 (compatible; Fake-News-Generator)"
+
+# Estados de redirección que se siguen y número máximo de redirecciones por solicitud, como urllib.request.
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 10
+
+"""
+Retorna:
+La fecha actual con formato "%d %B %Y". Se calcula en cada llamada para que un proceso que se ejecuta varios días use la fecha correcta.
+"""
+def today() -> str:
+    return formatDate(date.today())
+
+"""
+Convierte la fecha de publicación que muestra BBC Mundo a la zona horaria local de Colombia. (Por defecto está en UTC)
+
+Parámetros:
+ts - Fecha tal como aparece en la página: solo la hora si el artículo es del día actual ("18:27" o "4:03"), solo la fecha si es de días anteriores ("3 mayo 2022") o la hora y la fecha ("18:27 3 mayo 2022").
+
+Retorna:
+La fecha con formato "%H:%M %d %B %Y" y el mes en español. Si la página solo muestra la fecha no hay hora que convertir y se usa 00:00 de ese día.
+"""
+def formatTimestamp(ts: str) -> str:
+    clock, _, day = ts.partition(" ")
+
+    if ":" not in clock:
+        return f"00:00 {formatDate(parseDate(ts))}"
+
+    hours, minutes = clock.split(":")
+    published = parseDate(day) if day else date.today()
+    dt = datetime(published.year, published.month, published.day, int(hours), int(minutes), tzinfo=timezone.utc)
+    dt = dt if dt < datetime.now(tz=timezone.utc) else dt - timedelta(days=1)
+    dt = dt.astimezone(pytz.timezone("America/Bogota"))
+
+    return f"{dt:%H:%M} {formatDate(dt.date())}"
+
+"""
+Se extraen los artículos de una página de BBC Mundo.
+
+Parámetros:
+html - Contenido de la página.
+extractor - Nombre del extractor de html a usar, ver extractors.EXTRACTORS.
+
+Retorna:
+Una lista de tuplas (fecha, titular) con los artículos de la página.
+"""
+def parsePage(html: bytes, extractor: str = "stream") -> List[Tuple[str, str]]:
+    return [(formatTimestamp(timestamp), headline) for timestamp, headline in extract(html, extractor)]
+
+"""
+Estadísticas de una ejecución de scrap.
+
+Parámetros:
+pages - Número de páginas descargadas.
+notModified - Número de páginas que no cambiaron desde la última descarga.
+articles - Número de artículos obtenidos.
+seconds - Duración de la ejecución.
+"""
+class ScrapStats:
+    pages: int
+    notModified: int
+    articles: int
+    seconds: float
+
+    def __init__(self) -> None:
+        self.pages = 0
+        self.notModified = 0
+        self.articles = 0
+        self.seconds = 0.0
+
+    def pagesPerSecond(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+    def articlesPerSecond(self) -> float:
+        return self.articles / self.seconds if self.seconds > 0 else 0.0
+
+"""
+Conjunto de conexiones HTTP persistentes (keep-alive) a un mismo servidor, de esta manera cada página no requiere abrir una nueva conexión.
+
+Parámetros:
+url - URL base del servidor.
+size - Número máximo de conexiones abiertas.
+timeout - Tiempo máximo de espera de cada solicitud, en segundos.
+"""
+class ConnectionPool:
+    scheme: str
+    host: str
+    timeout: float
+    __idle: "queue.LifoQueue[http.client.HTTPConnection]"
+    __slots: threading.BoundedSemaphore
+
+    def __init__(self, url: str, size: int, timeout: float = 30) -> None:
+        parsed = urlsplit(url)
+        self.scheme = parsed.scheme
+        self.host = parsed.netloc
+        self.timeout = timeout
+        self.__idle = queue.LifoQueue()
+        self.__slots = threading.BoundedSemaphore(size)
+
+    """
+    Realiza una solicitud GET reutilizando una conexión libre. Si la solicitud falla por un error de conexión o el servidor responde con 429 o 5xx, se reintenta con espera exponencial. Las redirecciones se siguen como lo hacía urllib.request.urlopen: en el mismo servidor con las conexiones del conjunto y en otro servidor con una conexión nueva.
+
+    Parámetros:
+    path - Ruta a solicitar.
+    headers - Encabezados adicionales, por ejemplo para solicitudes condicionales.
+    retries - Número máximo de reintentos.
+    backoff - Espera antes del primer reintento, en segundos. Se duplica en cada reintento.
+    redirects - Número máximo de redirecciones, si se superan se lanza HTTPError.
+
+    Retorna:
+    Una tupla (estado, cuerpo, encabezados) de la respuesta. El estado es 200, o 304 si la página no cambió desde la solicitud condicional.
+    """
+    def get(self, path: str, headers: Optional[Dict[str, str]] = None, retries: int = 4, backoff: float = 0.5, redirects: int = MAX_REDIRECTS) -> Tuple[int, bytes, http.client.HTTPMessage]:
+        url = f"{self.scheme}://{self.host}{path}"
+
+        for _ in range(redirects + 1):
+            status, body, responseHeaders = self.__get(url, headers, retries, backoff)
+
+            if status not in REDIRECT_STATUSES:
+                return status, body, responseHeaders
+
+            location = responseHeaders.get("Location")
+
+            if location is None:
+                raise request.HTTPError(url, status, "Redirección sin Location", responseHeaders, None)
+
+            # La nueva ubicación puede ser relativa a la URL actual.
+            url = urljoin(url, location)
+
+        raise request.HTTPError(url, status, f"Más de {redirects} redirecciones", responseHeaders, None)
+
+    """
+    Realiza una solicitud GET sin seguir redirecciones, con los reintentos de get.
+
+    Retorna:
+    Una tupla (estado, cuerpo, encabezados) de la respuesta, con estado 200, 304 o de redirección.
+    """
+    def __get(self, url: str, headers: Optional[Dict[str, str]], retries: int, backoff: float) -> Tuple[int, bytes, http.client.HTTPMessage]:
+        parsed = urlsplit(url)
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        pooled = parsed.scheme == self.scheme and parsed.netloc == self.host
+
+        for attempt in range(retries + 1):
+            with self.__slots:
+                connection = self.__acquire() if pooled else self.__connect(parsed.scheme, parsed.netloc)
+
+                try:
+                    connection.request("GET", path, headers={ "Connection": "keep-alive", "User-Agent": USER_AGENT, **(headers or {}) })
+                    response = connection.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, OSError):
+                    # La conexión quedó en un estado desconocido, se descarta.
+                    connection.close()
+
+                    if attempt == retries:
+                        raise
+                else:
+                    # Se devuelve la conexión al conjunto salvo que el servidor la vaya a cerrar o sea de otro servidor.
+                    if response.will_close or not pooled:
+                        connection.close()
+                    else:
+                        self.__idle.put(connection)
+
+                    if response.status in (200, 304) or response.status in REDIRECT_STATUSES:
+                        return response.status, body, response.headers
+
+                    if (response.status != 429 and response.status < 500) or attempt == retries:
+                        raise request.HTTPError(url, response.status, response.reason, response.headers, None)
+
+            time.sleep(backoff * 2 ** attempt)
+
+    """
+    Cierra todas las conexiones libres.
+    """
+    def close(self) -> None:
+        while not self.__idle.empty():
+            self.__idle.get().close()
+
+    def __acquire(self) -> http.client.HTTPConnection:
+        try:
+            return self.__idle.get_nowait()
+        except queue.Empty:
+            return self.__connect(self.scheme, self.host)
+
+    def __connect(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, timeout=self.timeout, context=ssl.create_default_context())
+
+        if scheme != "http":
+            raise ValueError(f"No se puede seguir una redirección a {scheme}://{host}")
+
+        return http.client.HTTPConnection(host, timeout=self.timeout)
 
 """
-Se obtienen n artículos de BBC Mundo mediante web-scrapping.
+Se descargan páginas consecutivas de una sección de manera concurrente y se entregan en orden. Como máximo hay tantas páginas descargándose o esperando a ser analizadas como hilos, y las páginas pendientes se cancelan cuando se deja de iterar.
+
+Parámetros:
+pool - Conexiones a usar.
+basePath - Ruta de la sección.
+first - Primera página a descargar.
+workers - Número máximo de páginas que se descargan al mismo tiempo.
+store - Si se especifica, se envían los validadores guardados de cada página para que el servidor responda 304 si no cambió.
+window - Número de páginas en curso al inicio. Se duplica con cada página entregada hasta llegar a workers, así un rastreo que se detiene en la primera página no descarga páginas de más.
+
+Retorna:
+Un generador de tuplas (página, estado, cuerpo, encabezados).
+"""
+def fetchPages(pool: ConnectionPool, basePath: str, first: int, workers: int, store: Optional[ArticleStore] = None, window: Optional[int] = None) -> Iterator[Tuple[int, int, bytes, http.client.HTTPMessage]]:
+    # Páginas solicitadas que aún no se han entregado.
+    pending: Dict[int, Future] = dict()
+    window = workers if window is None else window
+    page = first
+    nextPage = first
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                # Se mantienen tantas páginas en curso como permita la ventana.
+                while len(pending) < window:
+                    pagePath = f"{basePath}/page/{nextPage}"
+                    headers: Dict[str, str] = dict()
+
+                    if store is not None:
+                        etag, lastModified = store.validators(pagePath)
+
+                        if etag is not None:
+                            headers["If-None-Match"] = etag
+                        if lastModified is not None:
+                            headers["If-Modified-Since"] = lastModified
+
+                    pending[nextPage] = executor.submit(pool.get, pagePath, headers)
+                    nextPage += 1
+
+                # Se espera a la siguiente página en orden, las demás se siguen descargando mientras se analiza.
+                status, body, headers = pending.pop(page).result()
+                yield page, status, body, headers
+                page += 1
+                window = min(workers, window * 2)
+        finally:
+            # Se cancelan las páginas que aún no se han empezado a descargar.
+            for future in pending.values():
+                future.cancel()
+
+"""
+Se obtienen n artículos de BBC Mundo mediante web-scrapping. Las páginas se descargan de manera concurrente sobre conexiones persistentes, mientras que el análisis de cada página se hace en orden en el hilo principal, y no se solicitan más páginas una vez se obtienen n artículos.
+
+Si se especifica un almacén de artículos el rastreo es incremental: primero se leen las páginas iniciales hasta encontrar artículos ya guardados (o hasta que el servidor responda que la página no cambió), y si faltan artículos se continúa el rastreo desde la última página visitada en ejecuciones anteriores.
 
 Parámetros:
 n - Número de artículos a obtener
+url - URL de la sección de BBC Mundo de la cual obtener los artículos.
+workers - Número de páginas que se descargan al mismo tiempo.
+path - Archivo donde se guardan las noticias.
+extractor - Nombre del extractor de html a usar, ver extractors.EXTRACTORS.
+store - Almacén local de artículos, opcional.
+stats - Si se especifica, se llena con las estadísticas de la ejecución.
 
 Retorna:
 Una lista de tuplas donde cada tupla representa un artículo, siendo el primer elemento de la tupla la fecha de publicación y el segundo el titular.
 """
-def scrap(n: int) -> List[Tuple[str, str]]:
-    news = []
-
-    # Iniciamos en la página de la sección de internacional.
-    page = 1
-
-    # Abrimos un archivo donde se guardarán las noticias.
-    with open("news.csv", "w", encoding="utf-8") as file:
-        # Repetimos hasta obtener n artículos
-        while len(news) < n:
-            # Se realiza una solicitud HTTP a la página de la sección internacional de BBC mundo
-            with request.urlopen(f"{NEWS_URL}/page/{page}") as response:
-                # Iniciamos la instancia de bs4 para analizar el html obtenido.
-                soup = BeautifulSoup(response.read(), "html.parser")
-
-                # Obtenemos todos los titulares y las fechas de publicación.
-                timestamps = soup.find_all(attrs={ "class": "qa-post-auto-meta" })
-                headlines = soup.find_all(id=re.compile("title_"))
-
-                # Iteramos a través de los titulares y las fechas.
-                for timestamp, headline in zip(timestamps, headlines):
-                    # Formateamos la hora correctamente y la convertimos a la zona horaria local de Colombia. (Por defecto está en UTC)
-                    ts = timestamp.contents[0]
-                    ts = f"{ts} {today}" if len(ts) == 5 else f"0{ts} {today}" if len(ts) == 4 else ts
-                    dt = datetime.strptime(ts, "%H:%M %d %B %Y").replace(tzinfo=timezone.utc)
-                    dt = dt if dt < datetime.now(tz=timezone.utc) else dt - timedelta(days=1)
-                    dt = dt.astimezone(pytz.timezone("America/Bogota"))
-                    ts = dt.strftime("%H:%M %d %B %Y")
-                    hl = headline.contents[0]
-
-                    # Anñadimos la noticia a nuestra lista de noticias y la escribimos al archivo.
-                    news.append((ts, hl))
-                    file.write(f"{ts}\t{hl}\n")
-
-            # Pasamos a la siguiente página de noticias.
-            page += 1
-
-    return news
\ No newline at end of file
+def scrap(n: int, url: str = NEWS_URL, workers: int = 4, path: str = "news.csv", extractor: str = "stream", store: Optional[ArticleStore] = None, stats: Optional[ScrapStats] = None) -> List[Tuple[str, str]]:
+    stats = stats if stats is not None else ScrapStats()
+    started = time.perf_counter()
+
+    pool = ConnectionPool(url, workers)
+    basePath = urlsplit(url).path
+
+    if store is None:
+        news = crawl(n, pool, basePath, workers, extractor, stats)
+    else:
+        news = crawlIncremental(n, pool, basePath, workers, extractor, store, stats)
+
+    pool.close()
+
+    # Escribimos las noticias al archivo.
+    with open(path, "w", encoding="utf-8") as file:
+        for ts, hl in news:
+            file.write(f"{ts}\t{hl}\n")
+
+    stats.articles = len(news)
+    stats.seconds = time.perf_counter() - started
+
+    return news
+
+"""
+Rastreo completo desde la primera página hasta obtener n artículos.
+"""
+def crawl(n: int, pool: ConnectionPool, basePath: str, workers: int, extractor: str, stats: ScrapStats) -> List[Tuple[str, str]]:
+    return list(crawlStream(n, pool, basePath, workers, extractor, stats))
+
+"""
+Igual que crawl, pero los artículos se entregan página por página a medida que se descargan, sin guardarlos. Si se deja de consumir el generador no se solicitan más páginas.
+
+Parámetros:
+n - Número de artículos a obtener, None para recorrer la sección hasta la última página.
+"""
+def crawlStream(n: Optional[int], pool: ConnectionPool, basePath: str, workers: int, extractor: str, stats: ScrapStats) -> Iterator[Tuple[str, str]]:
+    count = 0
+
+    # Iniciamos en la primera página de la sección y repetimos hasta obtener n artículos.
+    for _, _, body, _ in fetchPages(pool, basePath, 1, workers):
+        articles = parsePage(body, extractor)
+        stats.pages += 1
+
+        # Si la página no tiene artículos no hay más noticias por obtener.
+        if not articles:
+            break
+
+        yield from articles
+        count += len(articles)
+
+        if n is not None and count >= n:
+            break
+
+"""
+Rastreo incremental sobre un almacén de artículos.
+"""
+def crawlIncremental(n: int, pool: ConnectionPool, basePath: str, workers: int, extractor: str, store: ArticleStore, stats: ScrapStats) -> List[Tuple[str, str]]:
+    # Primero se obtienen los artículos publicados desde el último rastreo. Se guardan todos juntos al final, junto con los validadores de las páginas, para que si el rastreo se interrumpe no queden huecos.
+    fresh: List[Tuple[str, str]] = []
+    validators: List[Tuple[str, Optional[str], Optional[str]]] = []
+    lastPage = 0
+
+    for page, status, body, headers in fetchPages(pool, basePath, 1, workers, store, window=1):
+        stats.pages += 1
+
+        if status == 304:
+            stats.notModified += 1
+            break
+
+        articles = parsePage(body, extractor)
+        unseen = store.unseen(articles)
+        fresh.extend(unseen)
+        validators.append((f"{basePath}/page/{page}", headers.get("ETag"), headers.get("Last-Modified")))
+        lastPage = page
+
+        # Se detiene al llegar a artículos ya guardados, al final de la sección o al tener suficientes artículos.
+        if len(unseen) < len(articles) or not articles or store.count() + len(fresh) >= n:
+            break
+
+    store.add(fresh, front=True)
+
+    for pagePath, etag, lastModified in validators:
+        store.setValidators(pagePath, etag, lastModified)
+
+    # Si faltan artículos se continúa el rastreo de artículos antiguos desde donde quedó.
+    resume = max(int(store.getState("nextPage") or 1), lastPage + 1)
+    store.setState("nextPage", str(resume))
+
+    if store.count() < n:
+        for page, status, body, headers in fetchPages(pool, basePath, resume, workers, store, window=1):
+            stats.pages += 1
+
+            if status == 304:
+                stats.notModified += 1
+            else:
+                articles = parsePage(body, extractor)
+
+                if not articles:
+                    break
+
+                store.add(store.unseen(articles))
+                store.setValidators(f"{basePath}/page/{page}", headers.get("ETag"), headers.get("Last-Modified"))
+
+            store.setState("nextPage", str(page + 1))
+
+            if store.count() >= n:
+                break
+
+    return store.latest(n)
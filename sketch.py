@@ -0,0 +1,237 @@
+from array import array
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import heapq
+import math
+import struct
+import numpy as np
+
+# Formato de los dos hashes de 64 bits en que se divide el hash de cada clave.
+HASH_PAIR = struct.Struct("<QQ")
+
+"""
+Count-Min Sketch: cuenta la frecuencia aproximada de un número ilimitado de claves con memoria fija. La frecuencia estimada nunca es menor que la real y, con probabilidad 1 - delta, la supera en a lo sumo epsilon veces el total de elementos contados.
+
+La tabla tiene ceil(e / epsilon) columnas y ceil(ln(1 / delta)) filas. Las posiciones de cada clave se obtienen con un hash blake2b de la clave (estable entre procesos, a diferencia de hash()), por lo que dos sketches con los mismos parámetros se pueden unir sumando sus tablas.
+
+Parámetros:
+epsilon - Error máximo relativo al total de elementos contados.
+delta - Probabilidad de que una estimación supere ese error.
+seed - Semilla del hash, solo se pueden unir sketches con la misma semilla.
+"""
+class CountMinSketch:
+    epsilon: float
+    delta: float
+    seed: int
+    width: int
+    depth: int
+    total: int
+    __table: array
+    __offsets: range
+    __key: bytes
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, seed: int = 0) -> None:
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon y delta deben estar entre 0 y 1")
+
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.total = 0
+        # Las filas se guardan una tras otra en un arreglo plano de enteros de 64 bits.
+        self.__table = array("q", bytes(8 * self.width * self.depth))
+        self.__offsets = range(0, self.width * self.depth, self.width)
+        self.__key = seed.to_bytes(8, "little")
+
+    """
+    Se calculan las posiciones de una clave en la tabla, una por fila. Se usa un solo hash de 128 bits dividido en dos hashes de 64 bits (h1 + i * h2), que mantiene las garantías del sketch.
+
+    Parámetros:
+    key - Clave.
+
+    Retorna:
+    Las posiciones de la clave en el arreglo plano.
+    """
+    def positions(self, key: str) -> List[int]:
+        h1, h2 = HASH_PAIR.unpack(hashlib.blake2b(key.encode("utf-8"), digest_size=16, key=self.__key).digest())
+        width = self.width
+
+        return [offset + (h1 + row * h2) % width for row, offset in enumerate(self.__offsets)]
+
+    """
+    Se suma una frecuencia a una clave.
+
+    Parámetros:
+    key - Clave.
+    count - Frecuencia a sumar.
+
+    Retorna:
+    La frecuencia estimada de la clave después de sumarla.
+    """
+    def add(self, key: str, count: int = 1) -> int:
+        table = self.__table
+        positions = self.positions(key)
+        self.total += count
+
+        for position in positions:
+            table[position] += count
+
+        return min([table[position] for position in positions])
+
+    """
+    Retorna:
+    La frecuencia estimada de una clave, el mínimo de sus contadores.
+    """
+    def estimate(self, key: str) -> int:
+        table = self.__table
+        return min([table[position] for position in self.positions(key)])
+
+    """
+    Retorna:
+    El error máximo de las estimaciones (con probabilidad 1 - delta) para lo que se ha contado hasta ahora.
+    """
+    def errorBound(self) -> float:
+        return self.epsilon * self.total
+
+    """
+    Se suman los contadores de otro sketch, el resultado es el mismo que si se hubieran contado ambos flujos en este.
+
+    Parámetros:
+    other - Sketch con los mismos parámetros y semilla.
+    """
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Solo se pueden unir sketches con las mismas dimensiones y semilla")
+
+        # Se suman las tablas completas con numpy, sin copiarlas.
+        table = np.frombuffer(self.__table, dtype=np.int64)
+        table += np.frombuffer(other.table(), dtype=np.int64)
+        self.total += other.total
+
+    def table(self) -> array:
+        return self.__table
+
+    def nbytes(self) -> int:
+        return self.__table.itemsize * len(self.__table)
+
+"""
+Encuentra las claves más frecuentes de un flujo con memoria acotada. Cuenta todas las claves en un Count-Min Sketch y guarda solo las capacity claves con mayor frecuencia estimada (como Space-Saving, una clave nueva reemplaza a la menos frecuente cuando su estimación la supera). La clave menos frecuente se encuentra con un heap en el que las frecuencias se actualizan de forma perezosa: como solo crecen, una entrada desactualizada se vuelve a insertar con su valor actual cuando llega al inicio del heap.
+
+Cualquier clave con frecuencia real mayor que epsilon veces el total queda entre las candidatas siempre que haya menos de capacity claves así, y su frecuencia estimada tiene el error del sketch.
+
+Parámetros:
+capacity - Número de claves candidatas que se guardan.
+epsilon - Error máximo del sketch relativo al total de elementos contados.
+delta - Probabilidad de que una estimación supere ese error.
+seed - Semilla del hash del sketch.
+"""
+class HeavyHitters:
+    capacity: int
+    sketch: CountMinSketch
+    __candidates: Dict[str, int]
+    __heap: List[Tuple[int, str]]
+
+    def __init__(self, capacity: int = 1000, epsilon: float = 0.001, delta: float = 0.01, seed: int = 0) -> None:
+        if capacity < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+
+        self.capacity = capacity
+        self.sketch = CountMinSketch(epsilon, delta, seed)
+        self.__candidates = dict()
+        self.__heap = []
+
+    def __len__(self) -> int:
+        return len(self.__candidates)
+
+    """
+    Se cuenta una aparición de una clave.
+
+    Parámetros:
+    key - Clave.
+    count - Frecuencia a sumar.
+    """
+    def add(self, key: str, count: int = 1) -> None:
+        estimate = self.sketch.add(key, count)
+        candidates = self.__candidates
+
+        # Si la clave ya es candidata solo se actualiza su frecuencia, el heap se corrige después.
+        if key in candidates:
+            candidates[key] = estimate
+        elif len(candidates) < self.capacity:
+            candidates[key] = estimate
+            heapq.heappush(self.__heap, (estimate, key))
+        elif estimate > self.__minimum():
+            # La clave reemplaza a la candidata menos frecuente.
+            _, evicted = heapq.heapreplace(self.__heap, (estimate, key))
+            del candidates[evicted]
+            candidates[key] = estimate
+
+    """
+    Se cuentan varias claves.
+
+    Parámetros:
+    keys - Claves, cada una suma una aparición.
+    """
+    def addAll(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    """
+    Se corrigen las entradas desactualizadas del inicio del heap hasta que la primera tenga la frecuencia actual de su clave.
+
+    Retorna:
+    La frecuencia de la candidata menos frecuente.
+    """
+    def __minimum(self) -> int:
+        heap = self.__heap
+        candidates = self.__candidates
+
+        while heap[0][0] != candidates[heap[0][1]]:
+            heapq.heapreplace(heap, (candidates[heap[0][1]], heap[0][1]))
+
+        return heap[0][0]
+
+    """
+    Retorna:
+    Un diccionario con las claves candidatas y su frecuencia estimada.
+    """
+    def frequencyDistribution(self) -> Dict[str, int]:
+        return dict(self.__candidates)
+
+    """
+    Parámetros:
+    n - Número de claves a obtener.
+
+    Retorna:
+    Las n claves con mayor frecuencia estimada, de la más a la menos frecuente.
+    """
+    def top(self, n: int) -> Dict[str, int]:
+        return dict(heapq.nlargest(n, self.__candidates.items(), key=lambda item: item[1]))
+
+    def errorBound(self) -> float:
+        return self.sketch.errorBound()
+
+    def nbytes(self) -> int:
+        return self.sketch.nbytes()
+
+    """
+    Se unen las claves más frecuentes de otro flujo, por ejemplo de otra parte del corpus. Se suman los sketches, se vuelve a estimar la frecuencia de las candidatas de ambos con el sketch unido y se conservan las capacity más frecuentes. En caso de empate se prefieren las candidatas de esta estructura y luego las de other, en su orden, por lo que el resultado no cambia entre ejecuciones.
+
+    Parámetros:
+    other - Estructura con la misma configuración.
+
+    Si las capacidades o los parámetros de los sketches son distintos se lanza ValueError.
+    """
+    def merge(self, other: "HeavyHitters") -> None:
+        if other.capacity != self.capacity:
+            raise ValueError("Solo se pueden unir estructuras con la misma capacidad")
+
+        self.sketch.merge(other.sketch)
+        keys = list(self.__candidates) + [key for key in other.frequencyDistribution() if key not in self.__candidates]
+        estimates = ((key, self.sketch.estimate(key)) for key in keys)
+
+        self.__candidates = dict(heapq.nlargest(self.capacity, estimates, key=lambda item: item[1]))
+        self.__heap = [(estimate, key) for key, estimate in self.__candidates.items()]
+        heapq.heapify(self.__heap)
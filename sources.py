@@ -0,0 +1,268 @@
+from abc import ABC, abstractmethod
+from itertools import chain, islice
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+import csv
+import json
+import mmap
+import os
+import time
+from scrap_news import NEWS_URL, ConnectionPool, ScrapStats, crawlStream
+
+# Número de artículos de cada bloque que entregan las fuentes.
+CHUNK_SIZE = 10000
+
+# Número máximo de artículos que openSource obtiene por defecto de una URL.
+SCRAPE_LIMIT = 1000
+
+"""
+Fuente de artículos que se leen de forma perezosa: los artículos se entregan uno a uno (o por bloques con chunks) a medida que se leen, sin cargar el corpus completo en memoria. Cada vez que se recorre una fuente se vuelve a leer desde el inicio, por lo que una misma fuente se puede recorrer varias veces (por ejemplo para entrenar y luego para calcular estadísticas).
+
+Las subclases implementan __iter__, que entrega tuplas (fecha, titular) como las que retorna scrap.
+"""
+class Source(ABC):
+    @abstractmethod
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        pass
+
+    """
+    Se recorre la fuente por bloques.
+
+    Parámetros:
+    size - Número de artículos de cada bloque, el último puede tener menos.
+
+    Retorna:
+    Un iterador de listas de artículos.
+    """
+    def chunks(self, size: int = CHUNK_SIZE) -> Iterator[List[Tuple[str, str]]]:
+        return iterChunks(iter(self), size)
+
+    """
+    Retorna:
+    Un iterador de los titulares de la fuente, sin sus fechas.
+    """
+    def headlines(self) -> Iterator[str]:
+        return (headline for _, headline in self)
+
+"""
+Se divide un iterador en bloques sin recorrerlo por adelantado.
+
+Parámetros:
+items - Iterador a dividir.
+size - Número de elementos de cada bloque.
+
+Retorna:
+Un iterador de listas, ninguna vacía.
+"""
+def iterChunks(items: Iterator, size: int = CHUNK_SIZE) -> Iterator[List]:
+    while True:
+        chunk = list(islice(items, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+"""
+Se leen las líneas de un archivo mapeado en memoria: el sistema operativo carga las páginas del archivo a medida que se leen y las puede descartar después, por lo que la memoria del proceso no crece con el tamaño del archivo.
+
+Parámetros:
+path - Ruta del archivo.
+
+Retorna:
+Un iterador de las líneas del archivo en bytes, con su salto de línea.
+"""
+def mappedLines(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        # No se puede mapear un archivo vacío.
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # El archivo se lee de principio a fin, se le indica al sistema para que lea por adelantado (no existe en Windows).
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            yield from iter(mapped.readline, b"")
+
+"""
+Archivo de texto con un artículo por línea y columnas separadas por tabuladores, como el news.csv que escribe scrap. Los titulares no se escapan, por lo que pueden contener comillas y comas pero no tabuladores ni saltos de línea. Se lee mapeado en memoria.
+
+Parámetros:
+path - Ruta del archivo.
+timestampColumn - Posición de la columna de la fecha.
+headlineColumn - Posición de la columna del titular.
+header - Si es verdadero la primera línea son los nombres de las columnas y se omite.
+"""
+class TsvSource(Source):
+    path: str
+    timestampColumn: int
+    headlineColumn: int
+    header: bool
+
+    def __init__(self, path: str, timestampColumn: int = 0, headlineColumn: int = 1, header: bool = False) -> None:
+        self.path = path
+        self.timestampColumn = timestampColumn
+        self.headlineColumn = headlineColumn
+        self.header = header
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        lines = mappedLines(self.path)
+
+        if self.header:
+            next(lines, None)
+
+        for line in lines:
+            columns = line.decode("utf-8").rstrip("\r\n").split("\t")
+
+            # Se omiten las líneas vacías.
+            if len(columns) > 1:
+                yield columns[self.timestampColumn], columns[self.headlineColumn]
+
+"""
+Archivo CSV con comillas según el estándar (RFC 4180), por lo que los titulares pueden contener el separador, comillas escapadas y saltos de línea. Se lee mapeado en memoria.
+
+Parámetros:
+path - Ruta del archivo.
+timestampColumn - Posición o nombre de la columna de la fecha.
+headlineColumn - Posición o nombre de la columna del titular. Los nombres requieren encabezado.
+header - Si es verdadero la primera fila son los nombres de las columnas.
+delimiter - Separador de las columnas.
+"""
+class CsvSource(Source):
+    path: str
+    timestampColumn: Union[int, str]
+    headlineColumn: Union[int, str]
+    header: bool
+    delimiter: str
+
+    def __init__(self, path: str, timestampColumn: Union[int, str] = 0, headlineColumn: Union[int, str] = 1, header: bool = True, delimiter: str = ",") -> None:
+        if not header and (isinstance(timestampColumn, str) or isinstance(headlineColumn, str)):
+            raise ValueError("Las columnas solo se pueden indicar por nombre si el archivo tiene encabezado")
+
+        self.path = path
+        self.timestampColumn = timestampColumn
+        self.headlineColumn = headlineColumn
+        self.header = header
+        self.delimiter = delimiter
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        # El lector de csv une las líneas de un campo entre comillas con saltos de línea.
+        rows = csv.reader((line.decode("utf-8") for line in mappedLines(self.path)), delimiter=self.delimiter)
+        timestamp, headline = self.timestampColumn, self.headlineColumn
+
+        if self.header:
+            names = next(rows, [])
+            timestamp = names.index(timestamp) if isinstance(timestamp, str) else timestamp
+            headline = names.index(headline) if isinstance(headline, str) else headline
+
+        for row in rows:
+            if row:
+                yield row[timestamp], row[headline]
+
+"""
+Archivo JSON Lines con un artículo por línea, por ejemplo {"timestamp": "14:30 03 mayo 2022", "headline": "..."}. Se lee mapeado en memoria.
+
+Parámetros:
+path - Ruta del archivo.
+timestampKey - Clave de la fecha.
+headlineKey - Clave del titular.
+"""
+class JsonLinesSource(Source):
+    path: str
+    timestampKey: str
+    headlineKey: str
+
+    def __init__(self, path: str, timestampKey: str = "timestamp", headlineKey: str = "headline") -> None:
+        self.path = path
+        self.timestampKey = timestampKey
+        self.headlineKey = headlineKey
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for line in mappedLines(self.path):
+            # json.loads acepta bytes en UTF-8, se omiten las líneas vacías.
+            if line.strip():
+                article = json.loads(line)
+                yield article[self.timestampKey], article[self.headlineKey]
+
+"""
+Sección de un sitio con la estructura de BBC Mundo que se rastrea mientras se recorre la fuente: cada página se analiza y sus artículos se entregan antes de descargar más páginas de las que caben en la ventana de descargas, y si se deja de recorrer la fuente no se descargan más páginas.
+
+Parámetros:
+url - URL de la sección.
+n - Número de artículos a obtener, None para recorrer la sección completa.
+workers - Número de páginas que se descargan al mismo tiempo.
+extractor - Nombre del extractor de html a usar, ver extractors.EXTRACTORS.
+stats - Estadísticas del último recorrido.
+"""
+class ScraperSource(Source):
+    url: str
+    n: Optional[int]
+    workers: int
+    extractor: str
+    stats: ScrapStats
+
+    def __init__(self, url: str = NEWS_URL, n: Optional[int] = None, workers: int = 4, extractor: str = "stream") -> None:
+        self.url = url
+        self.n = n
+        self.workers = workers
+        self.extractor = extractor
+        self.stats = ScrapStats()
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        self.stats = ScrapStats()
+        started = time.perf_counter()
+        pool = ConnectionPool(self.url, self.workers)
+
+        try:
+            for article in crawlStream(self.n, pool, urlsplit(self.url).path, self.workers, self.extractor, self.stats):
+                self.stats.articles += 1
+                yield article
+        finally:
+            pool.close()
+            self.stats.seconds = time.perf_counter() - started
+
+"""
+Varias fuentes recorridas una tras otra, por ejemplo varios archivos o varias secciones.
+
+Parámetros:
+sources - Fuentes, en el orden en el que se recorren.
+"""
+class MultiSource(Source):
+    sources: List[Source]
+
+    def __init__(self, sources: Sequence[Source]) -> None:
+        self.sources = list(sources)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return chain.from_iterable(self.sources)
+
+"""
+Se crea la fuente que corresponde a una URL o a la extensión de un archivo: las URL http(s) se rastrean con ScraperSource hasta obtener limit artículos, los archivos .jsonl y .ndjson se leen con JsonLinesSource y los .tsv con TsvSource. Los archivos .csv se leen con TsvSource si su primera línea tiene tabuladores (como el news.csv que escribe scrap) y con CsvSource si no.
+
+Parámetros:
+spec - URL o ruta del archivo.
+limit - Número máximo de artículos de una URL, None para rastrear la sección completa.
+
+Retorna:
+La fuente.
+
+Si la extensión no es ninguna de las anteriores se lanza ValueError.
+"""
+def openSource(spec: str, limit: Optional[int] = SCRAPE_LIMIT) -> Source:
+    if urlsplit(spec).scheme in ("http", "https"):
+        return ScraperSource(spec, limit)
+
+    extension = os.path.splitext(spec)[1].lower()
+
+    if extension in (".jsonl", ".ndjson"):
+        return JsonLinesSource(spec)
+
+    if extension == ".tsv":
+        return TsvSource(spec)
+
+    if extension == ".csv":
+        with open(spec, "rb") as file:
+            return TsvSource(spec) if b"\t" in file.readline() else CsvSource(spec)
+
+    raise ValueError(f"No se reconoce el formato de {spec}, se esperaba una URL o un archivo .csv, .tsv, .jsonl o .ndjson")
@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from aggregator import NewsAggregator
+from analytics import articlesForDate, getTopN, mostCommonWordForDate, ngramFrequencyDistribution, tokenizeAll, wordFrequencyDistribution
+from benchmark import syntheticCorpus, syntheticHeadlines
+from sketch import CountMinSketch, HeavyHitters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(scope="module")
+def news():
+    months = ["enero", "febrero", "marzo"]
+    return [(f"12:{i % 60:02d} {i % 28 + 1:02d} {months[i % 3]} 2022", headline) for i, headline in enumerate(syntheticHeadlines(2000, seed=3))]
+
+"""
+Retorna:
+Todas las estadísticas de un agregador, para compararlas.
+"""
+def summary(stats: NewsAggregator):
+    return (stats.wordFrequencyDistribution(), stats.articlesForDate(), stats.wordsForDate(), stats.mostCommonWordForDate(), [stats.ngramFrequencyDistribution(n) for n in range(1, stats.maxOrder + 1)])
+
+def test_matches_analytics_functions(news):
+    tokenized, cleaned = tokenizeAll([headline for _, headline in news])
+    stats = NewsAggregator(maxOrder=3).addAll(iter(news))
+
+    assert stats.topWords(10) == getTopN(wordFrequencyDistribution([word for sentence in cleaned for word in sentence]), 10)
+    assert stats.mostCommonWordForDate() == mostCommonWordForDate([(timestamp, words) for (timestamp, _), words in zip(news, cleaned)])
+    assert stats.articlesForDate() == articlesForDate(news)
+    assert stats.topNgrams(2, 10) == getTopN(ngramFrequencyDistribution(tokenized, 2), 10)
+    assert stats.topNgrams(3, 10) == getTopN(ngramFrequencyDistribution(tokenized, 3), 10)
+
+def test_merge_equals_single_pass(news):
+    expected = NewsAggregator(maxOrder=3).addAll(news)
+    merged = NewsAggregator(maxOrder=3).addAll(news[:700])
+
+    for start in (700, 1500):
+        merged.merge(NewsAggregator(maxOrder=3).addAll(news[start:start + 800]))
+
+    assert len(merged) == len(expected)
+    assert summary(merged) == summary(expected)
+
+def test_merge_rejects_mixed_modes():
+    with pytest.raises(ValueError):
+        NewsAggregator(maxOrder=3).merge(NewsAggregator(maxOrder=3, capacity=100))
+
+def test_sketch_merge_equals_single_pass():
+    keys = [" ".join(sentence[:3]) for sentence in syntheticCorpus(3000, vocabulary=200)]
+    expected = CountMinSketch(0.01, 0.01)
+    merged = CountMinSketch(0.01, 0.01)
+    other = CountMinSketch(0.01, 0.01)
+
+    for i, key in enumerate(keys):
+        expected.add(key)
+        (merged if i % 2 else other).add(key)
+
+    merged.merge(other)
+
+    assert list(merged.table()) == list(expected.table())
+
+    with pytest.raises(ValueError):
+        merged.merge(CountMinSketch(0.001, 0.01))
+
+def test_heavy_hitters_finds_frequent_keys():
+    keys = [" ".join(sentence[:2]) for sentence in syntheticCorpus(5000, vocabulary=300)]
+    counter = HeavyHitters(50, epsilon=0.001)
+    counter.addAll(keys)
+    exact = getTopN(wordFrequencyDistribution(keys), 10)
+    top = counter.top(10)
+
+    assert top.keys() == exact.keys()
+    assert all(exact[key] <= count <= exact[key] + counter.errorBound() for key, count in top.items())
+
+def test_heavy_hitters_merge_rejects_different_capacity():
+    with pytest.raises(ValueError):
+        HeavyHitters(10).merge(HeavyHitters(20))
+
+def test_heavy_hitters_merge_is_deterministic():
+    # El orden de un set de cadenas depende de la semilla de hash del proceso, por lo que se une en procesos con semillas distintas.
+    code = "\n".join([
+        "import json, sys",
+        f"sys.path.insert(0, {ROOT!r})",
+        "from sketch import HeavyHitters",
+        "a, b = HeavyHitters(5), HeavyHitters(5)",
+        "a.addAll([f'x{i}' for i in range(20)])",
+        "b.addAll([f'y{i}' for i in range(20)])",
+        "a.merge(b)",
+        "print(json.dumps(list(a.top(5).items())))"
+    ])
+    results = { subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env={ **os.environ, "PYTHONHASHSEED": str(seed) }).stdout for seed in range(4) }
+
+    assert len(results) == 1
+    assert [key for key, _ in json.loads(results.pop())] == ["x0", "x1", "x2", "x3", "x4"]
@@ -0,0 +1,91 @@
+import random
+from collections import Counter
+from typing import Dict, List, Tuple
+import numpy as np
+import pytest
+from analytics import articlesForDate, mostCommonWordForDate, tokenizeAll
+from benchmark import syntheticHeadlines
+from columnar import ArticleColumns, ColumnBuilder, parseDay, parseTimestamp
+from dates import MONTH_NAMES
+
+"""
+Se genera un corpus de titulares sintéticos con fechas aleatorias de varios años, desordenadas como en el rastreo.
+"""
+def datedNews(size: int, seed: int = 0) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+
+    return [(f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} {rng.randint(1, 28):02d} {MONTH_NAMES[rng.randint(1, 12)]} {rng.randint(2020, 2022)}", headline) for headline in syntheticHeadlines(size, seed=seed)]
+
+"""
+Se cuentan las palabras limpias de cada día con las funciones de analytics, con los días en formato ISO como las columnas.
+"""
+def wordsPerDay(news: List[Tuple[str, str]]) -> Dict[str, Counter]:
+    cleaned = tokenizeAll([headline for _, headline in news])[1]
+    counts: Dict[str, Counter] = dict()
+
+    for (timestamp, _), words in zip(news, cleaned):
+        counts.setdefault(str(parseDay(timestamp.partition(" ")[2])), Counter()).update(words)
+
+    return counts
+
+@pytest.fixture(scope="module")
+def news():
+    return datedNews(3000)
+
+@pytest.fixture(scope="module")
+def columns(news):
+    return ArticleColumns.fromArticles(news)
+
+def test_parse_timestamp():
+    assert parseTimestamp("14:30 03 mayo 2022") == np.datetime64("2022-05-03T14:30")
+    assert parseTimestamp("00:00 3 setiembre 2021") == np.datetime64("2021-09-03T00:00")
+
+def test_articles_per_day_match_analytics(news, columns):
+    expected = { str(parseDay(day)): count for day, count in articlesForDate(news).items() }
+    result = columns.articlesPerPeriod("D")
+
+    assert result == expected
+    assert list(result) == sorted(result)
+
+@pytest.mark.parametrize("period, key", [("M", lambda day: day[:7] + "-01"), ("D", lambda day: day)])
+def test_articles_per_period_in_range(news, columns, period, key):
+    start, end = np.datetime64("2021-03-10"), np.datetime64("2021-11-20")
+    expected: Counter = Counter()
+
+    for day, count in articlesForDate(news).items():
+        if start <= parseDay(day) < end:
+            expected[key(str(parseDay(day)))] += count
+
+    assert columns.articlesPerPeriod(period, start, end) == dict(expected)
+
+def test_most_common_word_matches_analytics(news, columns):
+    counts = wordsPerDay(news)
+    cleaned = tokenizeAll([headline for _, headline in news])[1]
+    expected = { str(parseDay(day)): word for day, word in mostCommonWordForDate([(timestamp, words) for (timestamp, _), words in zip(news, cleaned)]).items() }
+    result = columns.mostCommonWordPerPeriod("D")
+
+    # Con empates cada implementación puede escoger una palabra distinta, pero ambas deben tener la frecuencia máxima del día.
+    assert result.keys() == expected.keys()
+    assert all(counts[day][word] == max(counts[day].values()) == counts[day][expected[day]] for day, word in result.items())
+
+def test_top_words_match_analytics(news, columns):
+    counts = wordsPerDay(news)
+
+    for day, top in columns.topWordsPerPeriod(3, "D").items():
+        assert all(counts[day][word] == count for word, count in top.items())
+        assert sorted(top.values(), reverse=True) == [count for _, count in counts[day].most_common(len(top))]
+
+def test_builder_merge_equals_single_pass(news, columns):
+    builders = [ColumnBuilder().addAll(news[start:start + 700]) for start in range(0, len(news), 700)]
+    merged = builders[0]
+
+    for builder in builders[1:]:
+        merged.merge(builder)
+
+    result = merged.build()
+
+    assert result.headlines is None
+    assert result.dates.tolist() == columns.dates.tolist()
+    assert result.offsets.tolist() == columns.offsets.tolist()
+    assert [result.vocabulary[i] for i in result.tokens] == [columns.vocabulary[i] for i in columns.tokens]
+    assert result.topWordsPerPeriod(5, "W") == columns.topWordsPerPeriod(5, "W")
@@ -0,0 +1,113 @@
+import random
+import struct
+from collections import Counter
+import numpy as np
+import pytest
+from benchmark import syntheticCorpus
+from compiled_graph import HEADER, MAGIC, TABLE_ARRAYS, VERSION, CompiledWordChainGraph, buildAliasTable
+from word_chain_graph import WordChainGraph
+
+"""
+Se calcula la distribución que muestrea una tabla alias: cada columna se escoge con probabilidad 1 / k, y luego se queda en la columna con probabilidad prob o pasa a su alias.
+"""
+def aliasDistribution(prob, alias):
+    k = len(prob)
+    distribution = [0.0] * k
+
+    for column in range(k):
+        distribution[column] += prob[column] / k
+        distribution[alias[column]] += (1 - prob[column]) / k
+
+    return distribution
+
+@pytest.mark.parametrize("weights", [
+    [1],
+    [1, 1, 1, 1],
+    [1, 3],
+    [100, 1, 1, 1, 1],
+    [0.5, 2.25, 7, 1e-3],
+    [random.Random(seed).randint(1, 50) for seed in range(200)]
+])
+def test_alias_table_reproduces_weights(weights):
+    prob, alias = buildAliasTable(weights)
+    total = sum(weights)
+
+    assert all(0 <= p <= 1 for p in prob)
+    assert all(0 <= i < len(weights) for i in alias)
+    assert aliasDistribution(prob, alias) == pytest.approx([weight / total for weight in weights], abs=1e-12)
+
+def test_compiled_rows_reproduce_transition_weights():
+    graph = WordChainGraph(1)
+    graph.load(syntheticCorpus(2000, vocabulary=200))
+    table = graph.compile().levels[0]
+
+    for row in range(len(table.offsets) - 1):
+        first, last = table.offsets[row], table.offsets[row + 1]
+
+        if first == last:
+            continue
+
+        weights = table.weights[first:last]
+        prob = table.prob[first:last]
+        alias = [i - first for i in table.alias[first:last]]
+
+        assert aliasDistribution(prob, alias) == pytest.approx([weight / sum(weights) for weight in weights], abs=1e-9)
+
+def test_sampling_follows_weights():
+    # La palabra de inicio pasa a "a" con peso 1, a "b" con peso 3 y a "c" con peso 6.
+    graph = WordChainGraph(1)
+    graph.load([["a"]] + [["b"]] * 3 + [["c"]] * 6)
+    counts = Counter(graph.generateSentences(60000, seed=1))
+
+    assert counts["a."] / 60000 == pytest.approx(0.1, abs=0.01)
+    assert counts["b."] / 60000 == pytest.approx(0.3, abs=0.01)
+    assert counts["c."] / 60000 == pytest.approx(0.6, abs=0.01)
+
+@pytest.mark.parametrize("order", [1, 3])
+def test_save_open_round_trip(tmp_path, order):
+    graph = WordChainGraph(order)
+    graph.load(syntheticCorpus(2000, vocabulary=500) + [["año", "récord", "en", "Bogotá"]])
+    compiled = graph.compile()
+    path = str(tmp_path / "model.wcg")
+    graph.save(path)
+
+    opened = CompiledWordChainGraph.open(path)
+
+    assert list(opened.words) == list(compiled.words)
+    assert len(opened.levels) == len(compiled.levels)
+
+    for original, loaded in zip(compiled.levels, opened.levels):
+        for name, _ in TABLE_ARRAYS:
+            assert list(getattr(loaded, name)) == list(getattr(original, name))
+
+    assert opened.originality.n == compiled.originality.n
+    assert list(opened.originality.sentences) == list(compiled.originality.sentences)
+    assert opened.generateSentences(100, seed=5, original=True) == compiled.generateSentences(100, seed=5, original=True)
+    assert opened.generateBatch(100, seed=5).ids.tolist() == compiled.generateBatch(100, seed=5).ids.tolist()
+
+def test_opened_sections_are_aligned(tmp_path):
+    graph = WordChainGraph(2)
+    graph.load(syntheticCorpus(500))
+    path = str(tmp_path / "model.wcg")
+    graph.save(path)
+
+    opened = CompiledWordChainGraph.open(path)
+
+    for table in opened.levels:
+        for name, _ in TABLE_ARRAYS:
+            values = getattr(table, name)
+
+            if len(values):
+                assert np.frombuffer(values, dtype=np.uint8).ctypes.data % 8 == 0
+
+@pytest.mark.parametrize("header", [
+    HEADER.pack(b"NOTGRAPH", VERSION, 0x01020304, 1, 2),
+    HEADER.pack(MAGIC, VERSION + 1, 0x01020304, 1, 2),
+    HEADER.pack(MAGIC, VERSION, 0x04030201, 1, 2)
+])
+def test_open_rejects_incompatible_files(tmp_path, header):
+    path = tmp_path / "model.wcg"
+    path.write_bytes(header + struct.pack("=Q", 0) * 4)
+
+    with pytest.raises(ValueError):
+        CompiledWordChainGraph.open(str(path))
@@ -0,0 +1,91 @@
+import asyncio
+import http.client
+import json
+from typing import List, Tuple
+import pytest
+import generation_server
+from benchmark import syntheticCorpus
+from generation_server import CHUNK_SIZE, MAX_LENGTH, GenerationServer
+from word_chain_graph import WordChainGraph
+
+"""
+Se genera un bloque como generateChunk, pero falla en el segundo bloque de la semilla 1 y en el primero de la semilla 2.
+"""
+def failingChunk(n, seed, *args):
+    if (seed // 1000003, seed % 1000003) in ((1, 1), (2, 0)):
+        raise RuntimeError("fallo del proceso")
+
+    return generation_server.workerGraph.generateSentences(n, seed, *args)
+
+"""
+Se hace una solicitud al servidor.
+
+Retorna:
+Una tupla (estado, líneas JSON recibidas). Si el cuerpo no termina correctamente http.client lanza IncompleteRead.
+"""
+def fetch(port: int, query: str) -> Tuple[int, List[dict]]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+    try:
+        connection.request("GET", f"/generate?{query}")
+        response = connection.getresponse()
+        body = response.read()
+
+        return response.status, [json.loads(line) for line in body.splitlines()] if response.status == 200 else []
+    finally:
+        connection.close()
+
+"""
+Se inicia un servidor con un modelo pequeño y se hacen las solicitudes dadas.
+
+Retorna:
+Las respuestas de cada solicitud.
+"""
+def serveRequests(path: str, queries: List[str]) -> List[Tuple[int, List[dict]]]:
+    async def run():
+        async with GenerationServer(path, port=0, workers=1) as server:
+            return [await asyncio.to_thread(fetch, server.port, query) for query in queries]
+
+    return asyncio.run(run())
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    graph = WordChainGraph(2)
+    graph.load(syntheticCorpus(2000, vocabulary=300))
+    path = str(tmp_path_factory.mktemp("model") / "model.wcg")
+    graph.save(path)
+
+    return path
+
+def test_generates_with_constraints(model):
+    (status, lines), = serveRequests(model, ["n=150&seed=1&minLength=4&maxLength=9&seedWords=w0&original=1"])
+    lengths = [len(line["sentence"].split(" ")) for line in lines]
+
+    assert status == 200
+    assert 0 < len(lines) <= 150
+    assert 4 <= min(lengths) and max(lengths) <= 9
+    assert all(line["sentence"].startswith("w0 ") for line in lines)
+
+def test_same_seed_same_sentences(model):
+    first, second = serveRequests(model, ["n=150&seed=3", "n=150&seed=3"])
+
+    assert first == second
+    assert len(first[1]) == 150
+
+@pytest.mark.parametrize("query", [f"maxLength={MAX_LENGTH + 1}", "minLength=5&maxLength=4", "seedWords=inexistente", "original=maybe", "minLength=x", "n=0"])
+def test_rejects_invalid_parameters(model, query):
+    assert serveRequests(model, [f"{query}&n=5"]) == [(400, [])]
+
+def test_worker_failure(model, monkeypatch):
+    # Los procesos del pool se crean con fork después de reemplazar la función, por lo que también la usan.
+    monkeypatch.setattr(generation_server, "generateChunk", failingChunk)
+    midStream, first, healthy = serveRequests(model, [f"n={CHUNK_SIZE * 3}&seed=1", "n=5&seed=2", "n=5&seed=3"])
+
+    # Si ya se envió algún bloque el cuerpo termina con una línea de error.
+    assert midStream[0] == 200
+    assert len(midStream[1]) == CHUNK_SIZE + 1
+    assert midStream[1][-1] == { "error": "Internal Server Error" }
+
+    # Si falla el primer bloque todavía se puede responder con 500, y el servidor sigue atendiendo.
+    assert first == (500, [])
+    assert healthy[0] == 200 and len(healthy[1]) == 5
@@ -0,0 +1,123 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from urllib.error import HTTPError
+import pytest
+from article_store import ArticleStore
+from dates import formatDate, parseDate
+from fixture_server import FixtureServer, SyntheticFeed
+from scrap_news import MAX_REDIRECTS, ScrapStats, formatTimestamp, parsePage, scrap
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+"""
+Retorna:
+Los titulares de una lista de artículos. Las fechas de los artículos que solo muestran la hora dependen del día en que se rastrean, por lo que no se comparan.
+"""
+def headlines(articles):
+    return [headline for _, headline in articles]
+
+def test_parse_and_format_dates():
+    assert parseDate("3 mayo 2022") == date(2022, 5, 3)
+    assert parseDate("28 Septiembre 2021") == date(2021, 9, 28)
+    assert parseDate("1 setiembre 2020") == date(2020, 9, 1)
+    assert formatDate(date(2022, 5, 3)) == "03 mayo 2022"
+
+    for text in ("3 mayos 2022", "3 May 2022", "mayo 2022"):
+        with pytest.raises(ValueError):
+            parseDate(text)
+
+def test_format_timestamp():
+    # Los artículos de días anteriores pueden mostrar solo la fecha, sin hora que convertir.
+    assert formatTimestamp("3 mayo 2022") == "00:00 03 mayo 2022"
+
+    # Las horas están en UTC y se convierten a la hora de Colombia (UTC-5).
+    assert formatTimestamp("18:27 3 mayo 2022") == "13:27 03 mayo 2022"
+    assert formatTimestamp("02:00 1 enero 2022") == "21:00 31 diciembre 2021"
+
+    # Una hora sola es del día actual, o del anterior si todavía no ha llegado.
+    published = datetime.now(tz=timezone.utc) - timedelta(minutes=1)
+    expected = (published - timedelta(hours=5)).replace(second=0, microsecond=0)
+    assert formatTimestamp(f"{published:%H:%M}") == f"{expected:%H:%M} {formatDate(expected.date())}"
+
+def test_parse_fixture_page_with_dates():
+    with open(os.path.join(FIXTURES, "bbc_mundo_topic.html"), "rb") as file:
+        page = file.read()
+
+    for extractor in ("stream", "soup"):
+        articles = parsePage(page, extractor)
+
+        assert len(articles) == 26
+        assert articles[-3:] == [
+            ("00:00 03 mayo 2022", "Inflación en méxico y la crisis de la guerra"),
+            ("00:00 28 septiembre 2021", "Petro y las protestas en colombia por la economía"),
+            ("02:45 02 mayo 2022", "Récord de la rusia en el mundo del gobierno")
+        ]
+
+def test_scrap_returns_newest_articles(tmp_path):
+    feed = SyntheticFeed()
+
+    with FixtureServer(feed) as server:
+        articles = scrap(100, server.url, 4, str(tmp_path / "news.csv"))
+
+    # Se leen páginas completas hasta tener al menos n artículos, del más reciente al más antiguo.
+    assert 100 <= len(articles) < 100 + feed.perPage
+    assert headlines(articles) == [feed.article(number)[1] for number in range(feed.total - 1, feed.total - 1 - len(articles), -1)]
+
+def test_follows_redirect_on_same_host(tmp_path):
+    feed = SyntheticFeed()
+
+    with FixtureServer(feed) as target:
+        expected = scrap(100, target.url, 4, str(tmp_path / "news.csv"))
+
+    with FixtureServer(feed, redirects={ "/mundo/topics/viejo": "/mundo/topics/fixture" }) as server:
+        moved = scrap(100, server.urlFor("/mundo/topics/viejo"), 4, str(tmp_path / "news.csv"))
+
+    assert headlines(moved) == headlines(expected)
+
+def test_follows_redirect_to_other_host(tmp_path):
+    feed = SyntheticFeed()
+
+    with FixtureServer(feed) as target:
+        expected = scrap(100, target.url, 4, str(tmp_path / "news.csv"))
+
+        with FixtureServer(feed, redirects={ "/mundo/topics/viejo": target.url }) as server:
+            moved = scrap(100, server.urlFor("/mundo/topics/viejo"), 4, str(tmp_path / "news.csv"))
+
+        # Las páginas se descargan del servidor de destino, el de origen solo responde las redirecciones.
+        assert server.requests <= target.requests
+
+    assert headlines(moved) == headlines(expected)
+
+def test_redirect_loop_fails(tmp_path):
+    with FixtureServer(SyntheticFeed(), redirects={ "/a": "/b", "/b": "/a" }) as server:
+        with pytest.raises(HTTPError) as error:
+            scrap(24, server.urlFor("/a"), 4, str(tmp_path / "news.csv"))
+
+    assert error.value.code == 301
+    assert server.requests <= 4 * (MAX_REDIRECTS + 1)
+
+def test_incremental_crawl(tmp_path):
+    feed = SyntheticFeed()
+    path = str(tmp_path / "news.csv")
+
+    with FixtureServer(feed) as server, ArticleStore(str(tmp_path / "news.db")) as store:
+        first = scrap(120, server.url, 4, path, store=store)
+        assert headlines(first) == headlines(scrap(120, server.url, 4, path))
+
+        # Sin cambios en la sección basta con una solicitud condicional de la primera página.
+        stats = ScrapStats()
+        requests = server.requests
+        unchanged = scrap(120, server.url, 4, path, store=store, stats=stats)
+
+        assert server.requests - requests == 1
+        assert stats.notModified == 1
+        assert headlines(unchanged) == headlines(first)
+
+        # Los artículos nuevos se leen de la primera página y el resto se toma del almacén.
+        feed.publish(10)
+        requests = server.requests
+        updated = scrap(120, server.url, 4, path, store=store)
+
+        assert server.requests - requests == 1
+        assert headlines(updated) == [feed.article(number)[1] for number in range(feed.total - 1, feed.total - 11, -1)] + headlines(first)[:110]
+        assert store.count() == 130
@@ -0,0 +1,65 @@
+import re
+import nltk
+import pytest
+from analytics import STOP_WORDS, tokenizeAll, tokenizeSentence
+from benchmark import syntheticHeadlines
+
+# Titulares con los casos que separan palabras en nltk.word_tokenize: puntuación, comillas, contracciones, números y puntos finales.
+HEADLINES = [
+    "¿Qué pasó en EE.UU.? El presidente habla...",
+    "«La guerra no terminará», dijo el ministro: 3,5% más",
+    "Biden's plan can't work, they'd say 'no' (again)",
+    "US$10 por 2.000 barriles -- récord en 1:30 horas.",
+    "Covid-19: \"cómo\" cambió el mundo [análisis]",
+    "Gimme more, gonna wanna cannot lemme",
+    "Fin de la frase. Y otra frase.",
+    ""
+]
+
+"""
+Se tokeniza un titular como lo hacía el proyecto con NLTK: se separan las palabras y se les quitan los caracteres no alfanuméricos, y para las palabras limpias además se pasan a minúsculas y se eliminan números y stop words.
+"""
+def reference(sentence: str, **options):
+    tokens = nltk.word_tokenize(sentence, **options)
+    tokenized = [token for token in (re.sub(r"\W+", "", token) for token in tokens) if token != ""]
+    cleaned = [token for token in (re.sub(r"\W+", "", token.lower()) for token in tokens) if token != "" and not token.isnumeric() and token not in STOP_WORDS]
+
+    return tokenized, cleaned
+
+"""
+Retorna:
+Verdadero si están instalados los datos de punkt que usa nltk.word_tokenize para dividir oraciones.
+"""
+def hasPunkt() -> bool:
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        return True
+    except LookupError:
+        return False
+
+@pytest.mark.parametrize("sentence", HEADLINES)
+def test_matches_treebank_rules(sentence):
+    # Sin dividir en oraciones word_tokenize solo aplica las reglas de Treebank, que son las que reproduce el tokenizador.
+    tokenized, cleaned = reference(sentence, preserve_line=True)
+
+    assert tokenizeSentence(sentence) == (tuple(tokenized), tuple(cleaned))
+
+def test_matches_treebank_rules_on_synthetic_headlines():
+    sentences = syntheticHeadlines(2000)
+    expected = [reference(sentence, preserve_line=True) for sentence in sentences]
+
+    assert [tokenizeSentence(sentence) for sentence in sentences] == [(tuple(tokenized), tuple(cleaned)) for tokenized, cleaned in expected]
+
+@pytest.mark.skipif(not hasPunkt(), reason="Los datos punkt de NLTK no están instalados")
+def test_matches_word_tokenize():
+    sentences = HEADLINES + syntheticHeadlines(2000)
+    expected = [reference(sentence) for sentence in sentences]
+
+    assert [tokenizeSentence(sentence) for sentence in sentences] == [(tuple(tokenized), tuple(cleaned)) for tokenized, cleaned in expected]
+
+def test_tokenize_all_matches_each_sentence():
+    sentences = syntheticHeadlines(200, seed=1)
+    tokenized, cleaned = tokenizeAll(iter(sentences))
+
+    assert tokenized == [list(tokenizeSentence(sentence)[0]) for sentence in sentences]
+    assert cleaned == [list(tokenizeSentence(sentence)[1]) for sentence in sentences]
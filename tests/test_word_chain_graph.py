@@ -0,0 +1,91 @@
+import sys
+import pytest
+from benchmark import syntheticCorpus
+from compiled_graph import CompiledWordChainGraph, TABLE_ARRAYS
+from word_chain_graph import WordChainGraph
+
+"""
+Se convierte un grafo compilado a listas para compararlo: su vocabulario, los arreglos de la tabla de cada orden y el índice de originalidad.
+"""
+def compiledArrays(compiled: CompiledWordChainGraph):
+    levels = [[list(getattr(table, name)) for name, _ in TABLE_ARRAYS] for table in compiled.levels]
+    index = compiled.originality
+    originality = (index.n, list(index.wordHashes), list(index.ngrams), list(index.sentences)) if index is not None else None
+
+    return list(compiled.words), levels, originality
+
+@pytest.mark.parametrize("order", [1, 2, 3])
+def test_merge_equals_single_load(order):
+    corpus = syntheticCorpus(3000, vocabulary=500)
+    parts = [corpus[:1000], corpus[1000:1700], corpus[1700:]]
+
+    expected = WordChainGraph(order)
+    expected.load(corpus)
+
+    merged = WordChainGraph(order)
+    merged.load(parts[0])
+
+    for part in parts[1:]:
+        other = WordChainGraph(order)
+        other.load(part)
+        merged.merge(other)
+
+    assert compiledArrays(merged.compile()) == compiledArrays(expected.compile())
+    assert merged.generateSentences(50, seed=7, original=True) == expected.generateSentences(50, seed=7, original=True)
+
+def test_merge_rejects_different_order():
+    with pytest.raises(ValueError):
+        WordChainGraph(1).merge(WordChainGraph(2))
+
+def test_update_equals_load():
+    corpus = syntheticCorpus(2000, vocabulary=500)
+    expected = WordChainGraph(2)
+    expected.load(corpus)
+
+    updated = WordChainGraph(2)
+    updated.load(corpus[:500])
+    updated.update(iter(corpus[500:]))
+
+    assert compiledArrays(updated.compile()) == compiledArrays(expected.compile())
+
+def test_merge_interns_new_words():
+    graph = WordChainGraph(2)
+    graph.load([["hola", "mundo"]])
+    other = WordChainGraph(2)
+    other.load([["".join(["nue", "va"]), "hola"]])
+    graph.merge(other)
+
+    added = [word for word in graph.compile().words if word == "nueva"]
+
+    assert len(added) == 1 and added[0] is sys.intern("nueva")
+
+def test_decay_prunes_near_zero_edges():
+    graph = WordChainGraph(3)
+    graph.load(syntheticCorpus(500, vocabulary=300, seed=1))
+    before = graph.compile()
+
+    # Con decay = 0.001 todas las transiciones anteriores quedan por debajo de MIN_WEIGHT.
+    graph.update(syntheticCorpus(20, vocabulary=300, seed=2), decay=0.001)
+    after = graph.compile()
+
+    assert sum(len(table.targets) for table in after.levels) < sum(len(table.targets) for table in before.levels) / 2
+    assert all(weight >= 0.001 for table in after.levels for weight in table.weights)
+
+    # Ninguna palabra, salvo la de fin, queda sin transiciones de orden 1.
+    offsets = after.levels[0].offsets
+    assert all(offsets[i + 1] > offsets[i] for i in range(len(after.words)) if i != CompiledWordChainGraph.END_ID)
+
+    # Se puede seguir generando, incluso desde palabras que solo aparecían en las frases antiguas.
+    assert len(after.generateSentences(200, seed=3, maxLength=60)) > 0
+    assert len(after.generateSentences(20, seed=3, seedWords=[before.words[5]], maxLength=60)) > 0
+
+def test_decay_keeps_model_size_bounded():
+    graph = WordChainGraph(2)
+    sizes = []
+
+    for day in range(30):
+        graph.update(syntheticCorpus(200, vocabulary=3000, seed=day), decay=0.5)
+        sizes.append(sum(len(table.targets) for table in graph.compile().levels))
+
+    # Con decay = 0.5 una transición sin repetir desaparece en pocos días, el tamaño deja de crecer.
+    assert sizes[-1] < sizes[14] * 1.2
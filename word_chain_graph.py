@@ -1,6 +1,13 @@
-from typing import Dict, List
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
 import random
 import pprint
+import sys
+import numpy as np
+from compiled_graph import CompiledWordChainGraph, OriginalityIndex, SentenceBatch, MASK, SHIFT
+
+# Peso mínimo de una transición después de envejecerla con decay, las transiciones con menos peso se eliminan.
+MIN_WEIGHT = 0.01
 
 """
 Clase que representa una cadena de Markov que se implementa mediante un grafo dirigido que al mismo tiempo se implementa con un diccionario anidado.
@@ -8,6 +15,12 @@ Clase que representa una cadena de Markov que se implementa mediante un grafo di
 Parámetros:
 graph - Diccionario que representa al grafo, en este se guarda cada palabra como clave y un diccionario que contiene las transiciones de la forma [palabra -> peso].
 El peso de cada transición el número de veces que se esta se da, por lo cual la probabilidad de cada transición es peso / (# total de transiciones en la palabra).
+order - Orden de la cadena, es decir, el número de palabras anteriores que se tienen en cuenta para escoger la siguiente palabra.
+words - Vocabulario, cada palabra se identifica con su posición. Las palabras de inicio y fin tienen los identificadores 0 y 1.
+contexts - Transiciones de los órdenes 2 en adelante. Para no guardar tuplas de palabras, cada transición se guarda en un único diccionario por orden cuya clave es un entero que empaqueta los identificadores del contexto y de la palabra destino.
+maxOverlap - Número máximo de palabras seguidas que una frase generada con original=True puede copiar de una frase de entrenamiento. Por defecto es el orden más 3, ya que cualquier secuencia de order + 1 palabras generadas proviene de alguna frase de entrenamiento.
+tokens - Identificadores de las palabras de las frases de entrenamiento, una frase tras otra. Al compilar se construye con ellos el índice de originalidad.
+lengths - Número de palabras de cada frase de entrenamiento.
 """
 class WordChainGraph:
     # Atributos estáticos que contienen las palabras que representan el inicio y el fin de una oración.
@@ -15,29 +28,88 @@ class WordChainGraph:
     END = "|\0"
 
     __graph: Dict[str, Dict[str, int]]
+    __order: int
+    __words: List[str]
+    __ids: Dict[str, int]
+    __contexts: List[Dict[int, int]]
+    __compiled: Optional[CompiledWordChainGraph]
+    __maxOverlap: int
+    __tokens: array
+    __lengths: array
 
-    def __init__(self) -> None:
+    def __init__(self, order: int = 1, maxOverlap: Optional[int] = None) -> None:
         self.__graph = dict()
+        self.__order = order
+        self.__maxOverlap = maxOverlap if maxOverlap is not None else order + 3
+        self.__reset()
+
+    @property
+    def order(self) -> int:
+        return self.__order
 
     """
-    Carga un conjunto de frases a la cadena de Markov para que se generen frases a partir de estas.
-    
-    Parámetros:
-    sentences - Frases para insertar en el grafo
+    Deja el grafo vacío, solo con las palabras de inicio y fin.
     """
-    def load(self, sentences: List[str]):
-        # Se reinicia el grafo.
+    def __reset(self) -> None:
+        self.__compiled = None
         self.__graph.clear()
         self.__graph[WordChainGraph.START] = dict()
         self.__graph[WordChainGraph.END] = dict()
+        self.__words = [WordChainGraph.START, WordChainGraph.END]
+        self.__ids = { WordChainGraph.START: 0, WordChainGraph.END: 1 }
+        self.__contexts = [dict() for _ in range(self.__order - 1)]
+        self.__tokens = array("i")
+        self.__lengths = array("i")
+
+    """
+    Carga un conjunto de frases a la cadena de Markov para que se generen frases a partir de estas. Las transiciones cargadas previamente se descartan.
+    
+    Parámetros:
+    sentences - Frases para insertar en el grafo, cada una dividida en palabras. Se recorren una sola vez, por lo que pueden venir de un iterador (por ejemplo analytics.tokenizeStream).
+    """
+    def load(self, sentences: Iterable[Sequence[str]]):
+        # Se reinicia el grafo y se insertan las frases.
+        self.__reset()
+        self.update(sentences)
+
+    """
+    Añade un conjunto de frases a la cadena de Markov sin descartar las transiciones existentes, de esta manera cada nuevo lote de noticias no requiere reconstruir el grafo.
+
+    Parámetros:
+    sentences - Frases para insertar en el grafo, cada una dividida en palabras. Se recorren una sola vez.
+    decay - Factor por el cual se multiplican los pesos existentes antes de añadir las frases. Un valor menor a 1 hace que las transiciones antiguas pierdan importancia frente a las nuevas.
+    minWeight - Al envejecer, las transiciones cuyo peso queda por debajo de este valor se eliminan, así un modelo que se actualiza durante mucho tiempo no conserva todas sus transiciones. Cada palabra conserva al menos su transición más pesada y el vocabulario no se reduce.
+    """
+    def update(self, sentences: Iterable[Sequence[str]], decay: float = 1.0, minWeight: float = MIN_WEIGHT) -> None:
+        # Se descarta la versión compilada, ya que deja de estar actualizada.
+        self.__compiled = None
+
+        # Se envejecen las transiciones existentes y se eliminan las que quedan con un peso casi nulo.
+        if decay != 1.0:
+            for word, chains in self.__graph.items():
+                decayed = { chain: weight * decay for chain, weight in chains.items() if weight * decay >= minWeight }
+
+                # Si todas las transiciones de una palabra quedan por debajo de minWeight se conserva la más pesada, así ninguna palabra queda sin salida.
+                if chains and not decayed:
+                    chain = max(chains, key=chains.get)
+                    decayed[chain] = chains[chain] * decay
+
+                self.__graph[word] = decayed
+
+            # Un contexto de orden mayor que se queda sin transiciones desaparece, y la generación usa el contexto más corto. Una transición nunca pesa más que la misma transición del contexto más corto, por lo que los contextos que quedan siempre tienen a su contexto padre.
+            for order, edges in enumerate(self.__contexts):
+                self.__contexts[order] = { key: weight * decay for key, weight in edges.items() if weight * decay >= minWeight }
         
         # Iteramos a través de las frases.
         for sentence in sentences:
             # Iteramos a través de cada palabra en la frase actual.
             for i in range(len(sentence)):
-                # Si la palabra no se encuentra como clave en el diccionario, la añadimos con un diccionario vacío como valor.
+                # Si la palabra no se encuentra como clave en el diccionario, la añadimos con un diccionario vacío como valor y le asignamos un identificador.
                 if sentence[i] not in self.__graph:
-                    self.__graph[sentence[i]] = dict()
+                    word = sys.intern(sentence[i])
+                    self.__graph[word] = dict()
+                    self.__ids[word] = len(self.__words)
+                    self.__words.append(word)
 
                 # Si la palabra es la primera palabra de la frase, la añadimos como una transición de la palabra de inicio.
                 if i == 0:
@@ -54,16 +126,152 @@ class WordChainGraph:
                 else:
                     self.__graph[sentence[i]][chain] += 1
 
+            # Si la cadena es de orden mayor a 1, se añaden los contextos de más de una palabra.
+            if self.__order > 1 and sentence:
+                self.__loadContexts(sentence)
+
+            # Se guarda la frase para el índice de originalidad.
+            if sentence:
+                self.__tokens.extend([self.__ids[word] for word in sentence])
+                self.__lengths.append(len(sentence))
+
+    """
+    Añade las transiciones de órdenes 2 en adelante de una frase. La frase se rellena con palabras de inicio para que las primeras palabras también tengan contextos completos.
+
+    Parámetros:
+    sentence - Frase a insertar.
+    """
+    def __loadContexts(self, sentence: List[str]) -> None:
+        ids = [CompiledWordChainGraph.START_ID] * self.__order + [self.__ids[word] for word in sentence] + [CompiledWordChainGraph.END_ID]
+
+        # Por cada palabra de la frase (y la palabra de fin) se añade la transición desde cada uno de sus contextos.
+        for position in range(self.__order, len(ids)):
+            context = ids[position - 1]
+
+            for j in range(2, self.__order + 1):
+                # Se añade la palabra anterior a los bits más significativos del contexto.
+                context |= ids[position - j] << (SHIFT * (j - 1))
+                key = (context << SHIFT) | ids[position]
+                edges = self.__contexts[j - 2]
+
+                if key not in edges:
+                    edges[key] = 1
+                else:
+                    edges[key] += 1
+
+    """
+    Suma las transiciones de otro grafo a este grafo. Permite construir grafos por partes (por ejemplo, por día o en procesos distintos) y combinarlos después.
+
+    Parámetros:
+    other - Grafo a sumar, debe tener el mismo orden y el mismo maxOverlap.
+    """
+    def merge(self, other: "WordChainGraph") -> None:
+        if other.__order != self.__order:
+            raise ValueError(f"No se puede combinar un grafo de orden {other.__order} con uno de orden {self.__order}")
+
+        if other.__maxOverlap != self.__maxOverlap:
+            raise ValueError(f"No se puede combinar un grafo con maxOverlap {other.__maxOverlap} con uno con maxOverlap {self.__maxOverlap}")
+
+        self.__compiled = None
+
+        # Se suman las transiciones de orden 1, añadiendo al vocabulario las palabras que no existan. Las palabras nuevas se internan como en update, así cada palabra se guarda una sola vez sin importar por dónde se añadió.
+        for word, chains in other.__graph.items():
+            if word not in self.__graph:
+                word = sys.intern(word)
+                self.__graph[word] = dict()
+                self.__ids[word] = len(self.__words)
+                self.__words.append(word)
+
+            for chain, weight in chains.items():
+                if chain not in self.__graph[word]:
+                    self.__graph[word][chain] = weight
+                else:
+                    self.__graph[word][chain] += weight
+
+        # Los identificadores del otro grafo se traducen a los identificadores de este grafo antes de sumar los contextos.
+        remap = [self.__ids[word] for word in other.__words]
+
+        for order, edges in enumerate(other.__contexts, start=2):
+            own = self.__contexts[order - 2]
+
+            for key, weight in edges.items():
+                translated = 0
+
+                for j in range(order + 1):
+                    translated |= remap[(key >> (SHIFT * j)) & MASK] << (SHIFT * j)
+
+                if translated not in own:
+                    own[translated] = weight
+                else:
+                    own[translated] += weight
+
+        # Se añaden las frases del otro grafo traduciendo sus identificadores.
+        self.__tokens.frombytes(np.asarray(remap, dtype=np.int32)[np.frombuffer(other.__tokens, dtype=np.int32)].tobytes())
+        self.__lengths.extend(other.__lengths)
+
+    """
+    Congela el grafo en su versión compilada, con identificadores enteros y tablas alias por palabra, junto con el índice de originalidad de las frases de entrenamiento. Una vez compilado, generateSentences realiza cada transición en tiempo constante.
+
+    Retorna:
+    El grafo compilado.
+    """
+    def compile(self) -> CompiledWordChainGraph:
+        originality = OriginalityIndex.fromSentences(self.__maxOverlap + 1, self.__words, self.__tokens, self.__lengths)
+        self.__compiled = CompiledWordChainGraph.fromGraph(self.__words, self.__graph, self.__contexts, originality)
+        return self.__compiled
+
+    """
+    Guarda el grafo compilado en un archivo binario que se puede abrir con CompiledWordChainGraph.open. Si el grafo no ha sido compilado se compila primero.
+
+    Parámetros:
+    path - Ruta del archivo.
+    """
+    def save(self, path: str) -> None:
+        if self.__compiled is None:
+            self.compile()
+
+        self.__compiled.save(path)
+
+    """
+    Estima la memoria que ocupa el grafo sin compilar.
+
+    Retorna:
+    Un diccionario con el número de bytes que ocupan las transiciones de cada orden. El vocabulario se cuenta en el orden 1.
+    """
+    def memoryUsage(self) -> Dict[int, int]:
+        usage = { 1: sys.getsizeof(self.__graph) + sys.getsizeof(self.__words) + sys.getsizeof(self.__ids) }
+        usage[1] += sum(sys.getsizeof(chains) for chains in self.__graph.values()) + sum(sys.getsizeof(word) for word in self.__words)
+
+        for order, edges in enumerate(self.__contexts, start=2):
+            usage[order] = sys.getsizeof(edges) + sum(sys.getsizeof(key) + sys.getsizeof(weight) for key, weight in edges.items())
+
+        return usage
+
     """
     Se generan n frases aleatorias haciendo uso de la información en el grafo.
     
     Parámetros:
     n - Número de frases a generar.
+    seed - Semilla del generador aleatorio, si no se especifica se usa el generador global del módulo random.
+    minLength - Número mínimo de palabras por frase.
+    maxLength - Número máximo de palabras por frase, None para no limitar.
+    seedWords - Palabras con las que empiezan todas las frases.
+    original - Si es verdadero se descartan las frases que copian más de maxOverlap palabras seguidas de una frase de entrenamiento o que son idénticas a una.
+    maxAttempts - Número máximo de frases candidatas por cada frase pedida, con restricciones difíciles de cumplir se pueden obtener menos de n frases.
 
     Retorna:
     Una lista de frases generadas de manera aleatoria.
     """
-    def generateSentences(self, n: str = 10) -> List[str]:
+    def generateSentences(self, n: int = 10, seed: Optional[int] = None, minLength: int = 0, maxLength: Optional[int] = None, seedWords: Sequence[str] = (), original: bool = False, maxAttempts: int = 100) -> List[str]:
+        # Las cadenas de orden mayor a 1 y las restricciones solo se pueden aplicar sobre el grafo compilado.
+        if self.__compiled is None and (self.__order > 1 or minLength > 0 or maxLength is not None or seedWords or original):
+            self.compile()
+
+        # Si el grafo fue compilado se usan las tablas alias.
+        if self.__compiled is not None:
+            return self.__compiled.generateSentences(n, seed, minLength, maxLength, seedWords, original, maxAttempts)
+
+        rng = random if seed is None else random.Random(seed)
         sentences: List[str] = []
         
         # Generamos n frases.
@@ -72,7 +280,7 @@ class WordChainGraph:
 
             # Iniciamos en la palabra de inicio y realizamos una transición aleatoria teniendo en cuenta los pesos de cada transición. Esta transición nos va a retornar la palabra con la cual iniciaremos nuestra frase.
             chains = self.__graph[WordChainGraph.START].items()
-            current = random.choices([chain[0] for chain in chains], weights=[chain[1] for chain in chains])[0]
+            current = rng.choices([chain[0] for chain in chains], weights=[chain[1] for chain in chains])[0]
 
             # Realizamos transiciones hasta que se llegue a la palabra de fin.
             while current != WordChainGraph.END:
@@ -83,11 +291,26 @@ class WordChainGraph:
                 chains = self.__graph[current].items()
                 
                 # Realizamos una transición aleatoria teniendo en cuenta los pesos de cada transición. Esto nos retorna otra palabra.
-                current = random.choices([chain[0] for chain in chains], weights=[chain[1] for chain in chains])[0]
+                current = rng.choices([chain[0] for chain in chains], weights=[chain[1] for chain in chains])[0]
 
             # Añadimos la frase generada a nuestra lista de frases.
             sentences.append(sentence[:-1] + ".")
 
         return sentences
-            
 
+    """
+    Se generan n frases en paralelo a partir del grafo compilado, si el grafo no ha sido compilado se compila primero.
+
+    Parámetros:
+    n - Número de frases a generar.
+    maxLength - Número máximo de palabras por frase.
+    seed - Semilla del generador aleatorio.
+
+    Retorna:
+    Un lote con los identificadores de las palabras de cada frase, que se convierten a texto bajo demanda.
+    """
+    def generateBatch(self, n: int, maxLength: int = 30, seed: Optional[int] = None) -> SentenceBatch:
+        if self.__compiled is None:
+            self.compile()
+
+        return self.__compiled.generateBatch(n, maxLength, seed)
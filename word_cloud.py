@@ -0,0 +1,309 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import heapq
+import io
+import json
+import os
+import random
+import ssl
+import threading
+import urllib.request as request
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Colores de las palabras, los mismos tonos que usan los gráficos de analytics.
+COLORS = ["royalblue", "darkmagenta", "palevioletred", "deeppink", "mediumvioletred", "steelblue", "indigo"]
+
+# Tamaño en pixeles de las celdas de la cuadrícula con la que se detectan las colisiones entre palabras.
+CELL = 4
+
+# URL de la API externa de nubes de palabras.
+REMOTE_URL = "https://quickchart.io/wordcloud"
+
+# Número máximo de solicitudes simultáneas a la API externa.
+REMOTE_WORKERS = 2
+
+"""
+Se busca la fuente por defecto: DejaVu Sans, que se instala junto con matplotlib, así no depende de las fuentes del sistema.
+
+Retorna:
+La ruta del archivo de la fuente.
+"""
+def defaultFont() -> str:
+    from matplotlib import font_manager
+    return font_manager.findfont("DejaVu Sans")
+
+"""
+Se calcula el identificador de una nube de palabras a partir de su distribución de frecuencia y de las opciones con que se dibuja. Dos distribuciones con las mismas frecuencias tienen el mismo identificador sin importar el orden de sus palabras.
+
+Parámetros:
+freqDist - Distribución de frecuencia.
+options - Opciones del dibujo.
+
+Retorna:
+El hash en hexadecimal.
+"""
+def frequencyHash(freqDist: Dict[str, int], **options) -> str:
+    content = json.dumps([sorted(freqDist.items()), options], ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+"""
+Dibuja una nube de palabras localmente a partir de una distribución de frecuencia. Las palabras se colocan de la más a la menos frecuente siguiendo una espiral desde el centro, con un tamaño de letra proporcional a su frecuencia; si una palabra no cabe se reduce su tamaño. Las posiciones ocupadas se guardan en una cuadrícula de numpy, y todas las posiciones de la espiral se comprueban a la vez con la suma acumulada de la cuadrícula, en vez de comparar cada posición con cada palabra ya colocada.
+
+Parámetros:
+freqDist - Distribución de frecuencia de las palabras.
+width - Ancho de la imagen.
+height - Alto de la imagen.
+maxWords - Número máximo de palabras, se usan las más frecuentes.
+fontPath - Ruta de una fuente TrueType, por defecto DejaVu Sans.
+minFontSize - Tamaño mínimo de letra, las palabras que no caben con este tamaño se omiten.
+maxFontSize - Tamaño de letra de la palabra más frecuente, por defecto un sexto del alto.
+seed - Semilla de los colores y del ángulo inicial de cada espiral.
+
+Retorna:
+La imagen de la nube de palabras.
+"""
+def renderWordCloud(freqDist: Dict[str, int], width: int = 1000, height: int = 1000, maxWords: int = 200, fontPath: Optional[str] = None, minFontSize: int = 10, maxFontSize: Optional[int] = None, seed: int = 0) -> Image.Image:
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    fontPath = fontPath if fontPath is not None else defaultFont()
+    fonts: Dict[int, ImageFont.FreeTypeFont] = dict()
+    occupied = np.zeros((height // CELL, width // CELL), dtype=bool)
+
+    words = heapq.nlargest(maxWords, freqDist.items(), key=lambda item: item[1])
+    if not words:
+        return image
+
+    # El tamaño de letra es lineal respecto a la frecuencia, igual que la opción "linear" de la API externa.
+    maxFontSize = maxFontSize if maxFontSize is not None else height // 6
+    highest, lowest = words[0][1], words[-1][1]
+
+    # Ángulos de una espiral de Arquímedes cuyos puntos y vueltas están separados aproximadamente una celda, hasta cubrir toda la imagen.
+    turns = np.hypot(*occupied.shape) / 2
+    theta = np.sqrt(4 * np.pi * np.arange(int(np.pi * turns ** 2)))
+
+    for word, count in words:
+        size = minFontSize + (maxFontSize - minFontSize) * (count - lowest) // max(1, highest - lowest)
+        position = None
+
+        while position is None and size >= minFontSize:
+            if size not in fonts:
+                fonts[size] = ImageFont.truetype(fontPath, size)
+
+            # Se deja un pixel de separación entre palabras.
+            left, top, right, bottom = draw.textbbox((0, 0), word, font=fonts[size])
+            cellWidth, cellHeight = (right - left + CELL + 1) // CELL, (bottom - top + CELL + 1) // CELL
+            position = findPosition(occupied, cellWidth, cellHeight, theta, rng.uniform(0, 2 * np.pi))
+
+            if position is None:
+                size = size * 4 // 5
+
+        if position is None:
+            continue
+
+        # Se dibuja la palabra y se marcan como ocupadas las celdas que cubre.
+        x, y = position
+        draw.text((x * CELL - left, y * CELL - top), word, font=fonts[size], fill=rng.choice(COLORS))
+        occupied[y:y + cellHeight, x:x + cellWidth] = True
+
+    return image
+
+"""
+Se busca la primera posición libre para un rectángulo a lo largo de una espiral desde el centro de la cuadrícula. La suma de las celdas ocupadas bajo el rectángulo en cada posición de la espiral se calcula a la vez con la suma acumulada (imagen integral) de la cuadrícula.
+
+Parámetros:
+occupied - Cuadrícula de celdas ocupadas.
+cellWidth - Ancho del rectángulo en celdas.
+cellHeight - Alto del rectángulo en celdas.
+theta - Ángulos de los puntos de la espiral, el radio crece con el ángulo.
+angle - Ángulo con el que se rota la espiral.
+
+Retorna:
+La celda de la esquina superior izquierda del rectángulo, o None si no cabe en ninguna posición.
+"""
+def findPosition(occupied: np.ndarray, cellWidth: int, cellHeight: int, theta: np.ndarray, angle: float) -> Optional[Tuple[int, int]]:
+    rows, columns = occupied.shape
+    if cellWidth > columns or cellHeight > rows:
+        return None
+
+    integral = np.zeros((rows + 1, columns + 1), dtype=np.int32)
+    integral[1:, 1:] = occupied.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+
+    # La espiral se estira horizontalmente para seguir la forma de la imagen.
+    radius = theta / (2 * np.pi)
+    xs = np.round(columns / 2 + radius * np.cos(theta + angle) * columns / rows - cellWidth / 2).astype(np.int64)
+    ys = np.round(rows / 2 + radius * np.sin(theta + angle) - cellHeight / 2).astype(np.int64)
+    inside = (xs >= 0) & (ys >= 0) & (xs + cellWidth <= columns) & (ys + cellHeight <= rows)
+    xs, ys = xs[inside], ys[inside]
+
+    used = integral[ys + cellHeight, xs + cellWidth] - integral[ys, xs + cellWidth] - integral[ys + cellHeight, xs] + integral[ys, xs]
+    free = np.flatnonzero(used == 0)
+
+    return None if len(free) == 0 else (int(xs[free[0]]), int(ys[free[0]]))
+
+"""
+Caché de nubes de palabras: guarda en memoria las imágenes usadas más recientemente (LRU) y en disco todas las dibujadas, como archivos PNG cuyo nombre es el hash de su distribución de frecuencia. Se puede usar desde varios hilos.
+
+Parámetros:
+directory - Carpeta de la caché en disco, None para usar solo la caché en memoria.
+size - Número de imágenes que se guardan en memoria.
+"""
+class WordCloudCache:
+    directory: Optional[str]
+    size: int
+    __images: "OrderedDict[str, bytes]"
+    __lock: threading.Lock
+
+    def __init__(self, directory: Optional[str] = ".wordclouds", size: int = 32) -> None:
+        self.directory = directory
+        self.size = size
+        self.__images = OrderedDict()
+        self.__lock = threading.Lock()
+
+    """
+    Parámetros:
+    key - Hash de la nube de palabras.
+
+    Retorna:
+    La imagen en formato PNG, o None si no está en la caché.
+    """
+    def get(self, key: str) -> Optional[bytes]:
+        with self.__lock:
+            if key in self.__images:
+                self.__images.move_to_end(key)
+                return self.__images[key]
+
+        if self.directory is None:
+            return None
+
+        try:
+            with open(os.path.join(self.directory, f"{key}.png"), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        self.__remember(key, data)
+        return data
+
+    """
+    Parámetros:
+    key - Hash de la nube de palabras.
+    data - Imagen en formato PNG.
+    """
+    def put(self, key: str, data: bytes) -> None:
+        self.__remember(key, data)
+
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            # Se escribe en un archivo temporal y se renombra, para que otro proceso nunca lea una imagen a medias.
+            path = os.path.join(self.directory, f"{key}.png")
+            with open(f"{path}.{os.getpid()}.tmp", "wb") as file:
+                file.write(data)
+            os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def __remember(self, key: str, data: bytes) -> None:
+        with self.__lock:
+            self.__images[key] = data
+            self.__images.move_to_end(key)
+
+            # Se descartan las imágenes usadas hace más tiempo.
+            while len(self.__images) > self.size:
+                self.__images.popitem(last=False)
+
+# Caché compartida por defecto.
+CACHE = WordCloudCache()
+
+"""
+Se obtiene una nube de palabras dibujada localmente, de la caché si ya se había dibujado con las mismas frecuencias y opciones.
+
+Parámetros:
+freqDist - Distribución de frecuencia de las palabras.
+cache - Caché a usar.
+options - Opciones de renderWordCloud.
+
+Retorna:
+La imagen de la nube de palabras.
+"""
+def localWordCloud(freqDist: Dict[str, int], cache: WordCloudCache = CACHE, **options) -> Image.Image:
+    key = frequencyHash(freqDist, backend="local", **options)
+    data = cache.get(key)
+
+    if data is None:
+        buffer = io.BytesIO()
+        renderWordCloud(freqDist, **options).save(buffer, format="PNG")
+        data = buffer.getvalue()
+        cache.put(key, data)
+
+    return Image.open(io.BytesIO(data))
+
+# Hilos para las solicitudes a la API externa, como máximo REMOTE_WORKERS a la vez. Se crean al hacer la primera solicitud.
+remoteExecutor: Optional[ThreadPoolExecutor] = None
+remoteLock = threading.Lock()
+
+"""
+Se solicita una nube de palabras a la API externa. La API recibe un texto, por lo que se envían las palabras más frecuentes repetidas según su frecuencia, escalada para que el texto no crezca con el corpus.
+
+Parámetros:
+freqDist - Distribución de frecuencia de las palabras.
+maxWords - Número máximo de palabras que se envían.
+maxRepeat - Número máximo de veces que se repite la palabra más frecuente.
+
+Retorna:
+La imagen en formato PNG.
+"""
+def fetchWordCloud(freqDist: Dict[str, int], maxWords: int = 200, maxRepeat: int = 100) -> bytes:
+    words = heapq.nlargest(maxWords, freqDist.items(), key=lambda item: item[1])
+    scale = min(1.0, maxRepeat / words[0][1]) if words else 1.0
+    text = " ".join(" ".join([word] * max(1, round(count * scale))) for word, count in words)
+
+    payload = json.dumps({
+        "format": "png",
+        "width": 1000,
+        "height": 1000,
+        "fontScale": 15,
+        "scale": "linear",
+        "removeStopwords": True,
+        "minWordLength": 2,
+        "text": text
+    }).encode("utf-8")
+
+    req = request.Request(REMOTE_URL, data=payload, method="POST")
+    req.add_header("Content-Type", "application/json")
+
+    # Se verifica el certificado del servidor.
+    with request.urlopen(req, context=ssl.create_default_context(), timeout=30) as response:
+        return response.read()
+
+"""
+Se solicita una nube de palabras a la API externa sin bloquear, con un número limitado de hilos. Si ya se había solicitado con las mismas frecuencias se toma de la caché.
+
+Parámetros:
+freqDist - Distribución de frecuencia de las palabras.
+cache - Caché a usar.
+
+Retorna:
+Un Future con la imagen de la nube de palabras.
+"""
+def remoteWordCloud(freqDist: Dict[str, int], cache: WordCloudCache = CACHE) -> "Future[Image.Image]":
+    global remoteExecutor
+    key = frequencyHash(freqDist, backend="remote")
+    data = cache.get(key)
+
+    if data is not None:
+        future: "Future[Image.Image]" = Future()
+        future.set_result(Image.open(io.BytesIO(data)))
+        return future
+
+    with remoteLock:
+        if remoteExecutor is None:
+            remoteExecutor = ThreadPoolExecutor(max_workers=REMOTE_WORKERS, thread_name_prefix="wordcloud")
+
+    def task() -> Image.Image:
+        data = fetchWordCloud(freqDist)
+        cache.put(key, data)
+        return Image.open(io.BytesIO(data))
+
+    return remoteExecutor.submit(task)